@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+性能ベンチマーク（API接続不要）
+tests/fake_server.py の代替サーバーと tests/ledger_generator.py の合成データを使い、
+クライアント・残高計算・出力・CLI の所要時間を計測して JSON で出力する。
+保存したベースラインと比較し、しきい値を超えて遅くなった項目があれば終了コード1を返す。
+
+使い方:
+    python scripts/benchmark.py                                  # 計測して結果を表示
+    python scripts/benchmark.py --output results.json            # 結果を保存
+    python scripts/benchmark.py --baseline scripts/benchmark_baseline.json --threshold 0.2
+    python scripts/benchmark.py --save-baseline scripts/benchmark_baseline.json
+
+ベースラインの値は計測したマシンに依存するため、比較は同じマシン（CIの同じランナー）で行う。
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Callable
+
+from rich.console import Console
+from rich.table import Table
+
+from tests.fake_server import FakeZaimServer
+from tests.ledger_generator import LedgerGenerator
+from zaim_client import ZaimClient
+from zaim_client.balance import BalanceManager
+from zaim_cli.output import RowWriter, PlainTableWriter
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BASELINE = ROOT / 'scripts' / 'benchmark_baseline.json'
+
+# 出力の計測に使う列（money export と同じ）
+EXPORT_HEADERS = ['id', 'date', 'mode', 'amount', 'currency_code', 'category_id', 'genre_id',
+                  'from_account_id', 'to_account_id', 'name', 'place', 'comment',
+                  'receipt_id', 'active', 'created']
+
+
+def measure(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """
+    func を repeat 回実行し、それぞれの所要時間（秒）を返す
+
+    Args:
+        func: 計測する処理（setup を渡した場合はその戻り値を引数に取る）
+        repeat: 実行回数
+        setup: 毎回の実行前に呼ぶ準備処理（計測に含めない）
+    """
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        func(state) if setup else func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+class BenchmarkSuite:
+    """ベンチマークの実行と結果の保持"""
+
+    def __init__(self, sizes: List[int], repeat: int, seed: int, http_records: int, calls: int):
+        """
+        初期化
+
+        Args:
+            sizes: 残高計算を計測する家計簿の件数
+            repeat: 各項目の計測回数（中央値を採用）
+            seed: 合成データの乱数シード
+            http_records: HTTP経由のページング・CLIの計測に使う件数
+            calls: リクエストのオーバーヘッドの計測で1回あたりに呼ぶ回数
+        """
+        self.sizes = sizes
+        self.repeat = repeat
+        self.seed = seed
+        self.http_records = http_records
+        self.calls = calls
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, timings: List[float], ops: int = 1, unit: str = 'run'):
+        """
+        計測結果を記録
+
+        Args:
+            name: 項目名
+            timings: 各回の所要時間（秒）
+            ops: 1回の計測で処理した件数（リクエスト数・レコード数など）
+            unit: ops の単位
+        """
+        median = statistics.median(timings)
+        self.results[name] = {
+            'seconds': median,
+            'min': min(timings),
+            'max': max(timings),
+            'ops': ops,
+            'unit': unit,
+            'per_second': ops / median if median > 0 else None,
+        }
+        rate = f"  ({ops / median:,.0f} {unit}/s)" if ops > 1 and median > 0 else ''
+        print(f"  {name:<42} {median * 1000:>10.2f} ms{rate}", file=sys.stderr)
+
+    def _generator(self, records: int) -> LedgerGenerator:
+        # 残高計算の既定の期間（365日）にすべての取引が入るようにする
+        return LedgerGenerator(records=records, seed=self.seed, days=365)
+
+    def bench_requests(self):
+        """_make_request のオーバーヘッド（代替サーバーへの GET /home/user/verify）"""
+        with FakeZaimServer() as server:
+            for name, fast_signer in (('oauth1', False), ('fast_signer', True)):
+                client = ZaimClient(base_url=server.base_url, fast_signer=fast_signer,
+                                    **server.client_credentials())
+                client.verify_user()
+
+                def calls():
+                    for _ in range(self.calls):
+                        client._make_request('GET', '/home/user/verify')
+
+                self.record(f"request.overhead.{name}", measure(calls, self.repeat), self.calls, 'req')
+
+    def bench_pagination(self):
+        """HTTP経由のページング（iter_money_pages で全件を取得）"""
+        generator = self._generator(self.http_records)
+        with FakeZaimServer(ledger=generator.ledger()) as server:
+            client = ZaimClient(base_url=server.base_url, **server.client_credentials())
+
+            def scan():
+                return sum(len(page) for page in client.iter_money_pages(limit=100))
+
+            scan()
+            self.record(f"pagination.{self.http_records}", measure(scan, self.repeat),
+                        self.http_records, 'record')
+
+    def bench_balance(self):
+        """残高計算（プロセス内の FakeZaimClient、通信を除いたクライアント側の処理）"""
+        for size in self.sizes:
+            client = self._generator(size).client()
+            account_id = client.ledger.accounts[0]['id']
+
+            self.record(f"balance.calculate_current_balance.{size}",
+                        measure(lambda manager: manager.calculate_current_balance(account_id),
+                                self.repeat, setup=lambda: BalanceManager(client)),
+                        size, 'record')
+            self.record(f"balance.show_balance.{size}",
+                        measure(lambda manager: manager.show_balance(),
+                                self.repeat, setup=lambda: BalanceManager(client)),
+                        size, 'record')
+
+    def bench_rendering(self):
+        """出力形式ごとの書き出し（CSV / JSON / JSONL / テーブル）"""
+        rows = list(self._generator(self.http_records).iter_money())
+        count = len(rows)
+
+        for output_format in ('csv', 'json', 'jsonl'):
+            self.record(f"render.{output_format}.{count}",
+                        measure(lambda: RowWriter(output_format, EXPORT_HEADERS, stream=io.StringIO()).write_all(rows),
+                                self.repeat),
+                        count, 'row')
+
+        columns = [(header, 'right' if header == 'amount' else 'left') for header in EXPORT_HEADERS]
+        cells = [[str(row[header]) for header in EXPORT_HEADERS] for row in rows]
+        self.record(f"render.table_plain.{count}",
+                    measure(lambda: sum(1 for _ in PlainTableWriter(columns).iter_lines(cells)), self.repeat),
+                    count, 'row')
+
+        # Rich のテーブルは件数が多いと遅いため、少ない件数で計測する
+        rich_rows = cells[:200]
+
+        def rich_table():
+            table = Table(title="取引一覧")
+            for header, justify in columns:
+                table.add_column(header, justify=justify)
+            for cells_row in rich_rows:
+                table.add_row(*cells_row)
+            Console(file=io.StringIO(), width=200, color_system=None).print(table)
+
+        self.record(f"render.table_rich.{len(rich_rows)}", measure(rich_table, self.repeat), len(rich_rows), 'row')
+
+    def _cli_env(self, home: str, base_url: str, credentials: Dict[str, str]) -> Dict[str, str]:
+        """CLIのサブプロセスの環境変数（一時ホーム・デーモン無効・代替サーバーに接続）"""
+        env = dict(os.environ)
+        env['HOME'] = home
+        env['ZAIM_CLI_NO_DAEMON'] = '1'
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ROOT), env.get('PYTHONPATH')]))
+        env.pop('ZAIM_CLI_PROFILE', None)
+        env['ZAIM_API_BASE_URL'] = base_url
+        for field, value in credentials.items():
+            env[f"ZAIM_{field.upper()}"] = value
+        return env
+
+    def _run_cli(self, args: List[str], env: Dict[str, str]):
+        completed = subprocess.run([sys.executable, '-m', 'zaim_cli.launcher', *args], env=env,
+                                   stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"zaim-cli {' '.join(args)} が失敗しました: {completed.stderr.strip()}")
+
+    def bench_cli(self):
+        """CLIの起動時間と、代替サーバーに対する balance show の所要時間"""
+        generator = self._generator(self.http_records)
+        # CLIは常に代替サーバーと代替の認証情報で実行し、実際のAPIには接続しない
+        with tempfile.TemporaryDirectory() as home, FakeZaimServer(ledger=generator.ledger()) as server:
+            env = self._cli_env(home, server.base_url, server.client_credentials())
+            for name, args in (('version', ['version']), ('help', ['--help'])):
+                self._run_cli(args, env)
+                self.record(f"cli.cold_start.{name}", measure(lambda: self._run_cli(args, env), self.repeat))
+
+            args = ['--json', 'balance', 'show']
+            self._run_cli(args, env)
+            self.record(f"cli.balance_show.{self.http_records}",
+                        measure(lambda: self._run_cli(args, env), self.repeat),
+                        self.http_records, 'record')
+
+    def run(self, only: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        ベンチマークを実行
+
+        Args:
+            only: 実行するグループ（requests, pagination, balance, rendering, cli。Noneの場合はすべて）
+
+        Returns:
+            {meta, results}
+        """
+        groups = [('requests', self.bench_requests), ('pagination', self.bench_pagination),
+                  ('balance', self.bench_balance), ('rendering', self.bench_rendering),
+                  ('cli', self.bench_cli)]
+        for name, bench in groups:
+            if only and name not in only:
+                continue
+            print(f"[{name}]", file=sys.stderr)
+            bench()
+
+        return {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'sizes': self.sizes,
+                'repeat': self.repeat,
+                'seed': self.seed,
+                'http_records': self.http_records,
+                'calls': self.calls,
+            },
+            'results': self.results
+        }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    ベースラインと比較
+
+    Args:
+        results: 今回の結果
+        baseline: ベースラインの結果
+        threshold: 遅くなったとみなす割合（0.2 なら20%以上遅い場合）
+
+    Returns:
+        [{name, baseline, current, change, status}]（時間は1件あたりの秒数、status は ok / regression / improved / new）
+    """
+    rows = []
+    for name, current in results['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append({'name': name, 'baseline': None, 'current': current['seconds'] / current['ops'],
+                         'change': None, 'status': 'new'})
+            continue
+
+        # 1件あたりの時間で比べる（--calls などで1回の件数が変わっても比較できる）
+        current_per_op = current['seconds'] / current['ops']
+        base_per_op = base['seconds'] / base['ops']
+        change = current_per_op / base_per_op - 1 if base_per_op > 0 else 0.0
+        if change > threshold:
+            status = 'regression'
+        elif change < -threshold:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': base_per_op, 'current': current_per_op,
+                     'change': change, 'status': status})
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float):
+    """比較結果を表示"""
+    marks = {'ok': '✅', 'improved': '🚀', 'regression': '❌', 'new': '🆕'}
+    print(f"\n=== ベースラインとの比較（しきい値 {threshold:.0%}） ===", file=sys.stderr)
+    for row in rows:
+        baseline = f"{row['baseline'] * 1e6:.1f}" if row['baseline'] is not None else '-'
+        change = f"{row['change']:+.1%}" if row['change'] is not None else ''
+        print(f"{marks[row['status']]} {row['name']:<42} {baseline:>12} → {row['current'] * 1e6:>12.1f} µs/件  {change}",
+              file=sys.stderr)
+
+
+def main():
+    """ベンチマークの実行"""
+    parser = argparse.ArgumentParser(description='Zaim CLI の性能ベンチマーク（API接続不要）')
+    parser.add_argument('--sizes', default='10000,100000', help='残高計算を計測する件数（カンマ区切り）')
+    parser.add_argument('--repeat', type=int, default=5, help='各項目の計測回数（中央値を採用）')
+    parser.add_argument('--seed', type=int, default=1, help='合成データの乱数シード')
+    parser.add_argument('--http-records', type=int, default=10000, help='HTTP経由の計測・出力の計測に使う件数')
+    parser.add_argument('--calls', type=int, default=200, help='リクエストのオーバーヘッドの計測で呼ぶ回数')
+    parser.add_argument('--only', help='実行するグループ（requests,pagination,balance,rendering,cli）')
+    parser.add_argument('--quick', action='store_true', help='残高計算は最初の件数のみ、回数を減らして短時間で実行')
+    parser.add_argument('--output', help='結果を保存する JSON ファイル（省略時は標準出力）')
+    parser.add_argument('--baseline', help=f'比較するベースラインの JSON ファイル（例: {DEFAULT_BASELINE.relative_to(ROOT)}）')
+    parser.add_argument('--threshold', type=float, default=0.2, help='遅くなったとみなす割合')
+    parser.add_argument('--save-baseline', help='結果をベースラインとして保存するファイル')
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        print(f"❌ --sizes は整数のカンマ区切りで指定してください: {args.sizes}", file=sys.stderr)
+        return 1
+    if args.quick:
+        sizes, repeat, http_records, calls = sizes[:1], 3, args.http_records, 50
+    else:
+        repeat, http_records, calls = args.repeat, args.http_records, args.calls
+
+    suite = BenchmarkSuite(sizes, repeat, args.seed, http_records, calls)
+    only = [name.strip() for name in args.only.split(',')] if args.only else None
+    results = suite.run(only)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(text + '\n', encoding='utf-8')
+        print(f"✅ ベースラインを保存しました: {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        try:
+            baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"❌ ベースラインを読み込めません: {e}", file=sys.stderr)
+            return 1
+
+        rows = compare(results, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        regressions = [row['name'] for row in rows if row['status'] == 'regression']
+        if regressions:
+            print(f"\n⚠️ {len(regressions)}項目が {args.threshold:.0%} 以上遅くなりました: {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+        print("\n🎉 性能の劣化はありません", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+署名のマイクロベンチマーク
+requests_oauthlib の OAuth1 と HmacSha1Signer の1秒あたりの署名数を比較する（API接続不要）
+"""
+
+import sys
+import time
+import argparse
+
+import requests
+from requests_oauthlib import OAuth1
+
+from zaim_client.signer import HmacSha1Signer
+
+
+CREDENTIALS = ('consumer_key', 'consumer_secret', 'access_token', 'access_token_secret')
+
+# (名前, メソッド, URL, クエリパラメータ, フォームデータ)
+REQUESTS = [
+    ('GET /home/money', 'GET', 'https://api.zaim.net/v2/home/money',
+     {'mapping': 1, 'order': 'date', 'page': 12, 'limit': 100,
+      'start_date': '2024-01-01', 'end_date': '2024-12-31'}, None),
+    ('POST /home/money/payment', 'POST', 'https://api.zaim.net/v2/home/money/payment', None,
+     {'mapping': 1, 'category_id': 101, 'genre_id': 10101, 'amount': 1500,
+      'date': '2024-01-31', 'from_account_id': 1, 'comment': 'CLI 残高調整'}),
+]
+
+
+def measure(auth, prepared: requests.PreparedRequest, seconds: float) -> float:
+    """seconds 秒間署名を繰り返し、1秒あたりの署名数を返す"""
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        for _ in range(100):
+            auth(prepared.copy())
+        count += 100
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - started)
+
+
+def main():
+    """ベンチマークの実行"""
+    parser = argparse.ArgumentParser(description='OAuth1 署名のマイクロベンチマーク')
+    parser.add_argument('--seconds', type=float, default=1.0, help='1計測あたりの秒数')
+    args = parser.parse_args()
+
+    consumer_key, consumer_secret, access_token, access_token_secret = CREDENTIALS
+    signers = [
+        ('oauthlib', OAuth1(consumer_key, client_secret=consumer_secret,
+                            resource_owner_key=access_token, resource_owner_secret=access_token_secret,
+                            signature_method='HMAC-SHA1')),
+        ('fast', HmacSha1Signer(*CREDENTIALS)),
+    ]
+
+    print(f"{'リクエスト':<28}{'署名器':<10}{'署名/秒':>12}{'1署名(µs)':>12}")
+    for name, method, url, params, data in REQUESTS:
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'} if data else None
+        prepared = requests.Request(method, url, params=params, data=data, headers=headers).prepare()
+
+        rates = {}
+        for signer_name, auth in signers:
+            rates[signer_name] = measure(auth, prepared, args.seconds)
+            print(f"{name:<28}{signer_name:<10}{rates[signer_name]:>12,.0f}{1e6 / rates[signer_name]:>12.1f}")
+        print(f"{'':<28}{'倍率':<10}{rates['fast'] / rates['oauthlib']:>11.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
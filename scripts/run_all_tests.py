@@ -3,10 +3,46 @@
 全テスト実行スクリプト
 """
 
+import os
 import sys
 import subprocess
 import time
 from datetime import datetime
+from pathlib import Path
+
+
+# リポジトリのルート（テストは tests.fake_server などをパッケージとして読み込む）
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# 実際のAPIに接続するテスト
+API_TESTS = [
+    ('tests/test_auth.py', '認証テスト'),
+    ('tests/test_master_data.py', 'マスターデータ取得テスト'),
+    ('tests/test_crud.py', 'CRUD操作テスト'),
+    ('tests/test_error_handling.py', 'エラーハンドリングテスト'),
+    ('tests/test_integration.py', '統合テスト')
+]
+
+# API接続不要のテスト（tests/fake_server.py などを使用）
+OFFLINE_TESTS = [
+    ('tests/test_signer.py', '高速署名テスト'),
+    ('tests/test_fake_server.py', '代替サーバーテスト'),
+    ('tests/test_ledger_generator.py', '合成家計簿データテスト'),
+    ('tests/test_balance.py', '残高計算テスト'),
+    ('tests/test_planner.py', 'リクエスト計画テスト'),
+    ('tests/test_report.py', '集計レポートテスト'),
+    ('tests/test_importer.py', '明細取り込みテスト'),
+    ('tests/test_output.py', 'CLI出力テスト'),
+    ('tests/test_names.py', '名前インデックステスト'),
+    ('tests/test_profiler.py', '計測テスト'),
+    ('tests/test_profiles.py', '名前付きプロファイルテスト'),
+    ('tests/test_cli_session.py', 'CLIセッションテスト'),
+    ('tests/test_credentials.py', '認証情報の解決テスト'),
+    ('tests/test_vault.py', 'トークン保管庫テスト'),
+    ('tests/test_verify.py', '利用者確認の有効期限テスト'),
+    ('tests/test_auth_flow.py', '認証フローテスト')
+]
 
 
 def run_test_script(script_name, description):
@@ -19,8 +55,12 @@ def run_test_script(script_name, description):
     start_time = time.time()
     
     try:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ROOT), env.get('PYTHONPATH')]))
         result = subprocess.run(
             [sys.executable, script_name],
+            cwd=ROOT,
+            env=env,
             capture_output=True,
             text=True,
             timeout=300  # 5分でタイムアウト
@@ -58,22 +98,9 @@ def check_environment():
     print("=== 実行環境確認 ===")
     
     # 必要なファイルの存在確認
-    required_files = [
-        'zaim_client.py',
-        'test_auth.py',
-        'test_master_data.py',
-        'test_crud.py',
-        'test_error_handling.py',
-        'test_integration.py'
-    ]
-    
-    missing_files = []
-    for file in required_files:
-        try:
-            with open(file, 'r'):
-                pass
-        except FileNotFoundError:
-            missing_files.append(file)
+    required_files = ['zaim_client/__init__.py'] + [script for script, _ in API_TESTS + OFFLINE_TESTS]
+    
+    missing_files = [file for file in required_files if not (ROOT / file).is_file()]
     
     if missing_files:
         print("❌ 以下のファイルが見つかりません:")
@@ -82,7 +109,6 @@ def check_environment():
         return False
     
     # 環境変数の確認（警告のみ）
-    import os
     env_vars = ['ZAIM_CONSUMER_KEY', 'ZAIM_CONSUMER_SECRET', 
                 'ZAIM_ACCESS_TOKEN', 'ZAIM_ACCESS_TOKEN_SECRET']
     
@@ -91,7 +117,7 @@ def check_environment():
         print("⚠️ 以下の環境変数が設定されていません:")
         for var in missing_env:
             print(f"   - {var}")
-        print("   認証が必要なテストは失敗する可能性があります。")
+        print("   認証が必要なテストは失敗する可能性があります（API接続不要のテストには影響しません）。")
     
     print("✅ 実行環境確認完了")
     return True
@@ -108,14 +134,7 @@ def main():
         print("❌ 実行環境に問題があります")
         return 1
     
-    # テスト一覧
-    tests = [
-        ('test_auth.py', '認証テスト'),
-        ('test_master_data.py', 'マスターデータ取得テスト'),
-        ('test_crud.py', 'CRUD操作テスト'),
-        ('test_error_handling.py', 'エラーハンドリングテスト'),
-        ('test_integration.py', '統合テスト')
-    ]
+    tests = API_TESTS + OFFLINE_TESTS
     
     results = []
     total_duration = 0
@@ -38,7 +38,7 @@ setup(
     install_requires=requirements,
     entry_points={
         "console_scripts": [
-            "zaim-cli=zaim_cli.main:cli",
+            "zaim-cli=zaim_cli.launcher:main",
         ],
     },
     include_package_data=True,
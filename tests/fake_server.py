@@ -0,0 +1,795 @@
+#!/usr/bin/env python3
+"""
+ローカルで動く Zaim API の代替サーバー（http.server ベース、API接続不要）
+
+/home/money の CRUD（ページング・絞り込み）、マスターデータ、利用者確認のエンドポイントを
+メモリ上の家計簿で実装し、OAuth 1.0a (HMAC-SHA1) の署名も検証する。
+応答の遅延・エラーの注入・レート制限（429）を設定でき、クライアントの性能を
+ネットワークなしで再現性をもって計測するために使う。
+
+使い方（コード内）:
+    with FakeZaimServer() as server:
+        client = ZaimClient(base_url=server.base_url, **server.client_credentials())
+
+HTTPを介さずに同じ家計簿を呼び出す FakeZaimClient もあり、大量データでの計測に使う
+（合成データの生成は ledger_generator.py）。
+
+使い方（単体起動）:
+    python tests/fake_server.py --port 8765 --latency 0.05
+    （表示される環境変数を設定すると zaim-cli もこのサーバーに接続する）
+"""
+
+import hmac
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qsl, unquote
+from typing import Optional, Dict, List, Any, Tuple, Iterable, Iterator
+
+from zaim_client import ZaimClient
+from zaim_client.signer import HmacSha1Signer
+
+
+API_PREFIX = '/v2'
+
+# 既定の認証情報（クライアントと同じ値を使えば署名が検証を通る）
+DEFAULT_CREDENTIALS = {
+    'consumer_key': 'fake-consumer-key',
+    'consumer_secret': 'fake-consumer-secret',
+    'access_token': 'fake-access-token',
+    'access_token_secret': 'fake-access-token-secret',
+}
+
+MODES = ('payment', 'income', 'transfer')
+
+# 作成時に必須の項目
+REQUIRED_FIELDS = {
+    'payment': ('category_id', 'genre_id', 'amount', 'date'),
+    'income': ('category_id', 'amount', 'date'),
+    'transfer': ('amount', 'date', 'from_account_id', 'to_account_id'),
+}
+
+# 作成・更新で受け付ける項目
+INTEGER_FIELDS = ('category_id', 'genre_id', 'from_account_id', 'to_account_id', 'amount')
+TEXT_FIELDS = ('comment', 'name', 'place')
+TEXT_LIMIT = 100
+
+MAX_LIMIT = 100
+
+# 署名の時刻のずれの許容範囲（秒）
+TIMESTAMP_WINDOW = 300
+
+# Zaim の既定に近いマスターデータ（ledger_generator.py の合成データもこれを使う）
+DEFAULT_CATEGORIES = [
+    {'id': 101, 'name': '食費', 'mode': 'payment'},
+    {'id': 102, 'name': '日用雑貨', 'mode': 'payment'},
+    {'id': 103, 'name': '交通', 'mode': 'payment'},
+    {'id': 104, 'name': '交際費', 'mode': 'payment'},
+    {'id': 105, 'name': 'エンタメ', 'mode': 'payment'},
+    {'id': 106, 'name': '教育・教養', 'mode': 'payment'},
+    {'id': 107, 'name': '美容・衣服', 'mode': 'payment'},
+    {'id': 108, 'name': '医療・保険', 'mode': 'payment'},
+    {'id': 109, 'name': '通信', 'mode': 'payment'},
+    {'id': 110, 'name': '水道・光熱', 'mode': 'payment'},
+    {'id': 111, 'name': '住まい', 'mode': 'payment'},
+    {'id': 199, 'name': 'その他', 'mode': 'payment'},
+    {'id': 11, 'name': '給与所得', 'mode': 'income'},
+    {'id': 12, 'name': '立替金返済', 'mode': 'income'},
+    {'id': 13, 'name': '賞与', 'mode': 'income'},
+    {'id': 14, 'name': '臨時収入', 'mode': 'income'},
+    {'id': 19, 'name': 'その他', 'mode': 'income'},
+]
+
+DEFAULT_GENRES = [
+    {'id': 10101, 'name': '食料品', 'category_id': 101},
+    {'id': 10102, 'name': 'カフェ', 'category_id': 101},
+    {'id': 10103, 'name': '朝ご飯', 'category_id': 101},
+    {'id': 10104, 'name': '昼ご飯', 'category_id': 101},
+    {'id': 10105, 'name': '晩ご飯', 'category_id': 101},
+    {'id': 10201, 'name': '消耗品', 'category_id': 102},
+    {'id': 10202, 'name': '子育て用品', 'category_id': 102},
+    {'id': 10203, 'name': 'ペット用品', 'category_id': 102},
+    {'id': 10205, 'name': '家電', 'category_id': 102},
+    {'id': 10301, 'name': '電車', 'category_id': 103},
+    {'id': 10302, 'name': 'タクシー', 'category_id': 103},
+    {'id': 10303, 'name': 'バス', 'category_id': 103},
+    {'id': 10304, 'name': '飛行機', 'category_id': 103},
+    {'id': 10401, 'name': '飲み会', 'category_id': 104},
+    {'id': 10402, 'name': 'プレゼント', 'category_id': 104},
+    {'id': 10501, 'name': 'レジャー', 'category_id': 105},
+    {'id': 10503, 'name': '映画・動画', 'category_id': 105},
+    {'id': 10506, 'name': '書籍', 'category_id': 105},
+    {'id': 10507, 'name': 'ゲーム', 'category_id': 105},
+    {'id': 10601, 'name': '習い事', 'category_id': 106},
+    {'id': 10603, 'name': '参考書', 'category_id': 106},
+    {'id': 10701, 'name': '洋服', 'category_id': 107},
+    {'id': 10705, 'name': '美容院', 'category_id': 107},
+    {'id': 10801, 'name': '病院代', 'category_id': 108},
+    {'id': 10802, 'name': '薬代', 'category_id': 108},
+    {'id': 10803, 'name': '生命保険', 'category_id': 108},
+    {'id': 10901, 'name': '携帯電話料金', 'category_id': 109},
+    {'id': 10903, 'name': 'インターネット関連費', 'category_id': 109},
+    {'id': 11001, 'name': '水道料金', 'category_id': 110},
+    {'id': 11002, 'name': '電気料金', 'category_id': 110},
+    {'id': 11003, 'name': 'ガス料金', 'category_id': 110},
+    {'id': 11101, 'name': '家賃', 'category_id': 111},
+    {'id': 19901, 'name': 'その他', 'category_id': 199},
+]
+
+DEFAULT_ACCOUNTS = [
+    {'id': 1, 'name': 'お財布'},
+    {'id': 2, 'name': '三井住友銀行'},
+    {'id': 3, 'name': 'ゆうちょ銀行'},
+    {'id': 4, 'name': '楽天カード'},
+    {'id': 5, 'name': 'PayPay'},
+    {'id': 6, 'name': 'Suica'},
+    {'id': 7, 'name': 'SBI証券'},
+    {'id': 8, 'name': '外貨預金（USD）'},
+]
+
+CURRENCIES = [
+    {'currency_code': 'JPY', 'unit': '¥', 'name': '日本円', 'point': 0},
+    {'currency_code': 'USD', 'unit': '$', 'name': '米ドル', 'point': 2},
+    {'currency_code': 'EUR', 'unit': '€', 'name': 'ユーロ', 'point': 2},
+]
+
+
+class FakeAPIError(Exception):
+    """APIのエラー応答（ステータスコードとメッセージ）"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _parse_int(data: Dict[str, str], field: str) -> int:
+    """整数の項目を読む（不正な値は400）"""
+    try:
+        return int(data[field])
+    except (TypeError, ValueError):
+        raise FakeAPIError(400, f"{field} must be an integer")
+
+
+def _parse_date(value: str) -> str:
+    """YYYY-MM-DD の日付を検証"""
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise FakeAPIError(400, f"invalid date: {value}")
+    return value
+
+
+class FakeLedger:
+    """メモリ上の家計簿（記録とマスターデータ）"""
+
+    def __init__(self, categories: Optional[List[Dict[str, Any]]] = None,
+                 genres: Optional[List[Dict[str, Any]]] = None,
+                 accounts: Optional[List[Dict[str, Any]]] = None,
+                 user_id: int = 1):
+        """
+        初期化
+
+        Args:
+            categories: カテゴリ [{id, name, mode}]（Noneの場合は既定のカテゴリ）
+            genres: ジャンル [{id, name, category_id}]（Noneの場合は既定のジャンル）
+            accounts: 口座 [{id, name}]（Noneの場合は既定の口座）
+            user_id: 利用者ID
+        """
+        self.user_id = user_id
+        self.categories = [self._master(item, sort, parent_category_id=item['id'], mode=item.get('mode', 'payment'))
+                           for sort, item in enumerate(categories or DEFAULT_CATEGORIES, 1)]
+        self.genres = [self._master(item, sort, category_id=item['category_id'], parent_genre_id=item['id'])
+                       for sort, item in enumerate(genres or DEFAULT_GENRES, 1)]
+        self.accounts = [self._master(item, sort, local_id=item['id'], website_id=0, parent_account_id=0)
+                         for sort, item in enumerate(accounts or DEFAULT_ACCOUNTS, 1)]
+
+        self.money: Dict[int, Dict[str, Any]] = {}
+        # {日付: 記録数}（利用者情報の入力日数に使う）
+        self._dates: Counter = Counter()
+        self._next_id = 1
+        self._lock = threading.RLock()
+        # 変更のたびに増え、検索結果のキャッシュを無効にする
+        self._version = 0
+        # {絞り込み条件: (バージョン, 並べ替え済みの記録)}
+        self._query_cache: Dict[tuple, Tuple[int, List[Dict[str, Any]]]] = {}
+
+    @staticmethod
+    def _master(item: Dict[str, Any], sort: int, **defaults) -> Dict[str, Any]:
+        """マスターデータに API と同じ共通項目を補う"""
+        return {**defaults, 'sort': sort, 'active': 1, 'modified': _now(), **item}
+
+    def add_money(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        記録をそのまま追加（検証しない、初期データの投入用）
+
+        Args:
+            record: 記録（id を省略した場合は採番、その他の項目も省略時は既定値）
+
+        Returns:
+            追加した記録
+        """
+        with self._lock:
+            record_id = int(record.get('id') or self._next_id)
+            self._next_id = max(self._next_id, record_id + 1)
+            stored = {
+                'id': record_id,
+                'mode': record.get('mode', 'payment'),
+                'user_id': self.user_id,
+                'date': record['date'],
+                'category_id': record.get('category_id', 0),
+                'genre_id': record.get('genre_id', 0),
+                'to_account_id': record.get('to_account_id', 0),
+                'from_account_id': record.get('from_account_id', 0),
+                'amount': record['amount'],
+                'comment': record.get('comment', ''),
+                'active': record.get('active', 1),
+                'name': record.get('name', ''),
+                'receipt_id': record.get('receipt_id', 0),
+                'place': record.get('place', ''),
+                'created': record.get('created') or _now(),
+                'currency_code': record.get('currency_code', 'JPY'),
+            }
+            previous = self.money.get(record_id)
+            if previous is not None:
+                self._forget_date(previous['date'])
+            self.money[record_id] = stored
+            self._dates[stored['date']] += 1
+            self._version += 1
+            return stored
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        複数の記録を追加
+
+        Returns:
+            追加した件数
+        """
+        count = 0
+        with self._lock:
+            for record in records:
+                self.add_money(record)
+                count += 1
+        return count
+
+    def query(self, mode: Optional[str] = None, category_id: Optional[int] = None,
+              genre_id: Optional[int] = None, start_date: Optional[str] = None,
+              end_date: Optional[str] = None, order: str = 'date') -> List[Dict[str, Any]]:
+        """
+        条件に合う記録（新しい順）
+
+        同じ条件の結果は家計簿が変更されるまでキャッシュし、ページごとの取得で毎回全件を走査しない
+        """
+        key = (mode, category_id, genre_id, start_date, end_date, order)
+        with self._lock:
+            cached = self._query_cache.get(key)
+            if cached and cached[0] == self._version:
+                return cached[1]
+
+            records = [record for record in self.money.values()
+                       if (mode is None or record['mode'] == mode)
+                       and (category_id is None or record['category_id'] == category_id)
+                       and (genre_id is None or record['genre_id'] == genre_id)
+                       and (start_date is None or record['date'] >= start_date)
+                       and (end_date is None or record['date'] <= end_date)]
+            if order == 'id':
+                records.sort(key=lambda record: record['id'], reverse=True)
+            else:
+                records.sort(key=lambda record: (record['date'], record['id']), reverse=True)
+
+            self._query_cache[key] = (self._version, records)
+            return records
+
+    def _validated(self, mode: str, data: Dict[str, str], required: Iterable[str]) -> Dict[str, Any]:
+        """フォームデータを検証して記録の項目に変換"""
+        if data.get('mapping') != '1':
+            raise FakeAPIError(400, "mapping is required")
+        for field in required:
+            if not data.get(field):
+                raise FakeAPIError(400, f"{field} is required")
+
+        values: Dict[str, Any] = {}
+        for field in INTEGER_FIELDS:
+            if data.get(field):
+                values[field] = _parse_int(data, field)
+        for field in TEXT_FIELDS:
+            if field in data:
+                if len(data[field]) > TEXT_LIMIT:
+                    raise FakeAPIError(400, f"{field} must be {TEXT_LIMIT} characters or less")
+                values[field] = data[field]
+        if 'date' in data:
+            values['date'] = _parse_date(data['date'])
+
+        if 'amount' in values and values['amount'] <= 0:
+            raise FakeAPIError(400, "amount must be greater than 0")
+        if mode == 'transfer' and values.get('from_account_id') == values.get('to_account_id') \
+                and 'from_account_id' in values:
+            raise FakeAPIError(400, "from_account_id and to_account_id must be different")
+        return values
+
+    def create(self, mode: str, data: Dict[str, str]) -> Dict[str, Any]:
+        """記録を作成（POST /home/money/{mode}）"""
+        values = self._validated(mode, data, REQUIRED_FIELDS[mode])
+        with self._lock:
+            record = self.add_money({**values, 'mode': mode})
+            return {'money': {'id': record['id'], 'place_uid': None, 'modified': record['created']},
+                    'user': self._user_counts(), 'requested': int(time.time())}
+
+    def update(self, mode: str, record_id: int, data: Dict[str, str]) -> Dict[str, Any]:
+        """記録を更新（PUT /home/money/{mode}/{id}）"""
+        values = self._validated(mode, data, ('amount', 'date'))
+        with self._lock:
+            record = self.money.get(record_id)
+            if record is None or record['mode'] != mode:
+                raise FakeAPIError(404, "money not found")
+            self._forget_date(record['date'])
+            record.update(values)
+            self._dates[record['date']] += 1
+            self._version += 1
+            return {'money': {'id': record_id, 'modified': _now()}, 'requested': int(time.time())}
+
+    def delete(self, mode: str, record_id: int) -> Dict[str, Any]:
+        """記録を削除（DELETE /home/money/{mode}/{id}）"""
+        with self._lock:
+            record = self.money.get(record_id)
+            if record is None or record['mode'] != mode:
+                raise FakeAPIError(404, "money not found")
+            del self.money[record_id]
+            self._forget_date(record['date'])
+            self._version += 1
+            return {'money': {'id': record_id, 'modified': _now()}, 'requested': int(time.time())}
+
+    def _forget_date(self, date: str):
+        self._dates[date] -= 1
+        if not self._dates[date]:
+            del self._dates[date]
+
+    def _user_counts(self) -> Dict[str, Any]:
+        return {'input_count': len(self.money), 'day_count': len(self._dates), 'repeat_count': 0,
+                'data_modified': _now()}
+
+    def user(self) -> Dict[str, Any]:
+        """利用者情報（GET /home/user/verify）"""
+        with self._lock:
+            return {'id': self.user_id, 'login': 'fake-user', 'name': 'テストユーザー',
+                    'currency_code': 'JPY', 'week_start': 1, 'month_start': 1,
+                    'profile_image_url': '', 'cover_image_url': '', **self._user_counts()}
+
+    def handle(self, method: str, path: str, query: Dict[str, str], form: Dict[str, str]) -> Dict[str, Any]:
+        """
+        APIのリクエストを処理（代替サーバーと FakeZaimClient で共通）
+
+        Args:
+            method: HTTPメソッド
+            path: /v2 から始まるパス
+            query: クエリパラメーター
+            form: フォームデータ
+
+        Returns:
+            応答のJSON
+
+        Raises:
+            FakeAPIError: エラー応答を返す場合
+        """
+        if not path.startswith(API_PREFIX + '/'):
+            raise FakeAPIError(404, "not found")
+        segments = path[len(API_PREFIX) + 1:].strip('/').split('/')
+        requested = int(time.time())
+
+        if method == 'GET':
+            if segments == ['home', 'user', 'verify']:
+                return {'me': self.user(), 'requested': requested}
+            if segments == ['home', 'money']:
+                return self._get_money(query)
+            if segments[0] == 'home' and len(segments) == 2:
+                if query.get('mapping') != '1':
+                    raise FakeAPIError(400, "mapping is required")
+                masters = {'category': ('categories', self.categories),
+                           'genre': ('genres', self.genres),
+                           'account': ('accounts', self.accounts)}
+                if segments[1] in masters:
+                    key, items = masters[segments[1]]
+                    return {key: items, 'requested': requested}
+            if len(segments) == 1:
+                defaults = {'category': ('categories', self.categories, ('id', 'name', 'mode')),
+                            'genre': ('genres', self.genres, ('id', 'name', 'category_id', 'parent_genre_id')),
+                            'account': ('accounts', self.accounts, ('id', 'name'))}
+                if segments[0] in defaults:
+                    key, items, fields = defaults[segments[0]]
+                    return {key: [{field: item[field] for field in fields} for item in items],
+                            'requested': requested}
+                if segments[0] == 'currency':
+                    return {'currencies': CURRENCIES, 'requested': requested}
+
+        elif segments[:2] == ['home', 'money'] and len(segments) >= 3 and segments[2] in MODES:
+            mode = segments[2]
+            if method == 'POST' and len(segments) == 3:
+                return self.create(mode, form)
+            if method in ('PUT', 'DELETE') and len(segments) == 4:
+                try:
+                    record_id = int(segments[3])
+                except ValueError:
+                    raise FakeAPIError(404, "money not found")
+                if method == 'PUT':
+                    return self.update(mode, record_id, form)
+                return self.delete(mode, record_id)
+
+        raise FakeAPIError(404, "not found")
+
+    def _get_money(self, query: Dict[str, str]) -> Dict[str, Any]:
+        """GET /home/money（絞り込みとページング）"""
+        if query.get('mapping') != '1':
+            raise FakeAPIError(400, "mapping is required")
+
+        mode = query.get('mode') or None
+        if mode is not None and mode not in MODES:
+            raise FakeAPIError(400, f"invalid mode: {mode}")
+        page = _parse_int(query, 'page') if query.get('page') else 1
+        limit = _parse_int(query, 'limit') if query.get('limit') else 20
+        if page < 1 or not 1 <= limit <= MAX_LIMIT:
+            raise FakeAPIError(400, f"page must be 1 or more and limit must be 1 to {MAX_LIMIT}")
+
+        records = self.query(
+            mode=mode,
+            category_id=_parse_int(query, 'category_id') if query.get('category_id') else None,
+            genre_id=_parse_int(query, 'genre_id') if query.get('genre_id') else None,
+            start_date=_parse_date(query['start_date']) if query.get('start_date') else None,
+            end_date=_parse_date(query['end_date']) if query.get('end_date') else None,
+            order=query.get('order') or 'date'
+        )
+        offset = (page - 1) * limit
+        return {'money': records[offset:offset + limit], 'requested': int(time.time())}
+
+
+class RateLimiter:
+    """トークンバケット方式のレート制限"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            rate: 1秒あたりに許可するリクエスト数
+            burst: 連続して許可するリクエスト数（Noneの場合は rate と同じ）
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[float]:
+        """
+        1リクエスト分を消費
+
+        Returns:
+            制限された場合は次に許可されるまでの秒数（許可された場合はNone）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate
+
+
+class FakeZaimHandler(BaseHTTPRequestHandler):
+    """Zaim API のエンドポイントを実装するハンドラー"""
+
+    # Keep-Alive で接続を再利用させる（実際のAPIと同じくセッションのコネクションプールが効く）
+    protocol_version = 'HTTP/1.1'
+    # ヘッダーと本文を別々に書き込むため、Nagle アルゴリズムと遅延ACKで応答ごとに約40ms待たされないようにする
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _handle(self, method: str):
+        """認証・レート制限・エラー注入を経てエンドポイントを呼び出す"""
+        server: FakeZaimServer = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        parts = urlsplit(self.path)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        form = parse_qsl(body, keep_blank_values=True) \
+            if 'application/x-www-form-urlencoded' in self.headers.get('Content-Type', '') else []
+
+        headers: Dict[str, str] = {}
+        try:
+            server.before_request(self, method, parts.path, query + form, headers)
+            status, payload = 200, server.route(method, parts.path, dict(query), dict(form))
+        except FakeAPIError as e:
+            status, payload = e.status, {'error': True, 'message': e.message}
+        except Exception as e:
+            status, payload = 500, {'error': True, 'message': f"internal error: {e}"}
+
+        server.record(method, parts.path, status)
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """ログメッセージを無効化（静寂モード）"""
+        pass
+
+
+class FakeZaimServer(ThreadingMixIn, HTTPServer):
+    """
+    Zaim API の代替サーバー
+
+    start() でバックグラウンドスレッドで起動する（with 文でも可）。
+    base_url を ZaimClient(base_url=...) または環境変数 ZAIM_API_BASE_URL に渡して使う。
+    """
+
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 ledger: Optional[FakeLedger] = None,
+                 credentials: Optional[Dict[str, str]] = None,
+                 verify_signatures: bool = True,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: Tuple[int, ...] = (500, 503),
+                 rate_limit: Optional[float] = None, rate_burst: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            host: 待ち受けるアドレス
+            port: 待ち受けるポート（0の場合は空いているポート）
+            ledger: 家計簿（Noneの場合は既定のマスターデータだけの空の家計簿）
+            credentials: 受け付ける認証情報（Noneの場合は DEFAULT_CREDENTIALS）
+            verify_signatures: OAuth の署名を検証するかどうか
+            latency: 各応答に加える遅延（秒）
+            jitter: 遅延に加える 0〜jitter 秒のばらつき
+            error_rate: ランダムにエラーを返す割合（0〜1）
+            error_statuses: ランダムなエラーで返すステータスコード
+            rate_limit: 1秒あたりのリクエスト数の上限（超えると429、Noneの場合は制限なし）
+            rate_burst: 連続して許可するリクエスト数
+            seed: 遅延・エラー注入の乱数シード（再現性のある計測用）
+        """
+        super().__init__((host, port), FakeZaimHandler)
+        self.ledger = ledger or FakeLedger()
+        self.credentials = dict(credentials or DEFAULT_CREDENTIALS)
+        self.verify_signatures = verify_signatures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst) if rate_limit else None
+        self._random = random.Random(seed)
+        self._signer = HmacSha1Signer(self.credentials['consumer_key'], self.credentials['consumer_secret'],
+                                      self.credentials['access_token'], self.credentials['access_token_secret'])
+
+        # 次のリクエストから順に返すエラーのステータスコード
+        self._injected: List[int] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        """ZaimClient に渡すベースURL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def client_credentials(self) -> Dict[str, str]:
+        """ZaimClient(**server.client_credentials()) で使える認証情報"""
+        return dict(self.credentials)
+
+    def start(self) -> 'FakeZaimServer':
+        """バックグラウンドスレッドで受付を開始"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """受付を停止"""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def inject_errors(self, status: int, count: int = 1):
+        """次の count 件のリクエストに status のエラーを返す（認証・レート制限の後に適用）"""
+        with self._lock:
+            self._injected.extend([status] * count)
+
+    def reset_stats(self):
+        """リクエストの集計を初期化"""
+        with self._lock:
+            self.stats = {'requests': 0, 'endpoints': Counter(), 'statuses': Counter()}
+
+    def record(self, method: str, path: str, status: int):
+        """リクエストを集計"""
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['endpoints'][f"{method} {path}"] += 1
+            self.stats['statuses'][status] += 1
+
+    def before_request(self, handler: FakeZaimHandler, method: str, path: str,
+                       params: List[Tuple[str, str]], headers: Dict[str, str]):
+        """
+        エンドポイントの処理前に遅延・署名検証・レート制限・エラー注入を適用
+
+        Raises:
+            FakeAPIError: リクエストを拒否する場合
+        """
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.verify_signatures:
+            self.verify_signature(method, f"http://{handler.headers.get('Host', '')}{path}",
+                                  params, handler.headers.get('Authorization', ''))
+
+        if self.rate_limiter is not None:
+            retry_after = self.rate_limiter.acquire()
+            if retry_after is not None:
+                headers['Retry-After'] = str(max(1, round(retry_after)))
+                raise FakeAPIError(429, "Too Many Requests")
+
+        with self._lock:
+            status = self._injected.pop(0) if self._injected else None
+            if status is None and self.error_rate and self._random.random() < self.error_rate:
+                status = self._random.choice(self.error_statuses)
+        if status is not None:
+            raise FakeAPIError(status, "injected error")
+
+    def verify_signature(self, method: str, url: str, params: List[Tuple[str, str]], authorization: str):
+        """
+        Authorization ヘッダーの OAuth 1.0a (HMAC-SHA1) 署名を検証
+
+        Raises:
+            FakeAPIError: 署名がない・不正な場合（401）
+        """
+        if not authorization.startswith('OAuth '):
+            raise FakeAPIError(401, "OAuth authorization is required")
+
+        oauth: Dict[str, str] = {}
+        for item in authorization[len('OAuth '):].split(','):
+            key, _, value = item.strip().partition('=')
+            oauth[key] = unquote(value.strip('"'))
+
+        if oauth.get('oauth_signature_method') != 'HMAC-SHA1':
+            raise FakeAPIError(401, "unsupported signature method")
+        if oauth.get('oauth_consumer_key') != self.credentials['consumer_key'] \
+                or oauth.get('oauth_token') != self.credentials['access_token']:
+            raise FakeAPIError(401, "invalid consumer key or token")
+        try:
+            skew = abs(time.time() - int(oauth.get('oauth_timestamp', '')))
+        except ValueError:
+            raise FakeAPIError(401, "invalid timestamp")
+        if skew > TIMESTAMP_WINDOW:
+            raise FakeAPIError(401, "timestamp expired")
+
+        expected = self._signer.signature(method, url, params, oauth.get('oauth_nonce', ''),
+                                          oauth['oauth_timestamp'])
+        if not hmac.compare_digest(expected, oauth.get('oauth_signature', '')):
+            raise FakeAPIError(401, "invalid signature")
+
+    def route(self, method: str, path: str, query: Dict[str, str], form: Dict[str, str]) -> Dict[str, Any]:
+        """エンドポイントの処理（家計簿に委譲）"""
+        return self.ledger.handle(method, path, query, form)
+
+
+class FakeZaimClient(ZaimClient):
+    """
+    HTTPを使わずに FakeLedger を直接呼び出す ZaimClient
+
+    数百万件規模の家計簿で BalanceManager などを計測する場合に、通信と署名の時間を除いて
+    クライアント側の処理だけを測るために使う。応答は代替サーバーと同じ内容になる。
+    """
+
+    def __init__(self, ledger: Optional[FakeLedger] = None):
+        """
+        初期化
+
+        Args:
+            ledger: 家計簿（Noneの場合は既定のマスターデータだけの空の家計簿）
+        """
+        super().__init__(**DEFAULT_CREDENTIALS, base_url=f"http://fake.invalid{API_PREFIX}")
+        self.ledger = ledger or FakeLedger()
+
+    def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None,
+                      data: Optional[Dict] = None) -> Dict[str, Any]:
+        """家計簿を直接呼び出す（HTTPと同じく値は文字列で渡す）"""
+        query = {key: str(value) for key, value in (params or {}).items()}
+        form = {key: str(value) for key, value in (data or {}).items()}
+
+        started = time.perf_counter()
+        status = 200
+        try:
+            result = self.ledger.handle(method.upper(), f"{API_PREFIX}{endpoint}", query, form)
+        except FakeAPIError as e:
+            status = e.status
+            raise Exception(f"API request failed: {e.status} Error: {e.message}")
+        finally:
+            for observer in list(self.request_observers):
+                observer({'method': method, 'endpoint': endpoint, 'page': (params or {}).get('page'),
+                          'status': status, 'bytes': 0, 'elapsed': time.perf_counter() - started})
+
+        # 呼び出し側が記録を書き換えても家計簿に影響しないようにコピーする
+        if isinstance(result.get('money'), list):
+            result = dict(result, money=[dict(record) for record in result['money']])
+        return result
+
+
+def load_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """JSON Lines の記録を1件ずつ読み込む（1行1件）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    """単体で起動"""
+    parser = argparse.ArgumentParser(description='ローカルで動く Zaim API の代替サーバー')
+    parser.add_argument('--host', default='127.0.0.1', help='待ち受けるアドレス')
+    parser.add_argument('--port', type=int, default=8765, help='待ち受けるポート')
+    parser.add_argument('--load', help='初期データの JSON Lines ファイル（1行1件の記録）')
+    parser.add_argument('--latency', type=float, default=0.0, help='各応答の遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='遅延のばらつき（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='ランダムにエラーを返す割合（0〜1）')
+    parser.add_argument('--rate-limit', type=float, help='1秒あたりのリクエスト数の上限')
+    parser.add_argument('--no-verify', action='store_true', help='OAuth の署名を検証しない')
+    parser.add_argument('--seed', type=int, help='乱数シード')
+    args = parser.parse_args()
+
+    server = FakeZaimServer(args.host, args.port, verify_signatures=not args.no_verify,
+                            latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            rate_limit=args.rate_limit, seed=args.seed)
+    if args.load:
+        print(f"{server.ledger.load(load_jsonl(args.load))}件の記録を読み込みました")
+
+    print(f"Zaim API 代替サーバーを起動しました: {server.base_url}")
+    print("以下の環境変数を設定すると ZaimClient / zaim-cli がこのサーバーに接続します:")
+    print(f"  export ZAIM_API_BASE_URL={server.base_url}")
+    for field, value in server.client_credentials().items():
+        print(f"  export ZAIM_{field.upper()}={value}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n停止しました")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+合成家計簿データの生成（API接続不要）
+
+シードを固定すると同じデータを生成する。口座・カテゴリ・ジャンルは代替サーバー
+（fake_server.py）の既定のマスターデータを使い、取引は日付順に1件ずつ生成するため
+1,000万件規模でもメモリを使わずに JSON Lines へ書き出せる。
+
+- 支出・収入・振替の比率は実際の家計簿に近い割合（支出が大半）
+- 給与・賞与・家賃・公共料金・通信費・カード引き落とし・積立は毎月の決まった日に発生
+- 食費の年末、光熱費の夏冬、レジャーの夏休みなど、月によって金額が変わる
+- 店名・品名は日本の一般的なものから選ぶ
+- 外貨預金（USD）の口座には米ドル建ての取引が少し入る
+
+使い方（コード内）:
+    generator = LedgerGenerator(records=100000, seed=1)
+    client = generator.client()          # プロセス内の FakeZaimClient
+    BalanceManager(client).show_balance()
+
+使い方（単体起動）:
+    python tests/ledger_generator.py --records 1000000 --seed 1 --output ledger.jsonl
+    python tests/fake_server.py --load ledger.jsonl
+"""
+
+import sys
+import json
+import random
+import argparse
+from bisect import bisect
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Optional, Dict, List, Any, Iterator, TextIO
+
+from tests.fake_server import (FakeLedger, FakeZaimClient,
+                               DEFAULT_ACCOUNTS, DEFAULT_CATEGORIES, DEFAULT_GENRES)
+
+
+# 口座ID（fake_server.DEFAULT_ACCOUNTS）
+WALLET, BANK, POSTAL_BANK, CARD, PAYPAY, SUICA, SECURITIES, USD_DEPOSIT = 1, 2, 3, 4, 5, 6, 7, 8
+
+# 日々の支出: {ジャンルID: (頻度の重み, 金額の中央値, 店名, 品名)}
+PAYMENT_PROFILES = {
+    10101: (20, 2500, ['イオン 品川店', 'ライフ 大崎店', '成城石井', '西友', 'まいばすけっと'],
+            ['野菜', '牛乳', '卵', 'パン', '肉', '魚', '米', '豆腐']),
+    10102: (8, 550, ['スターバックス', 'ドトールコーヒー', 'タリーズコーヒー', 'コメダ珈琲店'],
+            ['コーヒー', 'カフェラテ', 'ケーキ']),
+    10103: (6, 450, ['セブン-イレブン', 'ローソン', 'ファミリーマート'], ['おにぎり', 'サンドイッチ', 'パン']),
+    10104: (14, 900, ['松屋', '吉野家', 'すき家', '社員食堂', '日高屋', 'CoCo壱番屋'],
+            ['定食', '牛丼', 'カレー', 'ラーメン', '弁当']),
+    10105: (7, 1800, ['サイゼリヤ', '大戸屋', 'ガスト', 'Uber Eats', 'くら寿司'], ['夕食', 'ピザ', '寿司', 'パスタ']),
+    10201: (7, 900, ['マツモトキヨシ', 'ダイソー', '無印良品', 'Amazon.co.jp'],
+            ['洗剤', 'トイレットペーパー', 'ティッシュ', 'シャンプー']),
+    10202: (2, 2500, ['西松屋', 'アカチャンホンポ'], ['おむつ', 'ミルク']),
+    10203: (2, 2000, ['ペットショップ', 'Amazon.co.jp'], ['キャットフード', '猫砂']),
+    10205: (1, 8000, ['ヨドバシカメラ', 'ビックカメラ'], ['電球', 'イヤホン', '電気ケトル']),
+    10301: (10, 300, ['JR東日本', '東京メトロ', '都営地下鉄'], ['乗車券']),
+    10302: (1, 1800, ['日本交通', 'GO'], ['タクシー']),
+    10303: (2, 230, ['都営バス', '東急バス'], ['バス運賃']),
+    10304: (0.2, 25000, ['ANA', 'JAL', 'Peach'], ['航空券']),
+    10401: (2, 4500, ['鳥貴族', '磯丸水産', '和民'], ['飲み会']),
+    10402: (1, 5000, ['髙島屋', '伊勢丹', 'Amazon.co.jp'], ['誕生日プレゼント', 'お土産']),
+    10501: (1, 7000, ['東京ディズニーリゾート', 'よみうりランド', '大江戸温泉物語'], ['入場料']),
+    10503: (1.5, 1900, ['TOHOシネマズ', '109シネマズ', 'Netflix'], ['映画', '動画配信']),
+    10506: (2, 1300, ['紀伊國屋書店', 'ジュンク堂書店', 'Amazon.co.jp'], ['本', '雑誌', '漫画']),
+    10507: (0.7, 5000, ['Nintendo eShop', 'PlayStation Store'], ['ゲーム']),
+    10601: (0.5, 8000, ['英会話教室', 'スイミングスクール'], ['月謝']),
+    10603: (0.5, 2500, ['紀伊國屋書店'], ['参考書']),
+    10701: (2, 4000, ['ユニクロ', 'GU', 'ZARA'], ['シャツ', 'パンツ', '靴下']),
+    10705: (0.7, 4500, ['美容室', 'QBハウス'], ['カット']),
+    10801: (1, 2500, ['内科クリニック', '歯科医院'], ['診察代']),
+    10802: (1, 1200, ['マツモトキヨシ', 'ウエルシア'], ['風邪薬', '目薬']),
+    19901: (1, 1000, ['郵便局', '区役所'], ['切手', '手数料']),
+}
+
+# 月ごとの金額の倍率: {カテゴリID または ジャンルID: {月: 倍率}}
+SEASONAL_FACTORS = {
+    101: {12: 1.25, 1: 1.1},
+    103: {8: 1.3, 12: 1.2},
+    104: {12: 1.6, 3: 1.3, 4: 1.3},
+    105: {8: 1.4, 5: 1.2, 12: 1.2},
+    107: {4: 1.3, 10: 1.2, 12: 1.3},
+    11002: {1: 1.6, 2: 1.6, 7: 1.3, 8: 1.5, 12: 1.4},
+    11003: {1: 1.8, 2: 1.7, 3: 1.3, 12: 1.5},
+}
+
+# 支払いに使う口座の重み（交通の電車・バスは Suica が中心）
+PAYMENT_ACCOUNTS = [(WALLET, 35), (CARD, 35), (PAYPAY, 20), (BANK, 10)]
+TRANSIT_ACCOUNTS = [(SUICA, 70), (WALLET, 15), (CARD, 15)]
+TRANSIT_GENRES = {10301, 10303}
+
+# 日々の取引（毎月の決まった取引を除く）の支出・収入・振替の重み
+MODE_WEIGHTS = [('payment', 88), ('income', 3), ('transfer', 9)]
+
+COMMENTS = ['ポイント利用', '割り勘', 'セール', 'クーポン使用', '定期購入']
+
+
+def _cumulative(weighted: List[tuple]) -> tuple:
+    """(値, 重み) のリストを bisect で選べる形にする"""
+    return [value for value, _ in weighted], list(accumulate(weight for _, weight in weighted))
+
+
+class LedgerGenerator:
+    """シード付きの合成家計簿データ生成"""
+
+    def __init__(self, records: int = 10000, seed: int = 0, days: int = 1095,
+                 end_date: Optional[date] = None, foreign_ratio: float = 0.002):
+        """
+        初期化
+
+        Args:
+            records: 生成する取引の件数
+            seed: 乱数シード（同じ値・同じ期間なら同じデータを生成する）
+            days: 取引を分布させる日数（終了日を含む）
+            end_date: 最後の取引日（Noneの場合は今日）
+            foreign_ratio: 外貨預金（USD）の取引の割合
+        """
+        if records < 0 or days < 1:
+            raise ValueError("records は0以上、days は1以上を指定してください")
+        self.records = records
+        self.seed = seed
+        self.days = days
+        self.end_date = end_date or date.today()
+        self.start_date = self.end_date - timedelta(days=days - 1)
+        self.foreign_ratio = foreign_ratio
+
+        self.accounts = DEFAULT_ACCOUNTS
+        self.categories = DEFAULT_CATEGORIES
+        self.genres = DEFAULT_GENRES
+        self._genre_categories = {genre['id']: genre['category_id'] for genre in DEFAULT_GENRES}
+
+        self._payment_genres = _cumulative([(genre_id, profile[0]) for genre_id, profile in PAYMENT_PROFILES.items()])
+        self._payment_accounts = _cumulative(PAYMENT_ACCOUNTS)
+        self._transit_accounts = _cumulative(TRANSIT_ACCOUNTS)
+        self._modes = _cumulative(MODE_WEIGHTS)
+
+    @staticmethod
+    def _pick(rng: random.Random, table: tuple):
+        values, cumulative = table
+        return values[bisect(cumulative, rng.random() * cumulative[-1])]
+
+    def _amount(self, rng: random.Random, median: int, month: int, *keys: int, spread: float = 0.5) -> int:
+        """中央値と月ごとの倍率から金額を決める（10円単位、最低10円）"""
+        factor = 1.0
+        for key in keys:
+            factor *= SEASONAL_FACTORS.get(key, {}).get(month, 1.0)
+        return max(10, int(round(median * factor * rng.lognormvariate(0, spread), -1)))
+
+    def _scheduled(self, rng: random.Random, day: date, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """その日に発生する毎月の決まった取引"""
+        month = day.month
+        records = []
+
+        if day.day == 1:
+            records.append({'mode': 'transfer', 'from_account_id': BANK, 'to_account_id': SECURITIES,
+                            'amount': 30000, 'name': 'つみたて投資', 'place': 'SBI証券'})
+        if day.day == 10 and month in (6, 12):
+            records.append({'mode': 'income', 'category_id': 13, 'to_account_id': BANK,
+                            'amount': self._amount(rng, 600000, month, spread=0.1),
+                            'name': '賞与', 'place': '株式会社サンプル商事'})
+        if day.day == 20:
+            bills = [(10901, 6500, 'ドコモ', '携帯電話料金'), (10903, 5200, 'NURO光', 'インターネット'),
+                     (11002, 7000, '東京電力', '電気料金'), (11003, 4000, '東京ガス', 'ガス料金'),
+                     (10803, 12000, '日本生命', '生命保険料')]
+            if month % 2 == 0:
+                bills.append((11001, 5500, '東京都水道局', '水道料金'))
+            for genre_id, median, place, name in bills:
+                amount = self._amount(rng, median, month, genre_id, spread=0.08)
+                records.append({'mode': 'payment', 'category_id': self._genre_categories[genre_id],
+                                'genre_id': genre_id, 'from_account_id': CARD, 'amount': amount,
+                                'name': name, 'place': place})
+        if day.day == 25:
+            records.append({'mode': 'income', 'category_id': 11, 'to_account_id': BANK,
+                            'amount': self._amount(rng, 280000, month, spread=0.03),
+                            'name': '給与', 'place': '株式会社サンプル商事'})
+        if day.day == 27:
+            records.append({'mode': 'payment', 'category_id': 111, 'genre_id': 11101, 'from_account_id': BANK,
+                            'amount': 85000, 'name': '家賃', 'place': '大家'})
+            # 前月のカード利用分を引き落とす
+            previous = (day.replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+            settled = state['card'].pop(previous, 0)
+            if settled:
+                records.append({'mode': 'transfer', 'from_account_id': BANK, 'to_account_id': CARD,
+                                'amount': settled, 'name': 'カード引き落とし', 'place': '楽天カード'})
+        return records
+
+    def _daily(self, rng: random.Random, day: date) -> Dict[str, Any]:
+        """日々の取引を1件生成"""
+        month = day.month
+
+        if self.foreign_ratio and rng.random() < self.foreign_ratio:
+            if rng.random() < 0.5:
+                return {'mode': 'income', 'category_id': 14, 'to_account_id': USD_DEPOSIT,
+                        'amount': rng.randint(1, 50), 'name': '外貨預金利息', 'currency_code': 'USD'}
+            return {'mode': 'payment', 'category_id': 199, 'genre_id': 19901, 'from_account_id': USD_DEPOSIT,
+                    'amount': rng.randint(5, 300), 'name': '海外送金', 'place': 'Wise', 'currency_code': 'USD'}
+
+        mode = self._pick(rng, self._modes)
+        if mode == 'payment':
+            genre_id = self._pick(rng, self._payment_genres)
+            _, median, places, names = PAYMENT_PROFILES[genre_id]
+            category_id = self._genre_categories[genre_id]
+            accounts = self._transit_accounts if genre_id in TRANSIT_GENRES else self._payment_accounts
+            return {'mode': 'payment', 'category_id': category_id, 'genre_id': genre_id,
+                    'from_account_id': self._pick(rng, accounts),
+                    'amount': self._amount(rng, median, month, category_id, genre_id),
+                    'name': rng.choice(names), 'place': rng.choice(places),
+                    'comment': rng.choice(COMMENTS) if rng.random() < 0.05 else ''}
+
+        if mode == 'income':
+            kind = rng.random()
+            if kind < 0.6:
+                return {'mode': 'income', 'category_id': 12, 'to_account_id': rng.choice((WALLET, PAYPAY)),
+                        'amount': self._amount(rng, 3000, month), 'name': '立替金'}
+            if kind < 0.9:
+                return {'mode': 'income', 'category_id': 14, 'to_account_id': BANK,
+                        'amount': self._amount(rng, 10000, month, spread=0.8), 'name': 'フリマ売上',
+                        'place': 'メルカリ'}
+            return {'mode': 'income', 'category_id': 19, 'to_account_id': WALLET,
+                    'amount': self._amount(rng, 1000, month), 'name': 'お小遣い'}
+
+        kind = rng.random()
+        if kind < 0.45:
+            return {'mode': 'transfer', 'from_account_id': BANK, 'to_account_id': WALLET,
+                    'amount': rng.choice((10000, 20000, 30000, 50000)), 'name': 'ATM引き出し',
+                    'place': 'セブン銀行ATM'}
+        if kind < 0.75:
+            return {'mode': 'transfer', 'from_account_id': BANK, 'to_account_id': PAYPAY,
+                    'amount': rng.choice((5000, 10000, 20000)), 'name': 'PayPayチャージ'}
+        if kind < 0.95:
+            return {'mode': 'transfer', 'from_account_id': WALLET, 'to_account_id': SUICA,
+                    'amount': rng.choice((3000, 5000, 10000)), 'name': 'Suicaチャージ'}
+        return {'mode': 'transfer', 'from_account_id': BANK, 'to_account_id': POSTAL_BANK,
+                'amount': rng.choice((10000, 50000, 100000)), 'name': '口座振替'}
+
+    def iter_money(self) -> Iterator[Dict[str, Any]]:
+        """
+        取引を日付順に1件ずつ生成（APIの money の記録と同じ形式、IDは1からの連番）
+
+        件数は期間の各日にほぼ均等に割り振り、各日はまず毎月の決まった取引、
+        残りを日々の取引で埋める（1日の件数が決まった取引より少ない日は一部を省く）
+        """
+        rng = random.Random(self.seed)
+        state: Dict[str, Any] = {'card': {}}
+        record_id = 0
+
+        for index in range(self.days):
+            count = (index + 1) * self.records // self.days - index * self.records // self.days
+            if not count:
+                continue
+            day = self.start_date + timedelta(days=index)
+            date_text = day.strftime('%Y-%m-%d')
+
+            entries = self._scheduled(rng, day, state)[:count]
+            while len(entries) < count:
+                entries.append(self._daily(rng, day))
+
+            seconds = sorted(rng.randrange(7 * 3600, 23 * 3600) for _ in entries)
+            for entry, second in zip(entries, seconds):
+                record_id += 1
+                if entry['mode'] == 'payment' and entry.get('from_account_id') == CARD:
+                    state['card'][date_text[:7]] = state['card'].get(date_text[:7], 0) + entry['amount']
+                yield {
+                    'id': record_id,
+                    'mode': entry['mode'],
+                    'user_id': 1,
+                    'date': date_text,
+                    'category_id': entry.get('category_id', 0),
+                    'genre_id': entry.get('genre_id', 0),
+                    'to_account_id': entry.get('to_account_id', 0),
+                    'from_account_id': entry.get('from_account_id', 0),
+                    'amount': entry['amount'],
+                    'comment': entry.get('comment', ''),
+                    'active': 1,
+                    'name': entry.get('name', ''),
+                    'receipt_id': 0,
+                    'place': entry.get('place', ''),
+                    'created': f"{date_text} {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}",
+                    'currency_code': entry.get('currency_code', 'JPY'),
+                }
+
+    def ledger(self) -> FakeLedger:
+        """生成した取引を入れた家計簿（代替サーバーの ledger に渡せる）"""
+        ledger = FakeLedger(categories=self.categories, genres=self.genres, accounts=self.accounts)
+        ledger.load(self.iter_money())
+        return ledger
+
+    def client(self) -> FakeZaimClient:
+        """生成した取引を持つプロセス内のクライアント（HTTPを使わない）"""
+        return FakeZaimClient(self.ledger())
+
+    def write_jsonl(self, out: TextIO, batch_size: int = 10000) -> int:
+        """
+        取引を JSON Lines で書き出す
+
+        Args:
+            out: 出力先
+            batch_size: まとめて書き込む行数
+
+        Returns:
+            書き出した件数
+        """
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        count = 0
+        lines: List[str] = []
+        for record in self.iter_money():
+            lines.append(encode(record))
+            if len(lines) >= batch_size:
+                out.write('\n'.join(lines) + '\n')
+                count += len(lines)
+                lines = []
+        if lines:
+            out.write('\n'.join(lines) + '\n')
+            count += len(lines)
+        return count
+
+def main():
+    """JSON Lines を書き出す"""
+    parser = argparse.ArgumentParser(description='合成家計簿データを JSON Lines で書き出す')
+    parser.add_argument('--records', type=int, default=10000, help='取引の件数')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--days', type=int, default=1095, help='取引を分布させる日数')
+    parser.add_argument('--end-date', help='最後の取引日（YYYY-MM-DD、省略時は今日）')
+    parser.add_argument('--foreign-ratio', type=float, default=0.002, help='米ドル建ての取引の割合')
+    parser.add_argument('--output', help='出力ファイル（省略時は標準出力）')
+    args = parser.parse_args()
+
+    try:
+        end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date() if args.end_date else None
+        generator = LedgerGenerator(records=args.records, seed=args.seed, days=args.days,
+                                    end_date=end_date, foreign_ratio=args.foreign_ratio)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            count = generator.write_jsonl(f)
+        print(f"✅ {count}件の取引を書き出しました: {args.output}", file=sys.stderr)
+    else:
+        generator.write_jsonl(sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
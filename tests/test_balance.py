@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+残高計算テストスクリプト
+BalanceManager の残高計算と期首残高アンカーを tests/fake_server.py のプロセス内クライアントで確認する（API接続不要）
+"""
+
+import sys
+import json
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from tests.fake_server import FakeZaimClient, FakeLedger
+from tests.ledger_generator import LedgerGenerator
+from zaim_client import BalanceManager, AnchorStore
+from zaim_client import balance as balance_module
+
+
+def days_ago(days: int) -> str:
+    """今日から days 日前の日付（YYYY-MM-DD）"""
+    return (date.today() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def sample_ledger() -> FakeLedger:
+    """お財布（1）・銀行（2）・カード（4）・外貨預金（8）の取引を含む家計簿"""
+    ledger = FakeLedger()
+    ledger.load([
+        {'mode': 'income', 'date': days_ago(90), 'amount': 300000, 'category_id': 11, 'to_account_id': 2},
+        {'mode': 'payment', 'date': days_ago(60), 'amount': 1200, 'category_id': 101, 'genre_id': 10101,
+         'from_account_id': 1},
+        {'mode': 'transfer', 'date': days_ago(40), 'amount': 50000, 'from_account_id': 2, 'to_account_id': 1},
+        {'mode': 'payment', 'date': days_ago(20), 'amount': 8000, 'category_id': 102, 'genre_id': 10201,
+         'from_account_id': 1},
+        {'mode': 'income', 'date': days_ago(10), 'amount': 100, 'category_id': 19, 'to_account_id': 8,
+         'currency_code': 'USD'},
+    ])
+    return ledger
+
+
+def temp_anchor_store() -> AnchorStore:
+    """一時ディレクトリのアンカーストア"""
+    return AnchorStore(Path(tempfile.mkdtemp(prefix='zaim-anchors-')) / 'anchors.json')
+
+
+def test_single_scan():
+    """全アカウントの残高を1回の取引スキャンで計算し、アカウントごとの計算と一致するかテスト"""
+    print("=== 一括残高計算テスト ===")
+    try:
+        generator = LedgerGenerator(records=3000, seed=17, days=300, foreign_ratio=0)
+        client = generator.client()
+        manager = BalanceManager(client)
+        account_ids = [account['id'] for account in generator.accounts]
+
+        requests = []
+        client.add_request_observer(lambda request: requests.append(request['endpoint']))
+        balances = manager.calculate_balances(account_ids)
+        scan_requests = requests.count('/home/money')
+
+        # 1ページ100件で全件を1回だけ取得（最後の空ページの確認を含む）
+        if scan_requests > 3000 // 100 + 1:
+            print(f"❌ 取引データの取得が1回のスキャンを超えています: {scan_requests}リクエスト")
+            return False
+
+        for account_id in account_ids:
+            single = BalanceManager(generator.client()).calculate_current_balance(account_id)
+            if balances[account_id] != single:
+                print(f"❌ アカウント{account_id}の残高が一致しません: {balances[account_id]} / {single}")
+                return False
+
+        print(f"✅ {len(account_ids)}アカウントを{scan_requests}リクエストで計算")
+        return True
+
+    except Exception as e:
+        print(f"❌ 一括残高計算テストエラー: {e}")
+        return False
+
+
+def test_transaction_effects():
+    """取引ごとの残高の変動（振替は出金元と入金先の両方）のテスト"""
+    print("\n=== 取引の残高変動テスト ===")
+    try:
+        effects = BalanceManager._transaction_effects
+        cases = [
+            ({'mode': 'income', 'amount': 500, 'to_account_id': 2, 'from_account_id': 0}, [(2, 500)]),
+            ({'mode': 'payment', 'amount': 300, 'from_account_id': 1, 'to_account_id': 0}, [(1, -300)]),
+            ({'mode': 'transfer', 'amount': 1000, 'from_account_id': 2, 'to_account_id': 1}, [(2, -1000), (1, 1000)]),
+            ({'mode': 'transfer', 'amount': 1000, 'from_account_id': 2, 'to_account_id': 2}, [(2, -1000)]),
+            ({'mode': 'payment', 'amount': 300, 'from_account_id': 0}, []),
+        ]
+        for transaction, expected in cases:
+            if effects(transaction) != expected:
+                print(f"❌ {transaction}: {effects(transaction)}（期待値 {expected}）")
+                return False
+
+        print("✅ 取引ごとの残高変動が正しい")
+        return True
+
+    except Exception as e:
+        print(f"❌ 取引の残高変動テストエラー: {e}")
+        return False
+
+
+def test_set_balances():
+    """複数アカウントの一括調整で残高が目標額になるかテスト"""
+    print("\n=== 一括残高調整テスト ===")
+    try:
+        manager = BalanceManager(FakeZaimClient(sample_ledger()))
+        current = manager.calculate_balances([1, 2, 4])
+        targets = {'お財布': 50000, '三井住友銀行': 200000, '楽天カード': current[4][0]}
+
+        results = manager.set_balances(targets, comment='テスト調整', max_workers=3)
+        if [result['action'] for result in results] != ['completed', 'completed', 'no_change']:
+            print(f"❌ 調整結果が想定と異なります: {[result['action'] for result in results]}")
+            return False
+
+        balances = manager.calculate_balances([1, 2, 4])
+        if [balances[account_id][0] for account_id in (1, 2, 4)] != list(targets.values()):
+            print(f"❌ 調整後の残高が目標額と異なります: {balances}")
+            return False
+
+        print("✅ 3アカウントを目標額に調整")
+        return True
+
+    except Exception as e:
+        print(f"❌ 一括残高調整テストエラー: {e}")
+        return False
+
+
+def test_duplicate_targets():
+    """複数の名前が同じアカウントを指す場合に、調整せずにエラーにするかテスト"""
+    print("\n=== 重複する調整対象テスト ===")
+    try:
+        ledger = sample_ledger()
+        manager = BalanceManager(FakeZaimClient(ledger))
+        before = len(ledger.money)
+
+        try:
+            # 「三井住友」「三井住友銀行」はどちらも部分一致で同じアカウントになる
+            manager.set_balances({'三井住友': 100000, 'お財布': 50000, '三井住友銀行': 200000})
+            print("❌ 同じアカウントへの調整がエラーになりません")
+            return False
+        except Exception as e:
+            if '同じアカウント' not in str(e):
+                raise
+
+        if len(ledger.money) != before:
+            print("❌ エラーの前に調整取引が作成されました")
+            return False
+
+        print("✅ 同じアカウントを指す調整対象を実行前に拒否")
+        return True
+
+    except Exception as e:
+        print(f"❌ 重複する調整対象テストエラー: {e}")
+        return False
+
+
+class WatchClock:
+    """watch_balance の「今日」と待機を差し替え、待機のたびに家計簿の変更を適用する"""
+
+    def __init__(self, today: date, steps):
+        """
+        Args:
+            today: 初回計算時の今日
+            steps: 各待機で呼ぶ関数のリスト（戻り値は次の今日、None の場合は変えない）
+        """
+        clock = self
+        self.today = today
+        self.steps = list(steps)
+
+        class FakeDate(date):
+            @classmethod
+            def today(cls):
+                return clock.today
+
+        self.fake_date = FakeDate
+
+    def sleep(self, interval):
+        today = self.steps.pop(0)()
+        if today is not None:
+            self.today = today
+
+    def __enter__(self):
+        self.saved = balance_module.date, balance_module.time
+        balance_module.date = self.fake_date
+        balance_module.time = SimpleNamespace(sleep=self.sleep)
+        return self
+
+    def __exit__(self, *exc_info):
+        balance_module.date, balance_module.time = self.saved
+
+
+def watch_ledger() -> FakeLedger:
+    """お財布（1）の確定期間と直近期間の取引（今日を2024-06-10とする）"""
+    ledger = FakeLedger()
+    ledger.load([
+        {'mode': 'income', 'date': '2024-05-01', 'amount': 100000, 'category_id': 11, 'to_account_id': 1},
+        {'mode': 'payment', 'date': '2024-06-08', 'amount': 1000, 'category_id': 101, 'genre_id': 10101,
+         'from_account_id': 1},
+        {'mode': 'payment', 'date': '2024-06-10', 'amount': 2000, 'category_id': 101, 'genre_id': 10101,
+         'from_account_id': 1},
+    ])
+    return ledger
+
+
+def record_id(ledger: FakeLedger, amount: int) -> int:
+    """金額で取引IDを探す"""
+    return next(record['id'] for record in ledger.query() if record['amount'] == amount)
+
+
+def test_watch_edits_in_window():
+    """直近期間内の取引の追加・編集・削除が次の取り直しで残高に反映されるかテスト"""
+    print("\n=== 残高監視の直近期間の変更テスト ===")
+    try:
+        ledger = watch_ledger()
+        client = FakeZaimClient(ledger)
+        manager = BalanceManager(client)
+
+        def edit():
+            client.update_money(record_id(ledger, 2000), 'payment', 2500, '2024-06-10')
+            client.delete_money(record_id(ledger, 1000), 'payment')
+            client.create_payment(101, 10101, 300, '2024-06-09', from_account_id=1)
+
+        with WatchClock(date(2024, 6, 10), [edit]):
+            polls = list(manager.watch_balance('お財布', overlap_days=3, polls=1))
+            fresh, _ = manager.calculate_current_balance(1)
+
+        balances = [poll['accounts'][0]['balance'] for poll in polls]
+        if balances != [97000, 97200] or fresh != 97200:
+            print(f"❌ 直近期間の変更が反映されません: {balances}（再計算 {fresh}）")
+            return False
+        if polls[1]['changes'] != {1: 200} or polls[0]['changes']:
+            print(f"❌ 変動額が想定と異なります: {[poll['changes'] for poll in polls]}")
+            return False
+        if polls[1]['fetched'] != 2:
+            print(f"❌ 直近期間以外も取り直しています: {polls[1]['fetched']}件")
+            return False
+
+        print("✅ 追加・編集・削除を反映（直近期間の2件だけを取り直し）")
+        return True
+
+    except Exception as e:
+        print(f"❌ 残高監視の直近期間の変更テストエラー: {e}")
+        return False
+
+
+def test_watch_date_rollover():
+    """日付が変わって直近期間から外れた取引を、取り直さずに確定残高へ繰り入れるかテスト"""
+    print("\n=== 残高監視の日付変更テスト ===")
+    try:
+        ledger = watch_ledger()
+        client = FakeZaimClient(ledger)
+        manager = BalanceManager(client)
+
+        def next_days():
+            client.create_payment(101, 10101, 50, '2024-06-13', from_account_id=1)
+            return date(2024, 6, 13)
+
+        with WatchClock(date(2024, 6, 10), [next_days, lambda: None]):
+            polls = list(manager.watch_balance('お財布', overlap_days=3, polls=2))
+            fresh, fresh_count = manager.calculate_current_balance(1)
+
+        # 06-08 の支出は直近期間（06-10〜06-13）から外れ、確定残高に繰り入れられる
+        balances = [poll['accounts'][0]['balance'] for poll in polls]
+        if balances != [97000, 96950, 96950] or fresh != 96950:
+            print(f"❌ 日付変更後の残高が想定と異なります: {balances}（再計算 {fresh}）")
+            return False
+        if [poll['fetched'] for poll in polls] != [2, 2, 2]:
+            print(f"❌ 直近期間の取得件数が想定と異なります: {[poll['fetched'] for poll in polls]}")
+            return False
+        if polls[-1]['accounts'][0]['transaction_count'] != fresh_count:
+            print(f"❌ 繰り入れ後の件数が一致しません: {polls[-1]['accounts'][0]}")
+            return False
+
+        print("✅ 期間外になった取引を確定残高に繰り入れ")
+        return True
+
+    except Exception as e:
+        print(f"❌ 残高監視の日付変更テストエラー: {e}")
+        return False
+
+
+def test_watch_anchor_in_window():
+    """直近期間内のアンカー日以前の取引を、取り直しても日付変更後も数えないかテスト"""
+    print("\n=== 残高監視のアンカーテスト ===")
+    try:
+        ledger = watch_ledger()
+        ledger.load([{'mode': 'payment', 'date': '2024-06-09', 'amount': 300, 'category_id': 101,
+                      'genre_id': 10101, 'from_account_id': 1}])
+        manager = BalanceManager(FakeZaimClient(ledger), anchor_store=temp_anchor_store())
+
+        with WatchClock(date(2024, 6, 10), [lambda: None, lambda: date(2024, 6, 12)]):
+            # アンカー日 06-08 は直近期間（06-07〜06-10）の中
+            manager.set_anchor('お財布', 50000, date(2024, 6, 8))
+            polls = list(manager.watch_balance('お財布', overlap_days=3, polls=2))
+            fresh, _ = manager.calculate_current_balance(1)
+
+        balances = [poll['accounts'][0]['balance'] for poll in polls]
+        if balances != [47700, 47700, 47700] or fresh != 47700:
+            print(f"❌ アンカー日以前の取引が数えられました: {balances}（再計算 {fresh}）")
+            return False
+
+        print("✅ アンカー日の翌日以降の取引だけを集計")
+        return True
+
+    except Exception as e:
+        print(f"❌ 残高監視のアンカーテストエラー: {e}")
+        return False
+
+
+def test_anchor_start_date():
+    """アンカー日の翌日以降の取引だけがアンカー金額に積み上がるかテスト"""
+    print("\n=== アンカーの集計開始日テスト ===")
+    try:
+        manager = BalanceManager(FakeZaimClient(sample_ledger()), anchor_store=temp_anchor_store())
+        # 40日前の振替の日をアンカー日にする（振替は含まず、20日前の支出だけが積み上がる）
+        manager.set_anchor('お財布', 10000, date.today() - timedelta(days=40))
+
+        balance, count = manager.calculate_current_balance(1)
+        if (balance, count) != (2000, 1):
+            print(f"❌ アンカー後の残高が想定と異なります: {balance}円 / {count}件")
+            return False
+
+        print("✅ アンカー日の翌日以降の取引だけを集計")
+        return True
+
+    except Exception as e:
+        print(f"❌ アンカーの集計開始日テストエラー: {e}")
+        return False
+
+
+def test_anchor_keeps_currency():
+    """基準通貨を変えても、アンカーを保存時の通貨建てで扱うかテスト"""
+    print("\n=== アンカーの通貨テスト ===")
+    try:
+        store = temp_anchor_store()
+        manager = BalanceManager(FakeZaimClient(sample_ledger()), anchor_store=store)
+        manager.set_anchor('三井住友銀行', 250000, date.today() - timedelta(days=30))
+
+        if store.get(2)['currency'] != 'JPY':
+            print(f"❌ アンカーに通貨が記録されていません: {store.get(2)}")
+            return False
+
+        manager.set_exchange_rates({'JPY': 0.01}, 'USD')
+        totals, _ = manager.calculate_currency_balances([2])[2]
+        balance, _ = manager.calculate_current_balance(2)
+        if totals != {'JPY': 250000} or balance != 2500:
+            print(f"❌ 円建てのアンカーが基準通貨USDとして扱われました: {totals} → {balance}")
+            return False
+
+        print("✅ 円建てのアンカーを基準通貨USDに換算")
+        return True
+
+    except Exception as e:
+        print(f"❌ アンカーの通貨テストエラー: {e}")
+        return False
+
+
+def test_untagged_records_are_jpy():
+    """通貨コードのない取引を、基準通貨ではなく円として換算するかテスト"""
+    print("\n=== 通貨コードのない取引の換算テスト ===")
+    try:
+        ledger = sample_ledger()
+        # 代替サーバーは通貨コードを補うため、通貨コードのない取引を返すAPIに合わせて取り除く
+        for record in ledger.money.values():
+            if record['currency_code'] == 'JPY':
+                del record['currency_code']
+        manager = BalanceManager(FakeZaimClient(ledger))
+        manager.set_exchange_rates({'JPY': 0.01}, 'USD')
+
+        # 三井住友銀行: 収入300,000円 - 振替50,000円（どちらも通貨コードなし）
+        totals, count = manager.calculate_currency_balances([2])[2]
+        balance, _ = manager.calculate_current_balance(2)
+        if totals != {'JPY': 250000} or count != 2 or balance != 2500:
+            print(f"❌ 通貨コードのない取引が基準通貨USDとして扱われました: {totals} → {balance}")
+            return False
+
+        print("✅ 通貨コードのない取引を円として基準通貨USDに換算")
+        return True
+
+    except Exception as e:
+        print(f"❌ 通貨コードのない取引の換算テストエラー: {e}")
+        return False
+
+
+def test_anchor_save_is_atomic():
+    """保存の失敗で既存のアンカーが壊れないかテスト"""
+    print("\n=== アンカーの保存テスト ===")
+    try:
+        store = temp_anchor_store()
+        store.set(1, 10000, date(2024, 1, 31), 'お財布')
+
+        # 書き込みの途中で失敗させる（保存できない値を含むアンカー）
+        try:
+            store.set(2, object(), date(2024, 1, 31), '三井住友銀行')
+        except TypeError:
+            pass
+
+        saved = json.loads(store.path.read_text(encoding='utf-8'))
+        if saved['anchors'].get('1', {}).get('amount') != 10000:
+            print(f"❌ 既存のアンカーが失われました: {saved}")
+            return False
+        if (store.path.stat().st_mode & 0o777) != 0o600:
+            print(f"❌ ファイル権限が600ではありません: {oct(store.path.stat().st_mode & 0o777)}")
+            return False
+
+        print("✅ 保存に失敗しても既存のアンカーを保持")
+        return True
+
+    except Exception as e:
+        print(f"❌ アンカーの保存テストエラー: {e}")
+        return False
+
+
+def main():
+    """残高計算テストの実行"""
+    print("Zaim API Client - 残高計算テスト")
+    print("=" * 50)
+
+    tests = [
+        test_single_scan,
+        test_transaction_effects,
+        test_set_balances,
+        test_duplicate_targets,
+        test_watch_edits_in_window,
+        test_watch_date_rollover,
+        test_watch_anchor_in_window,
+        test_anchor_start_date,
+        test_anchor_keeps_currency,
+        test_untagged_records_are_jpy,
+        test_anchor_save_is_atomic
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての残高計算テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
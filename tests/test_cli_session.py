@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+CLIセッションテストスクリプト
+デーモン・shell・batch と同じく1プロセスで複数のコマンドを続けて実行し、
+前のコマンドのオプションが後続のコマンドに影響しないことを確認する（tests/fake_server.py を使用、API接続不要）
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from pathlib import Path
+
+from tests.fake_server import FakeZaimServer, FakeLedger
+from tests.ledger_generator import LedgerGenerator
+
+# 実際の ~/.zaim-cli を読み書きしない
+os.environ['HOME'] = tempfile.mkdtemp(prefix='zaim-cli-test-')
+os.environ['ZAIM_CLI_NO_DAEMON'] = '1'
+os.environ.pop('ZAIM_CLI_PROFILE', None)
+
+from zaim_cli import main as cli_main
+from zaim_cli.daemon import DaemonServer, should_forward, forward, request
+
+
+def sample_ledger() -> FakeLedger:
+    """円とドルの取引を含む直近の家計簿（残高計算の既定の期間内）"""
+    def days_ago(days: int) -> str:
+        return (date.today() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+    ledger = FakeLedger()
+    ledger.load([
+        {'mode': 'income', 'date': days_ago(60), 'amount': 300000, 'category_id': 11, 'to_account_id': 2},
+        {'mode': 'payment', 'date': days_ago(50), 'amount': 1200, 'category_id': 101, 'genre_id': 10101,
+         'from_account_id': 1},
+        {'mode': 'transfer', 'date': days_ago(40), 'amount': 50000, 'from_account_id': 2, 'to_account_id': 1},
+        {'mode': 'income', 'date': days_ago(30), 'amount': 100, 'category_id': 19, 'to_account_id': 8,
+         'currency_code': 'USD'},
+        {'mode': 'payment', 'date': days_ago(20), 'amount': 8000, 'category_id': 102, 'genre_id': 10201,
+         'from_account_id': 4},
+    ])
+    return ledger
+
+
+class Session:
+    """代替サーバーに接続し、1プロセスでCLIコマンドを続けて実行する"""
+
+    def __init__(self, server: FakeZaimServer):
+        self.environ = {'ZAIM_API_BASE_URL': server.base_url}
+        self.environ.update({f"ZAIM_{field.upper()}": value
+                             for field, value in server.client_credentials().items()})
+
+    def __enter__(self) -> 'Session':
+        self.saved = {key: os.environ.get(key) for key in self.environ}
+        os.environ.update(self.environ)
+        # 前のセッションのクライアントを引き継がない
+        cli_main.ctx.client = None
+        cli_main.ctx.balance_manager = None
+        return self
+
+    def __exit__(self, *exc_info):
+        for key, value in self.saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        cli_main.ctx.client = None
+        cli_main.ctx.balance_manager = None
+
+    def run(self, *args):
+        """コマンドを実行して (終了コード, 標準出力, 標準エラー出力) を返す"""
+        return cli_main.run_captured(list(args))
+
+
+def test_exchange_rates_are_per_command():
+    """--rates / --base の換算レートが後続のコマンドに残らないかテスト"""
+    print("=== 換算レートの範囲テスト ===")
+    try:
+        rates_file = Path(os.environ['HOME']) / 'rates.yaml'
+        rates_file.write_text("base: JPY\nrates:\n  USD: 150\n", encoding='utf-8')
+
+        with FakeZaimServer(ledger=sample_ledger()) as server, Session(server) as session:
+            _, before, _ = session.run('--json', 'balance', 'show')
+            code, converted, _ = session.run('--json', 'balance', 'show', '--rates', str(rates_file))
+            session.run('--json', 'report', '--by', 'account', '--base', 'USD')
+            _, after, _ = session.run('--json', 'balance', 'show')
+
+        balances = {row['name']: row['balance'] for row in json.loads(converted)}
+        if code != 0 or balances.get('外貨預金（USD）') != 15000:
+            print(f"❌ --rates で換算されていません: {converted}")
+            return False
+        if before != after:
+            print("❌ 前のコマンドの換算レート・基準通貨が残っています")
+            return False
+        if cli_main.ctx.balance_manager is not None:
+            print("❌ セッション終了後もクライアントが残っています")
+            return False
+
+        print("✅ 換算レートはそのコマンドだけに適用されました")
+        return True
+
+    except Exception as e:
+        print(f"❌ 換算レートの範囲テストエラー: {e}")
+        return False
+
+
+def test_export_order_ignores_workers():
+    """money export の出力順が --workers や絞り込みに関わらず同じかテスト"""
+    print("\n=== エクスポートの出力順テスト ===")
+    try:
+        generator = LedgerGenerator(records=3000, seed=7, days=200, end_date=date(2024, 6, 30))
+        export = ['--jsonl', 'money', 'export', '--from', '2023-12-01', '--to', '2024-06-30', '--no-progress']
+
+        with FakeZaimServer(ledger=generator.ledger()) as server, Session(server) as session:
+            _, single, _ = session.run(*export)
+            _, parallel, _ = session.run(*export, '--workers', '4')
+            _, by_mode, _ = session.run(*export, '--mode', 'payment', '--mode', 'income')
+            _, by_mode_parallel, _ = session.run(*export, '--mode', 'payment', '--mode', 'income',
+                                                 '--workers', '3')
+
+        records = [json.loads(line) for line in single.splitlines()]
+        if len(records) != 3000:
+            print(f"❌ エクスポートの件数が想定と異なります: {len(records)}件")
+            return False
+        if [(r['date'], r['id']) for r in records] != sorted(((r['date'], r['id']) for r in records), reverse=True):
+            print("❌ 日付・IDの新しい順になっていません")
+            return False
+        if parallel != single:
+            print("❌ --workers 4 の出力順が --workers 1 と異なります")
+            return False
+        if by_mode != by_mode_parallel:
+            print("❌ 複数モードの絞り込みで --workers により出力順が変わりました")
+            return False
+        expected = [line for line, record in zip(single.splitlines(), records)
+                    if record['mode'] in ('payment', 'income')]
+        if by_mode.splitlines() != expected:
+            print("❌ 複数モードの絞り込みの出力が日付順になっていません")
+            return False
+
+        print(f"✅ {len(records)}件を同じ順で出力")
+        return True
+
+    except Exception as e:
+        print(f"❌ エクスポートの出力順テストエラー: {e}")
+        return False
+
+
+def test_streaming_runs_locally():
+    """逐次出力するコマンドをデーモンに転送しないかテスト"""
+    print("\n=== デーモン転送の判定テスト ===")
+    saved = os.environ.pop('ZAIM_CLI_NO_DAEMON', None)
+    try:
+        cases = {
+            ('--json', 'balance', 'show'): True,
+            ('--json', 'balance', 'show', '--stream'): False,
+            ('--table', 'balance', 'watch'): False,
+            ('--json', 'report', '--by', 'month'): True,
+            ('--jsonl', 'money', 'export', '--from', '2024-01-01'): False,
+            ('money', 'export', '--from', '2024-01-01', '-o', 'money.csv.gz'): True,
+            ('money', 'export', '--from', '2024-01-01', '--output=money.jsonl'): True,
+        }
+        for argv, expected in cases.items():
+            if should_forward(list(argv)) != expected:
+                print(f"❌ {' '.join(argv)}: 転送{'する' if expected else 'しない'}はずです")
+                return False
+
+        print("✅ --stream・balance watch・標準出力への money export はローカルで実行")
+        return True
+
+    except Exception as e:
+        print(f"❌ デーモン転送の判定テストエラー: {e}")
+        return False
+    finally:
+        if saved is not None:
+            os.environ['ZAIM_CLI_NO_DAEMON'] = saved
+
+
+def launch(args, stdin_text):
+    """launcher と同じ判定でデーモンに転送するかローカルで実行し、(終了コード, 標準出力) を返す"""
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin_text)
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            exit_code = forward(args) if should_forward(args) else None
+            if exit_code is None:
+                exit_code = cli_main.invoke_cli(args)
+    finally:
+        sys.stdin = saved_stdin
+    return exit_code, out.getvalue()
+
+
+def test_batch_reads_piped_commands():
+    """デーモンの起動中も、batch が標準入力から渡されたコマンドを実行するかテスト"""
+    print("\n=== batch の標準入力テスト ===")
+    saved = {key: os.environ.get(key) for key in ('ZAIM_CLI_NO_DAEMON', 'ZAIM_CLI_SOCKET')}
+    socket_path = Path(tempfile.mkdtemp(prefix='zaim-daemon-')) / 'daemon.sock'
+    server = DaemonServer(socket_path, cli_main.run_captured)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    try:
+        os.environ.pop('ZAIM_CLI_NO_DAEMON', None)
+        os.environ['ZAIM_CLI_SOCKET'] = str(socket_path)
+
+        if not should_forward(['--json', 'version']):
+            print("❌ デーモンの起動中に通常のコマンドが転送されません")
+            return False
+        for argv in (['batch'], ['--json', 'batch', '-'], ['batch', 'commands.txt', '--stop-on-error']):
+            if should_forward(argv):
+                print(f"❌ {' '.join(argv)}: デーモンに転送されます")
+                return False
+
+        with FakeZaimServer(ledger=sample_ledger()) as fake_server, Session(fake_server):
+            exit_code, output = launch(['--json', 'batch'], "version\n# コメント\n--json account list\n")
+        summary = json.loads(output)
+        if exit_code != 0 or summary['total'] != 2 or summary['succeeded'] != 2:
+            print(f"❌ 標準入力のコマンドが実行されません: total={summary['total']}")
+            return False
+
+        print("✅ batch はローカルで標準入力のコマンドを実行")
+        return True
+
+    except Exception as e:
+        print(f"❌ batch の標準入力テストエラー: {e}")
+        return False
+    finally:
+        request('shutdown', socket_path)
+        thread.join(5)
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def test_batch_echoes_commands_verbatim():
+    """--table の batch が、角括弧を含むコマンドを Rich のマークアップとして解釈せずに表示するかテスト"""
+    print("\n=== batch のコマンド表示テスト ===")
+    try:
+        commands = "version [red]赤[/red]\nversion [/]\n"
+        with FakeZaimServer(ledger=sample_ledger()) as server, Session(server):
+            exit_code, output = launch(['--table', 'batch'], commands)
+
+        if exit_code != 1 or output.count('$ version [red]赤[/red]') != 1 or '$ version [/]' not in output:
+            print(f"❌ コマンドがそのまま表示されません（終了コード {exit_code}）:\n{output}")
+            return False
+
+        print("✅ 角括弧を含むコマンドをそのまま表示")
+        return True
+
+    except Exception as e:
+        print(f"❌ batch のコマンド表示テストエラー: {type(e).__name__} {e}")
+        return False
+
+
+def main():
+    """CLIセッションテストの実行"""
+    print("Zaim API Client - CLIセッションテスト")
+    print("=" * 50)
+
+    tests = [
+        test_exchange_rates_are_per_command,
+        test_export_order_ignores_workers,
+        test_streaming_runs_locally,
+        test_batch_reads_piped_commands,
+        test_batch_echoes_commands_verbatim
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべてのCLIセッションテストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
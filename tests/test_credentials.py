@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+認証情報の解決テストスクリプト
+CredentialChain の取得元の優先順位とトークンファイルのキャッシュを確認する（API接続不要）
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+from zaim_client.credentials import CredentialChain, EnvironmentProvider, TokenFileProvider, default_chain, ENV_VARS
+
+
+# 実行環境の認証情報を使わない
+for variable in ENV_VARS.values():
+    os.environ.pop(variable, None)
+
+CONFIG = {'consumer_key': 'config-key', 'consumer_secret': 'config-secret',
+          'access_token': 'config-token', 'access_token_secret': 'config-token-secret'}
+
+
+def write_token_file(path: Path, token: str, **extra):
+    """ZaimAuthManager と同じ形式のトークンファイルを書き込む"""
+    path.write_text(json.dumps({'access_token': token, 'access_token_secret': token + '-secret', **extra}),
+                    encoding='utf-8')
+
+
+def test_precedence():
+    """明示的な引数 → 環境変数 → トークンファイル → 設定 の順で、組ごとに採用するかテスト"""
+    print("=== 取得元の優先順位テスト ===")
+    try:
+        token_file = Path(tempfile.mkdtemp(prefix='zaim-credentials-')) / 'tokens.json'
+        write_token_file(token_file, 'file-token')
+
+        credentials = default_chain(token_file=token_file, config=CONFIG).resolve()
+        if (credentials.consumer_key, credentials.access_token) != ('config-key', 'file-token') or \
+                credentials.sources != {'consumer': 'config', 'access': 'token_file'}:
+            print(f"❌ トークンファイルと設定の組み合わせが想定と異なります: {credentials}")
+            return False
+
+        # 片方だけの環境変数は採用せず、別の取得元の値と混ぜない
+        os.environ['ZAIM_CONSUMER_KEY'] = 'env-key'
+        try:
+            credentials = default_chain(token_file=token_file, config=CONFIG).resolve()
+            if (credentials.consumer_key, credentials.consumer_secret) != ('config-key', 'config-secret'):
+                print(f"❌ 環境変数と設定の値が混ざりました: {credentials.consumer_key}")
+                return False
+
+            os.environ['ZAIM_CONSUMER_SECRET'] = 'env-secret'
+            credentials = default_chain(token_file=token_file, config=CONFIG).resolve()
+            if credentials.sources != {'consumer': 'env', 'access': 'token_file'}:
+                print(f"❌ 環境変数が優先されません: {credentials.sources}")
+                return False
+
+            credentials = default_chain(access_token='arg-token', access_token_secret='arg-secret',
+                                        token_file=token_file, config=CONFIG).resolve()
+            if credentials.access_token != 'arg-token' or credentials.sources['access'] != 'explicit':
+                print(f"❌ 明示的な引数が優先されません: {credentials.sources}")
+                return False
+
+            credentials = default_chain(token_file=token_file, config=CONFIG, env_fields=[]).resolve()
+            if credentials.sources['consumer'] != 'config':
+                print("❌ env_fields=[] でも環境変数が使われました")
+                return False
+        finally:
+            os.environ.pop('ZAIM_CONSUMER_KEY', None)
+            os.environ.pop('ZAIM_CONSUMER_SECRET', None)
+
+        try:
+            default_chain(token_file=token_file).resolve()
+            print("❌ コンシューマーキーがなくてもエラーになりません")
+            return False
+        except ValueError:
+            pass
+
+        print("✅ 取得元を優先順に、組ごとに採用")
+        return True
+
+    except Exception as e:
+        print(f"❌ 取得元の優先順位テストエラー: {e}")
+        return False
+
+
+def test_caching():
+    """同じ認証情報では同じオブジェクトを返し、トークンファイルの更新を反映するかテスト"""
+    print("\n=== 認証情報のキャッシュテスト ===")
+    try:
+        token_file = Path(tempfile.mkdtemp(prefix='zaim-credentials-')) / 'tokens.json'
+        write_token_file(token_file, 'first-token', verified_at=1700000000.0, user_info={'id': 1})
+
+        environ = {'ZAIM_CONSUMER_KEY': 'env-key', 'ZAIM_CONSUMER_SECRET': 'env-secret'}
+        chain = CredentialChain([EnvironmentProvider(environ=environ), TokenFileProvider(token_file)])
+        first = chain.resolve()
+        if chain.resolve() is not first or first.signer is not chain.resolve().signer:
+            print("❌ 同じ認証情報で別のオブジェクトが返りました")
+            return False
+        if first.verification != (1700000000.0, {'id': 1}):
+            print(f"❌ 保存された確認結果が引き継がれません: {first.verification}")
+            return False
+
+        # 読み込み済みのファイルは、変更されるまで読み直さない
+        cached = TokenFileProvider(token_file).read()
+        if TokenFileProvider(token_file).read() is not cached:
+            print("❌ 変更のないトークンファイルが読み直されました")
+            return False
+
+        write_token_file(token_file, 'second-token-with-longer-value')
+        second = chain.resolve()
+        if second is first or second.access_token != 'second-token-with-longer-value' or second.verification:
+            print(f"❌ トークンファイルの更新が反映されません: {second.access_token}")
+            return False
+
+        token_file.unlink()
+        try:
+            chain.resolve()
+            print("❌ トークンファイルを削除しても解決できました")
+            return False
+        except ValueError:
+            pass
+
+        print("✅ 同じ認証情報を再利用し、ファイルの更新を反映")
+        return True
+
+    except Exception as e:
+        print(f"❌ 認証情報のキャッシュテストエラー: {e}")
+        return False
+
+
+def main():
+    """認証情報の解決テストの実行"""
+    print("Zaim API Client - 認証情報の解決テスト")
+    print("=" * 50)
+
+    tests = [
+        test_precedence,
+        test_caching
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての認証情報の解決テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
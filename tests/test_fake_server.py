@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+代替サーバーテストスクリプト
+ZaimClient を tests/fake_server.py の代替サーバーに接続し、CRUD・ページング・署名検証・
+エラー注入・レート制限・スレッドごとのセッションを確認する（API接続不要、実データを作成しない）
+"""
+
+import sys
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.fake_server import FakeZaimServer, FakeLedger
+from zaim_client import ZaimClient
+
+
+def make_client(server: FakeZaimServer, **overrides) -> ZaimClient:
+    """代替サーバーに接続するクライアント"""
+    credentials = {**server.client_credentials(), **overrides}
+    return ZaimClient(base_url=server.base_url, **credentials)
+
+
+def test_crud():
+    """作成・取得・更新・削除のテスト"""
+    print("=== CRUD テスト ===")
+    try:
+        with FakeZaimServer() as server:
+            client = make_client(server)
+
+            payment = client.create_payment(category_id=101, genre_id=10101, amount=1500,
+                                            date='2024-01-31', from_account_id=1, comment='テスト')
+            income = client.create_income(category_id=11, amount=300000, date='2024-01-25', to_account_id=2)
+            transfer = client.create_transfer(amount=50000, date='2024-01-26', from_account_id=2, to_account_id=1)
+
+            records = client.get_money(limit=100)['money']
+            if [r['id'] for r in records] != [payment['money']['id'], transfer['money']['id'], income['money']['id']]:
+                print(f"❌ 取得結果が日付の新しい順ではありません: {records}")
+                return False
+
+            client.update_money(payment['money']['id'], 'payment', amount=1800, date='2024-01-31')
+            updated = client.get_money(mode='payment')['money'][0]
+            if updated['amount'] != 1800 or updated['comment'] != 'テスト':
+                print(f"❌ 更新が反映されていません: {updated}")
+                return False
+
+            client.delete_money(income['money']['id'], 'income')
+            if len(client.get_money()['money']) != 2:
+                print("❌ 削除が反映されていません")
+                return False
+
+        print("✅ 作成・取得・更新・削除が成功")
+        return True
+
+    except Exception as e:
+        print(f"❌ CRUD テストエラー: {e}")
+        return False
+
+
+def test_pagination_and_filters():
+    """ページングと絞り込みのテスト"""
+    print("\n=== ページング・絞り込みテスト ===")
+    try:
+        ledger = FakeLedger()
+        ledger.load({'mode': 'payment' if i % 3 else 'income', 'date': f"2024-{i % 12 + 1:02d}-15",
+                     'amount': 100 + i, 'category_id': 101 if i % 3 else 11, 'genre_id': 10101 if i % 3 else 0,
+                     'from_account_id': 1 if i % 3 else 0, 'to_account_id': 0 if i % 3 else 2}
+                    for i in range(250))
+
+        with FakeZaimServer(ledger=ledger) as server:
+            client = make_client(server)
+
+            pages = list(client.iter_money_pages(limit=100))
+            if [len(page) for page in pages] != [100, 100, 50]:
+                print(f"❌ ページの件数が想定と異なります: {[len(page) for page in pages]}")
+                return False
+
+            income = [r for page in client.iter_money_pages(mode='income') for r in page]
+            if len(income) != 84 or any(r['mode'] != 'income' for r in income):
+                print(f"❌ mode の絞り込みが正しくありません: {len(income)}件")
+                return False
+
+            march = client.get_money(start_date='2024-03-01', end_date='2024-03-31', limit=100)['money']
+            if not march or any(r['date'] != '2024-03-15' for r in march):
+                print("❌ 日付の絞り込みが正しくありません")
+                return False
+
+        print("✅ ページング・絞り込みが成功")
+        return True
+
+    except Exception as e:
+        print(f"❌ ページング・絞り込みテストエラー: {e}")
+        return False
+
+
+def test_signature_verification():
+    """署名検証のテスト（通常の署名・高速署名は通り、誤った鍵は401）"""
+    print("\n=== 署名検証テスト ===")
+    try:
+        with FakeZaimServer() as server:
+            make_client(server).verify_user()
+            make_client(server, fast_signer=True).get_money(mode='payment', start_date='2024-01-01')
+
+            try:
+                make_client(server, access_token_secret='wrong-secret').verify_user()
+                print("❌ 誤った署名が受け付けられました")
+                return False
+            except Exception as e:
+                if '401' not in str(e):
+                    print(f"❌ 401 以外のエラーになりました: {e}")
+                    return False
+
+        print("✅ 正しい署名のみ受け付けられました")
+        return True
+
+    except Exception as e:
+        print(f"❌ 署名検証テストエラー: {e}")
+        return False
+
+
+def test_error_injection_and_rate_limit():
+    """エラー注入とレート制限のテスト"""
+    print("\n=== エラー注入・レート制限テスト ===")
+    try:
+        with FakeZaimServer() as server:
+            client = make_client(server)
+            server.inject_errors(503)
+            try:
+                client.get_money()
+                print("❌ 注入したエラーが返されませんでした")
+                return False
+            except Exception as e:
+                if '503' not in str(e):
+                    print(f"❌ 注入したエラーと異なります: {e}")
+                    return False
+            client.get_money()
+
+        with FakeZaimServer(rate_limit=1, rate_burst=3) as server:
+            client = make_client(server)
+            statuses = []
+            for _ in range(5):
+                try:
+                    client.get_money()
+                    statuses.append(200)
+                except Exception as e:
+                    statuses.append(429 if '429' in str(e) else None)
+            if statuses != [200, 200, 200, 429, 429]:
+                print(f"❌ レート制限が想定と異なります: {statuses}")
+                return False
+
+        print("✅ エラー注入・レート制限が機能")
+        return True
+
+    except Exception as e:
+        print(f"❌ エラー注入・レート制限テストエラー: {e}")
+        return False
+
+
+def test_session_per_thread():
+    """ZaimClient がワーカースレッドごとに別の HTTP セッションを使うかテスト"""
+    print("\n=== スレッドごとのセッションテスト ===")
+    try:
+        ledger = FakeLedger()
+        ledger.load({'mode': 'payment', 'date': f'2024-03-{day:02d}', 'amount': day * 100, 'category_id': 101,
+                     'genre_id': 10101, 'from_account_id': 1} for day in range(1, 29))
+
+        with FakeZaimServer(ledger=ledger, latency=0.005) as server:
+            client = make_client(server)
+
+            def fetch(day: int):
+                date = f'2024-03-{day:02d}'
+                money = client.get_money(start_date=date, end_date=date)['money']
+                return client.session, [record['amount'] for record in money]
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(fetch, range(1, 29)))
+
+            if any(amounts != [day * 100] for day, (_, amounts) in zip(range(1, 29), results)):
+                print("❌ 並行リクエストの結果が日付と一致しません")
+                return False
+            sessions = {id(session) for session, _ in results}
+            if client.session is not client.session or id(client.session) in sessions or len(sessions) > 4:
+                print(f"❌ スレッドごとにセッションが分かれていません: {len(sessions)}個")
+                return False
+
+            # 明示的に渡したセッションはそのまま使う（スレッド間で共有しないのは呼び出し側の責任）
+            session = requests.Session()
+            if make_client(server, session=session).session is not session:
+                print("❌ 指定したセッションが使われません")
+                return False
+
+        print(f"✅ {len(sessions)}スレッドがそれぞれのセッションで取得")
+        return True
+
+    except Exception as e:
+        print(f"❌ スレッドごとのセッションテストエラー: {e}")
+        return False
+
+
+def main():
+    """代替サーバーテストの実行"""
+    print("Zaim API Client - 代替サーバーテスト")
+    print("=" * 50)
+
+    tests = [
+        test_crud,
+        test_pagination_and_filters,
+        test_signature_verification,
+        test_error_injection_and_rate_limit,
+        test_session_per_thread
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての代替サーバーテストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
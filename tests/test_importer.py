@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+明細取り込みテストスクリプト
+StatementImporter の金額・行の変換と、代替サーバーへの登録結果の順序を確認する（tests/fake_server.py を使用、API接続不要）
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from tests.fake_server import FakeZaimServer, FakeLedger, DEFAULT_CATEGORIES, DEFAULT_GENRES, DEFAULT_ACCOUNTS
+from zaim_client import ZaimClient
+from zaim_client.importer import StatementImporter, NameResolver, parse_amount
+
+
+MAPPING = {
+    'date_format': '%Y/%m/%d',
+    'account': '三井住友銀行',
+    'columns': {'date': '日付', 'place': '摘要', 'withdrawal': 'お引出し', 'deposit': 'お預入れ'},
+    'defaults': {'payment': {'category': 'その他', 'genre': 'その他'}, 'income': {'category': 'その他'}},
+    'rules': [
+        {'match': 'セブン|ローソン', 'category': '食費', 'genre': '食料品'},
+        {'match': 'カード引落', 'mode': 'transfer', 'transfer_account': '楽天カード'},
+        {'match': '利息', 'skip': True},
+    ],
+}
+
+
+def make_resolver() -> NameResolver:
+    """代替サーバーの既定のマスターデータで名前を解決する"""
+    return NameResolver(DEFAULT_CATEGORIES, DEFAULT_GENRES, DEFAULT_ACCOUNTS)
+
+
+def row(date='2024/04/01', place='', withdrawal='', deposit=''):
+    """明細の1行"""
+    return {'日付': date, '摘要': place, 'お引出し': withdrawal, 'お預入れ': deposit}
+
+
+def test_parse_amount():
+    """明細の金額表記の変換テスト"""
+    print("=== 金額表記の変換テスト ===")
+    try:
+        cases = {'1,234': 1234, '¥1,234': 1234, '￥1,234円': 1234, '-1,234': -1234, '△1,234': -1234,
+                 '▲500': -500, '(1,234)': -1234, ' 99.5 ': 100, '': None, '  ': None, None: None}
+        for text, expected in cases.items():
+            if parse_amount(text) != expected:
+                print(f"❌ {text!r}: {parse_amount(text)}（期待値 {expected}）")
+                return False
+
+        try:
+            parse_amount('12a')
+            print("❌ 解釈できない金額がエラーになりません")
+            return False
+        except ValueError:
+            pass
+
+        print("✅ 金額表記を変換")
+        return True
+
+    except Exception as e:
+        print(f"❌ 金額表記の変換テストエラー: {e}")
+        return False
+
+
+def test_map_row():
+    """ルール・出金入金列・既定値による変換のテスト"""
+    print("\n=== 明細行の変換テスト ===")
+    try:
+        importer = StatementImporter(None, MAPPING, make_resolver())
+
+        payment = importer.map_row(row(place='セブンイレブン', withdrawal='1,280'))
+        if (payment['mode'], payment['params']['category_id'], payment['params']['genre_id'],
+                payment['params']['from_account_id'], payment['amount']) != ('payment', 101, 10101, 2, 1280):
+            print(f"❌ 支出の変換が想定と異なります: {payment}")
+            return False
+
+        transfer = importer.map_row(row(place='カード引落', withdrawal='45,000'))
+        if (transfer['mode'], transfer['params']['from_account_id'], transfer['params']['to_account_id']) != \
+                ('transfer', 2, 4):
+            print(f"❌ 振替の変換が想定と異なります: {transfer}")
+            return False
+
+        income = importer.map_row(row(date='2024/04/25', place='給与', deposit='300,000'))
+        if (income['mode'], income['date'], income['params']['category_id'], income['params']['to_account_id']) != \
+                ('income', '2024-04-25', 19, 2):
+            print(f"❌ 収入の変換が想定と異なります: {income}")
+            return False
+
+        if not importer.map_row(row(place='普通預金利息', deposit='3')).get('skip'):
+            print("❌ skip ルールの行が読み飛ばされません")
+            return False
+
+        for bad in (row(place='ATM'), row(date='4月1日', withdrawal='100'), row(withdrawal='0')):
+            try:
+                importer.map_row(bad)
+                print(f"❌ 変換できない行がエラーになりません: {bad}")
+                return False
+            except ValueError:
+                pass
+
+        print("✅ 明細行を取引データに変換")
+        return True
+
+    except Exception as e:
+        print(f"❌ 明細行の変換テストエラー: {e}")
+        return False
+
+
+def test_run_keeps_line_order():
+    """並行登録しても結果が明細の行順に返り、家計簿に登録されるかテスト"""
+    print("\n=== 並行登録の結果順テスト ===")
+    try:
+        lines = ['日付,摘要,お引出し,お預入れ']
+        for index in range(40):
+            if index % 10 == 3:
+                lines.append(f'2024/04/{index % 28 + 1:02d},普通預金利息,,3')
+            elif index % 10 == 7:
+                lines.append(f'2024/04/{index % 28 + 1:02d},不明な日付,abc,')
+            else:
+                lines.append(f'2024/04/{index % 28 + 1:02d},ローソン {index},{100 + index},')
+        statement = Path(tempfile.mkdtemp(prefix='zaim-import-')) / 'statement.csv'
+        statement.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+        ledger = FakeLedger()
+        # 応答時間をばらつかせ、完了順が送信順と異なるようにする
+        with FakeZaimServer(ledger=ledger, latency=0.005, jitter=0.02, seed=3) as server:
+            client = ZaimClient(base_url=server.base_url, **server.client_credentials())
+            importer = StatementImporter(client, MAPPING, make_resolver(), max_workers=6, rate=0)
+            results = list(importer.run(str(statement)))
+
+        if [result['line'] for result in results] != list(range(2, 42)):
+            print(f"❌ 結果が行順ではありません: {[result['line'] for result in results]}")
+            return False
+
+        statuses = [result['status'] for result in results]
+        expected = ['skipped' if i % 10 == 3 else 'error' if i % 10 == 7 else 'created' for i in range(40)]
+        if statuses != expected:
+            print(f"❌ 行ごとの結果が想定と異なります: {statuses}")
+            return False
+
+        created = {result['transaction_id'] for result in results if result['status'] == 'created'}
+        stored = {record['id']: record for record in ledger.query()}
+        if created != set(stored) or any(record['category_id'] != 101 for record in stored.values()):
+            print("❌ 登録された取引が結果と一致しません")
+            return False
+
+        print(f"✅ {len(created)}件を登録し、結果を行順に出力")
+        return True
+
+    except Exception as e:
+        print(f"❌ 並行登録の結果順テストエラー: {e}")
+        return False
+
+
+def main():
+    """明細取り込みテストの実行"""
+    print("Zaim API Client - 明細取り込みテスト")
+    print("=" * 50)
+
+    tests = [
+        test_parse_amount,
+        test_map_row,
+        test_run_keeps_line_order
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての明細取り込みテストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+合成家計簿データテストスクリプト
+LedgerGenerator の再現性・件数・取引の内訳と、生成データでの BalanceManager の残高計算を確認する（API接続不要）
+"""
+
+import io
+import sys
+from collections import Counter
+from datetime import date
+
+from tests.ledger_generator import LedgerGenerator
+from zaim_client.balance import BalanceManager
+
+
+END_DATE = date(2024, 12, 31)
+
+
+def test_deterministic():
+    """同じシードで同じデータ、異なるシードで異なるデータになるかテスト"""
+    print("=== 再現性テスト ===")
+    try:
+        def render(seed):
+            out = io.StringIO()
+            LedgerGenerator(records=5000, seed=seed, end_date=END_DATE).write_jsonl(out)
+            return out.getvalue()
+
+        first, again, other = render(1), render(1), render(2)
+        if first != again:
+            print("❌ 同じシードで異なるデータが生成されました")
+            return False
+        if first == other:
+            print("❌ 異なるシードで同じデータが生成されました")
+            return False
+
+        print("✅ シードごとに同じデータを生成")
+        return True
+
+    except Exception as e:
+        print(f"❌ 再現性テストエラー: {e}")
+        return False
+
+
+def test_shape():
+    """件数・日付順・取引の内訳のテスト"""
+    print("\n=== 件数・内訳テスト ===")
+    try:
+        generator = LedgerGenerator(records=20000, seed=3, days=366, end_date=END_DATE)
+        records = list(generator.iter_money())
+
+        if len(records) != 20000 or [r['id'] for r in records] != list(range(1, 20001)):
+            print(f"❌ 件数またはIDが想定と異なります: {len(records)}件")
+            return False
+        if any(a['date'] > b['date'] for a, b in zip(records, records[1:])):
+            print("❌ 取引が日付順ではありません")
+            return False
+        if records[0]['date'] != '2024-01-01' or records[-1]['date'] != '2024-12-31':
+            print(f"❌ 期間が想定と異なります: {records[0]['date']}〜{records[-1]['date']}")
+            return False
+
+        modes = Counter(r['mode'] for r in records)
+        if not (0.8 < modes['payment'] / len(records) < 0.95 and modes['income'] and modes['transfer']):
+            print(f"❌ 取引の内訳が想定と異なります: {dict(modes)}")
+            return False
+
+        salaries = [r for r in records if r['mode'] == 'income' and r['category_id'] == 11]
+        if len(salaries) != 12 or any(not r['date'].endswith('-25') for r in salaries):
+            print(f"❌ 給与の取引が毎月25日にありません: {len(salaries)}件")
+            return False
+
+        genre_ids = {genre['id'] for genre in generator.genres}
+        if any(r['mode'] == 'payment' and r['genre_id'] not in genre_ids for r in records):
+            print("❌ マスターデータにないジャンルの取引があります")
+            return False
+
+        print(f"✅ 20000件を生成: {dict(modes)}")
+        return True
+
+    except Exception as e:
+        print(f"❌ 件数・内訳テストエラー: {e}")
+        return False
+
+
+def test_balance_matches():
+    """生成データでの BalanceManager の残高が取引から直接集計した値と一致するかテスト"""
+    print("\n=== 残高計算テスト ===")
+    try:
+        generator = LedgerGenerator(records=10000, seed=5, days=300, foreign_ratio=0)
+        expected = Counter()
+        for record in generator.iter_money():
+            if record['mode'] in ('payment', 'transfer') and record['from_account_id']:
+                expected[record['from_account_id']] -= record['amount']
+            if record['mode'] in ('income', 'transfer') and record['to_account_id']:
+                expected[record['to_account_id']] += record['amount']
+
+        result = BalanceManager(generator.client()).show_balance()
+        actual = {account['id']: account['balance'] for account in result['accounts']}
+        mismatched = {account_id: (actual.get(account_id), amount)
+                      for account_id, amount in expected.items() if actual.get(account_id) != amount}
+        if mismatched:
+            print(f"❌ 残高が一致しません（計算値, 期待値）: {mismatched}")
+            return False
+
+        print(f"✅ {len(actual)}口座の残高が一致")
+        return True
+
+    except Exception as e:
+        print(f"❌ 残高計算テストエラー: {e}")
+        return False
+
+
+def main():
+    """合成家計簿データテストの実行"""
+    print("Zaim API Client - 合成家計簿データテスト")
+    print("=" * 50)
+
+    tests = [
+        test_deterministic,
+        test_shape,
+        test_balance_matches
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての合成家計簿データテストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
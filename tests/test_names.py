@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+名前インデックステストスクリプト
+シェル補完用の NameIndex の保存・補完候補と fast_complete の出力を確認する（API接続不要）
+"""
+
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+# 実際の ~/.zaim-cli を読み書きしない
+os.environ['HOME'] = tempfile.mkdtemp(prefix='zaim-cli-test-')
+os.environ.pop('ZAIM_CLI_PROFILE', None)
+
+from tests.fake_server import DEFAULT_ACCOUNTS, DEFAULT_CATEGORIES
+from zaim_cli.names import NameIndex, default_index_path, fast_complete
+
+
+def test_update():
+    """マスターデータでの更新と、内容が変わらない場合に書き込まないかテスト"""
+    print("=== インデックス更新テスト ===")
+    try:
+        index = NameIndex(default_index_path('names-test'))
+        if index.entries('accounts') != []:
+            print("❌ 存在しないインデックスが空になりません")
+            return False
+
+        if not index.update(accounts=DEFAULT_ACCOUNTS, categories=DEFAULT_CATEGORIES):
+            print("❌ 初回の更新で書き込まれません")
+            return False
+        if index.update(accounts=DEFAULT_ACCOUNTS):
+            print("❌ 内容が同じでも書き込まれました")
+            return False
+
+        names = [item['name'] for item in index.entries('accounts')]
+        if names != [account['name'] for account in DEFAULT_ACCOUNTS] or \
+                len(index.entries('categories')) != len(DEFAULT_CATEGORIES):
+            print(f"❌ 保存された名前が想定と異なります: {names}")
+            return False
+        if (index.path.stat().st_mode & 0o777) != 0o600 or index.path.with_name('names.json.tmp').exists():
+            print("❌ ファイル権限が600ではないか、一時ファイルが残っています")
+            return False
+
+        index.path.write_text('{壊れたJSON', encoding='utf-8')
+        if index.load() != {}:
+            print("❌ 壊れたインデックスが空として扱われません")
+            return False
+
+        print("✅ 変更があるときだけ置き換えで保存")
+        return True
+
+    except Exception as e:
+        print(f"❌ インデックス更新テストエラー: {e}")
+        return False
+
+
+def test_complete():
+    """アカウント名・IDオプションの補完候補と、判断できない場合に click に任せるかテスト"""
+    print("\n=== 補完候補テスト ===")
+    try:
+        index = NameIndex(default_index_path('names-test'))
+        index.update(accounts=DEFAULT_ACCOUNTS, categories=DEFAULT_CATEGORIES, genres=[])
+
+        cases = [
+            ((['balance', 'show'], 'お'), [('お財布', None)]),
+            ((['--profile-name', 'work', '--profile-output', 'profile.json', 'balance', 'set'], 'ゆう'),
+             [('ゆうちょ銀行', None)]),
+            ((['balance', 'anchor', 'set'], 'SBI'), [('SBI証券', None)]),
+            ((['report', '--category-id'], '10'),
+             [(str(item['id']), item['name']) for item in DEFAULT_CATEGORIES if str(item['id']).startswith('10')]),
+            ((['balance', 'show'], '--'), None),
+            ((['money', 'list'], ''), None),
+        ]
+        for (args, incomplete), expected in cases:
+            actual = index.complete(args, incomplete)
+            if actual != expected:
+                print(f"❌ {' '.join(args)} {incomplete!r}: {actual}（期待値 {expected}）")
+                return False
+
+        print("✅ インデックスから補完候補を作成")
+        return True
+
+    except Exception as e:
+        print(f"❌ 補完候補テストエラー: {e}")
+        return False
+
+
+def test_fast_complete():
+    """補完要求への応答形式と、補完要求でない場合に応答しないかテスト"""
+    print("\n=== 高速補完テスト ===")
+    try:
+        NameIndex(default_index_path('names-test')).update(accounts=DEFAULT_ACCOUNTS)
+
+        environ = {'_ZAIM_CLI_COMPLETE': 'bash_complete',
+                   'COMP_WORDS': 'zaim-cli --profile-name names-test balance show 楽天', 'COMP_CWORD': '5'}
+        out = io.StringIO()
+        with redirect_stdout(out):
+            handled = fast_complete(environ)
+        if not handled or out.getvalue() != 'plain,楽天カード\n':
+            print(f"❌ bash への応答が想定と異なります: {out.getvalue()!r}")
+            return False
+
+        for environ in ({}, {'_ZAIM_CLI_COMPLETE': 'bash_source'},
+                        {'_ZAIM_CLI_COMPLETE': 'bash_complete', 'COMP_WORDS': 'zaim-cli money list ',
+                         'COMP_CWORD': '3'}):
+            with redirect_stdout(io.StringIO()):
+                if fast_complete(environ):
+                    print(f"❌ click に任せるべき要求に応答しました: {environ}")
+                    return False
+
+        print("✅ インデックスだけで補完要求に応答")
+        return True
+
+    except Exception as e:
+        print(f"❌ 高速補完テストエラー: {e}")
+        return False
+
+
+def main():
+    """名前インデックステストの実行"""
+    print("Zaim API Client - 名前インデックステスト")
+    print("=" * 50)
+
+    tests = [
+        test_update,
+        test_complete,
+        test_fast_complete
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての名前インデックステストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+CLI出力テストスクリプト
+RowWriter と PlainTableWriter の出力を確認する（API接続不要）
+"""
+
+import io
+import csv
+import sys
+import json
+from contextlib import redirect_stdout
+
+from zaim_cli.output import RowWriter, PlainTableWriter
+
+
+ROWS = [
+    {'id': 1, 'name': 'お財布', 'balance': 12000, 'currency_balances': {'JPY': 12000}},
+    {'id': 2, 'name': 'Bank, "main"', 'balance': -500, 'currency_balances': {'JPY': -300, 'USD': -2}},
+    {'id': 3, 'name': '改行\nを含む', 'balance': 0, 'currency_balances': {}},
+]
+
+
+def render(output_format, rows, headers=None):
+    """RowWriter の出力を文字列で取得"""
+    out = io.StringIO()
+    RowWriter(output_format, headers, stream=out).write_all(rows)
+    return out.getvalue()
+
+
+class BrokenPipe(io.StringIO):
+    """書き込むとパイプが閉じられたときと同じエラーになる出力先"""
+
+    def write(self, text):
+        raise BrokenPipeError()
+
+
+def test_json_matches_dumps():
+    """逐次出力した JSON 配列が json.dumps の出力と一致するかテスト"""
+    print("=== JSON出力の一致テスト ===")
+    try:
+        for rows in (ROWS, ROWS[:1], []):
+            expected = json.dumps(rows, ensure_ascii=False, indent=2) + '\n'
+            actual = render('json', iter(rows))
+            if actual != expected:
+                print(f"❌ {len(rows)}行の出力が json.dumps と異なります:\n{actual}")
+                return False
+
+        jsonl = render('jsonl', ROWS)
+        if [json.loads(line) for line in jsonl.splitlines()] != ROWS:
+            print(f"❌ JSONL の出力が元の行と異なります:\n{jsonl}")
+            return False
+
+        print("✅ JSON・JSONL の出力が一致")
+        return True
+
+    except Exception as e:
+        print(f"❌ JSON出力の一致テストエラー: {e}")
+        return False
+
+
+def test_csv_output():
+    """CSVの列・エスケープ・0件のヘッダー行のテスト"""
+    print("\n=== CSV出力テスト ===")
+    try:
+        headers = ['id', 'name', 'balance']
+        parsed = list(csv.DictReader(io.StringIO(render('csv', ROWS, headers))))
+        if [row['name'] for row in parsed] != [row['name'] for row in ROWS] or list(parsed[0]) != headers:
+            print(f"❌ CSVの内容が元の行と異なります: {parsed}")
+            return False
+
+        if render('csv', [], headers) != 'id,name,balance\n':
+            print(f"❌ 0件でヘッダー行が出力されません: {render('csv', [], headers)!r}")
+            return False
+        if render('csv', []) != '':
+            print("❌ 列が不明な0件の出力が空ではありません")
+            return False
+
+        print("✅ CSVを出力（0件でもヘッダー行あり）")
+        return True
+
+    except Exception as e:
+        print(f"❌ CSV出力テストエラー: {e}")
+        return False
+
+
+def test_broken_pipe():
+    """出力先のパイプが閉じられた場合に終了コード1で静かに終了するかテスト"""
+    print("\n=== パイプ切断テスト ===")
+    try:
+        for output_format in ('csv', 'json', 'jsonl'):
+            try:
+                # 標準出力を付け替えても、このテストの表示には影響しない
+                with redirect_stdout(io.StringIO()):
+                    RowWriter(output_format, stream=BrokenPipe()).write_all(ROWS)
+                print(f"❌ {output_format}: パイプ切断で終了しませんでした")
+                return False
+            except SystemExit as e:
+                if e.code != 1:
+                    print(f"❌ {output_format}: 終了コードが1ではありません: {e.code}")
+                    return False
+
+        print("✅ パイプ切断で終了コード1")
+        return True
+
+    except Exception as e:
+        print(f"❌ パイプ切断テストエラー: {type(e).__name__} {e}")
+        return False
+
+
+def test_plain_table():
+    """プレーンテキストのテーブルの列幅（全角文字）と、イテレータで渡した場合の出力のテスト"""
+    print("\n=== プレーンテキストのテーブルテスト ===")
+    try:
+        columns = [('アカウント名', 'left'), ('残高', 'right')]
+        rows = [['お財布', '12,000円'], ['Bank', '-500円'], ['ゆうちょ銀行', '0円']]
+
+        lines = list(PlainTableWriter(columns, 'psql', title='残高').iter_lines(rows))
+        expected = [
+            '残高',
+            '+--------------+----------+',
+            '| アカウント名 |     残高 |',
+            '|--------------+----------|',
+            '| お財布       | 12,000円 |',
+            '| Bank         |   -500円 |',
+            '| ゆうちょ銀行 |      0円 |',
+            '+--------------+----------+',
+        ]
+        if lines != expected:
+            print("❌ psql 形式の出力が想定と異なります:\n" + '\n'.join(lines))
+            return False
+
+        for style in ('plain', 'simple', 'github', 'psql'):
+            writer = PlainTableWriter(columns, style)
+            if list(writer.iter_lines(rows)) != list(writer.iter_lines(iter(rows))):
+                print(f"❌ {style}: リストとイテレータで出力が異なります")
+                return False
+
+        print("✅ 全角文字を含む列幅で描画")
+        return True
+
+    except Exception as e:
+        print(f"❌ プレーンテキストのテーブルテストエラー: {e}")
+        return False
+
+
+def main():
+    """CLI出力テストの実行"""
+    print("Zaim API Client - CLI出力テスト")
+    print("=" * 50)
+
+    tests = [
+        test_json_matches_dumps,
+        test_csv_output,
+        test_broken_pipe,
+        test_plain_table
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべてのCLI出力テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+リクエスト計画テストスクリプト
+FetchPlanner のリクエスト計画・取得結果・ページキャッシュを合成データで確認する（API接続不要）
+"""
+
+import sys
+import tracemalloc
+from datetime import date
+
+from tests.ledger_generator import LedgerGenerator
+from zaim_client import FetchPlanner
+
+
+START, END = '2024-01-01', '2024-06-30'
+
+
+def make_generator() -> LedgerGenerator:
+    """2024年上半期の合成データ"""
+    return LedgerGenerator(records=4000, seed=21, days=182, end_date=date(2024, 6, 30))
+
+
+def direct(generator: LedgerGenerator, **conditions) -> set:
+    """条件に合う取引の (mode, id) を合成データから直接求める"""
+    ledger = generator.ledger()
+    return {(record['mode'], record['id']) for record in ledger.query(start_date=START, end_date=END)
+            if all(record[field] in values for field, values in conditions.items())}
+
+
+def test_plan_requests():
+    """最も細かい条件だけをサーバー側の絞り込みに使うかテスト"""
+    print("=== リクエスト計画テスト ===")
+    try:
+        planner = FetchPlanner(None)
+        window = {'start_date': START, 'end_date': END}
+        cases = [
+            ({}, [window]),
+            ({'modes': ['payment', 'income', 'transfer']}, [window]),
+            ({'modes': ['income', 'payment']}, [dict(window, mode='payment'), dict(window, mode='income')]),
+            ({'modes': ['payment'], 'category_ids': [102, 101]},
+             [dict(window, category_id=101), dict(window, category_id=102)]),
+            ({'category_ids': [101], 'genre_ids': [10101, 10101]}, [dict(window, genre_id=10101)]),
+        ]
+        for filters, expected in cases:
+            plan = planner.plan(start_date=START, end_date=END, **filters)
+            if plan.requests != expected:
+                print(f"❌ {filters}: {plan.requests}（期待値 {expected}）")
+                return False
+
+        try:
+            planner.plan(modes=['refund'])
+            print("❌ 不明なモードがエラーになりません")
+            return False
+        except ValueError:
+            pass
+
+        print("✅ 絞り込み条件ごとのリクエストを計画")
+        return True
+
+    except Exception as e:
+        print(f"❌ リクエスト計画テストエラー: {e}")
+        return False
+
+
+def test_execute_matches_direct():
+    """計画どおりに取得した取引が直接絞り込んだ結果と一致し、ページ数が減るかテスト"""
+    print("\n=== 絞り込み取得テスト ===")
+    try:
+        generator = make_generator()
+        planner = FetchPlanner(generator.client())
+
+        # 絞り込みなしの全件スキャン（素朴な実装のページ数の基準になる）
+        full = planner.plan(start_date=START, end_date=END)
+        fetched = {(record['mode'], record['id']) for page in planner.execute(full) for record in page}
+        if fetched != direct(generator):
+            print("❌ 全件スキャンの結果が一致しません")
+            return False
+
+        plan = planner.plan(start_date=START, end_date=END, modes=['payment'], category_ids=[101, 102],
+                            naive_scans=2)
+        fetched = [(record['mode'], record['id']) for page in planner.execute(plan) for record in page]
+        if len(fetched) != len(set(fetched)) or set(fetched) != direct(generator, mode={'payment'},
+                                                                         category_id={101, 102}):
+            print("❌ 絞り込み取得の結果が一致しません")
+            return False
+
+        stats = plan.stats
+        if stats['requests'] != 2 or stats['estimated'] or stats['naive_pages'] != full.stats['pages'] * 2 \
+                or stats['pages_saved'] != stats['naive_pages'] - stats['pages'] or stats['pages_saved'] <= 0:
+            print(f"❌ 転送量のレポートが想定と異なります: {stats}")
+            return False
+
+        print(f"✅ {len(fetched)}件を{stats['pages']}ページで取得（{stats['pages_saved']}ページ削減）")
+        return True
+
+    except Exception as e:
+        print(f"❌ 絞り込み取得テストエラー: {e}")
+        return False
+
+
+def test_page_cache():
+    """cache_ttl の間は同じ条件のページを再利用し、clear_cache で取り直すかテスト"""
+    print("\n=== ページキャッシュテスト ===")
+    try:
+        generator = make_generator()
+        client = generator.client()
+        planner = FetchPlanner(client, cache_ttl=60)
+
+        requests = []
+        client.add_request_observer(lambda request: requests.append(request['endpoint']))
+
+        def fetch():
+            plan = planner.plan(start_date=START, end_date=END, modes=['income'])
+            records = [record['id'] for page in planner.execute(plan) for record in page]
+            return records, plan.stats
+
+        first, first_stats = fetch()
+        sent = len(requests)
+        second, second_stats = fetch()
+        if second != first or len(requests) != sent or second_stats['pages'] != 0 \
+                or second_stats['cached_pages'] != first_stats['pages']:
+            print(f"❌ キャッシュが再利用されません: {second_stats}")
+            return False
+
+        planner.clear_cache()
+        third, third_stats = fetch()
+        if third != first or third_stats['pages'] != first_stats['pages'] or len(requests) != sent * 2:
+            print(f"❌ clear_cache 後に取り直しません: {third_stats}")
+            return False
+
+        print(f"✅ {first_stats['pages']}ページを再利用し、clear_cache で取り直し")
+        return True
+
+    except Exception as e:
+        print(f"❌ ページキャッシュテストエラー: {e}")
+        return False
+
+
+def test_constant_memory():
+    """cache=False の取得で、保持するデータ量が件数に比例しないかテスト"""
+    print("\n=== 取得時のメモリ使用量テスト ===")
+    try:
+        peaks = {}
+        for records in (5000, 40000):
+            generator = LedgerGenerator(records=records, seed=23, days=366, end_date=date(2024, 12, 31))
+            planner = FetchPlanner(generator.client(), cache_ttl=60)
+            plan = planner.plan(start_date='2024-01-01', end_date='2024-12-31')
+            # 代替サーバー側の検索結果のキャッシュを先に作り、計測から除く
+            for _ in planner.execute(plan, cache=False):
+                pass
+
+            tracemalloc.start()
+            try:
+                fetched = sum(len(page) for page in planner.execute(plan, cache=False))
+                peaks[records] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            if fetched != records or planner._page_cache:
+                print(f"❌ {records}件: 取得件数 {fetched}、キャッシュ {len(planner._page_cache)}件")
+                return False
+
+        if peaks[40000] > peaks[5000] * 2:
+            print(f"❌ 件数に比例してメモリを使用しています: {peaks}")
+            return False
+
+        print(f"✅ 5,000件と40,000件で最大使用量がほぼ同じ（{peaks[5000] // 1024}KB / {peaks[40000] // 1024}KB）")
+        return True
+
+    except Exception as e:
+        print(f"❌ 取得時のメモリ使用量テストエラー: {e}")
+        return False
+
+
+def test_execute_windows():
+    """期間を分割して並行取得しても、分割しない場合と同じ順で返るかテスト"""
+    print("\n=== 期間分割取得テスト ===")
+    try:
+        generator = make_generator()
+        planner = FetchPlanner(generator.client())
+
+        for filters in ({}, {'modes': ['payment', 'income']}):
+            plan = planner.plan(start_date=START, end_date=END, **filters)
+            expected = [(record['mode'], record['id']) for page in planner.execute(plan) for record in page]
+            if len(plan.requests) > 1:
+                expected = [(record['mode'], record['id']) for record in
+                            generator.ledger().query(start_date=START, end_date=END)
+                            if record['mode'] in filters['modes']]
+
+            windows = list(planner.execute_windows(START, END, workers=4, window_days=10, **filters))
+            actual = [(record['mode'], record['id']) for _, records in windows for record in records]
+            if actual != expected:
+                print(f"❌ {filters}: 分割取得の順序が分割しない場合と異なります")
+                return False
+            if [window for window, _ in windows] != FetchPlanner.split_window(START, END, 10)[::-1]:
+                print("❌ 小期間が新しい順に返りません")
+                return False
+
+        print("✅ 分割取得の結果が分割しない場合と同じ順")
+        return True
+
+    except Exception as e:
+        print(f"❌ 期間分割取得テストエラー: {e}")
+        return False
+
+
+def main():
+    """リクエスト計画テストの実行"""
+    print("Zaim API Client - リクエスト計画テスト")
+    print("=" * 50)
+
+    tests = [
+        test_plan_requests,
+        test_execute_matches_direct,
+        test_page_cache,
+        test_constant_memory,
+        test_execute_windows
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべてのリクエスト計画テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+計測テストスクリプト
+--profile 用の Profiler のフェーズ・HTTPリクエストの記録と cProfile の保存を確認する（tests/fake_server.py を使用、API接続不要）
+"""
+
+import sys
+import time
+import pstats
+import tempfile
+from pathlib import Path
+
+from tests.fake_server import FakeZaimServer
+from zaim_client import ZaimClient
+from zaim_cli import profiler as profiler_module
+from zaim_cli.profiler import Profiler, record_import
+
+
+def test_phases():
+    """フェーズの記録と、import 時間を最初の計測にだけ含めるかテスト"""
+    print("=== フェーズ計測テスト ===")
+    try:
+        record_import(0.25, 0.2)
+        profiler = Profiler()
+
+        with profiler.phase('fetch'):
+            time.sleep(0.02)
+        try:
+            with profiler.phase('render'):
+                raise RuntimeError('描画エラー')
+        except RuntimeError:
+            pass
+        started = profiler.begin_phase('command')
+        profiler.end_phase(started)
+        totals = profiler.stop()
+
+        names = [phase['name'] for phase in profiler.phases]
+        if names != ['imports', 'fetch', 'render', 'command']:
+            print(f"❌ 記録されたフェーズが想定と異なります: {names}")
+            return False
+        if profiler.phases[0]['wall'] != 0.25 or profiler.phases[1]['wall'] < 0.02 or \
+                totals['wall'] < profiler.phases[1]['wall']:
+            print(f"❌ 経過時間が想定と異なります: {profiler.phases} / {totals}")
+            return False
+        if profiler_module.import_timing or Profiler().phases:
+            print("❌ import 時間が2回目の計測にも含まれました")
+            return False
+
+        print("✅ フェーズごとの経過時間を記録（例外で終わったフェーズも含む）")
+        return True
+
+    except Exception as e:
+        print(f"❌ フェーズ計測テストエラー: {e}")
+        return False
+
+
+def test_request_summary():
+    """代替サーバーへのリクエストをエンドポイントごとに集計するかテスト"""
+    print("\n=== リクエスト集計テスト ===")
+    try:
+        profiler = Profiler()
+        with FakeZaimServer(latency=0.01) as server:
+            client = ZaimClient(base_url=server.base_url, **server.client_credentials())
+            client.add_request_observer(profiler.record_request)
+            client.get_accounts()
+            client.get_money(limit=10)
+            client.get_money(limit=10, page=2)
+            client.remove_request_observer(profiler.record_request)
+            client.get_categories()
+        profiler.stop()
+
+        summary = {entry['endpoint']: entry for entry in profiler.request_summary()}
+        if set(summary) != {'GET /home/account', 'GET /home/money'} or summary['GET /home/money']['requests'] != 2:
+            print(f"❌ 集計結果が想定と異なります: {list(summary.values())}")
+            return False
+
+        money = summary['GET /home/money']
+        if money['bytes'] <= 0 or money['elapsed'] < 0.02 or money['slowest'] > money['elapsed']:
+            print(f"❌ 転送量・待ち時間が想定と異なります: {money}")
+            return False
+
+        print(f"✅ {len(profiler.requests)}件のリクエストを{len(summary)}エンドポイントに集計")
+        return True
+
+    except Exception as e:
+        print(f"❌ リクエスト集計テストエラー: {e}")
+        return False
+
+
+def test_pstats_output():
+    """cProfile の結果を保存し、pstats で読めるかテスト"""
+    print("\n=== cProfile 保存テスト ===")
+    try:
+        path = Path(tempfile.mkdtemp(prefix='zaim-profile-')) / 'command.pstats'
+        profiler = Profiler(str(path))
+        sorted(range(10000), key=lambda value: -value)
+        profiler.stop()
+        profiler.stop()
+
+        stats = pstats.Stats(str(path))
+        if stats.total_calls <= 0:
+            print("❌ cProfile の結果が空です")
+            return False
+
+        print(f"✅ cProfile の結果を保存（{stats.total_calls}回の呼び出し）")
+        return True
+
+    except Exception as e:
+        print(f"❌ cProfile 保存テストエラー: {e}")
+        return False
+
+
+def main():
+    """計測テストの実行"""
+    print("Zaim API Client - 計測テスト")
+    print("=" * 50)
+
+    tests = [
+        test_phases,
+        test_request_summary,
+        test_pstats_output
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての計測テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+名前付きプロファイルテストスクリプト
+--profiles での取引作成コマンドの確認と、shell / batch で --profile-name の切り替えが
+後続のコマンドに残らないことを確認する（API接続不要）
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 実際の ~/.zaim-cli を読み書きしない
+os.environ['HOME'] = tempfile.mkdtemp(prefix='zaim-cli-test-')
+os.environ['ZAIM_CLI_NO_DAEMON'] = '1'
+os.environ.pop('ZAIM_CLI_PROFILE', None)
+
+from zaim_cli import main as cli_main
+from zaim_cli.profiles import command_args, needs_confirmation
+
+
+def test_write_commands_need_confirmation():
+    """取引を作成するコマンドは --force / --validate がなければ確認が必要か"""
+    print("=== 取引作成コマンドの判定テスト ===")
+    try:
+        cases = {
+            ('balance', 'set', 'お財布', '1000'): True,
+            ('balance', 'set', 'お財布', '1000', '--force'): False,
+            ('balance', 'reconcile', 'targets.yaml', '-f'): False,
+            ('money', 'import', 'statement.csv', '--mapping', 'mapping.yaml'): True,
+            ('money', 'import', 'statement.csv', '--mapping', 'mapping.yaml', '--validate'): False,
+            ('balance', 'show'): False,
+            ('report', '--by', 'month'): False,
+        }
+        for args, expected in cases.items():
+            actual = needs_confirmation(command_args(['--profiles', 'a,b', *args]))
+            if actual != expected:
+                print(f"❌ {' '.join(args)}: {actual}（期待値 {expected}）")
+                return False
+
+        print("✅ 取引作成コマンドを判定")
+        return True
+
+    except Exception as e:
+        print(f"❌ 取引作成コマンドの判定テストエラー: {e}")
+        return False
+
+
+def test_profiles_refuse_unconfirmed_writes():
+    """--profiles で確認なしの取引作成を拒否し、子プロセスを起動しないかテスト"""
+    print("\n=== --profiles の取引作成テスト ===")
+    try:
+        started = []
+        original = cli_main.run_profiles
+        cli_main.run_profiles = lambda names, argv, timeout=None: started.append(argv) or []
+        try:
+            refused = cli_main.invoke_cli(['--profiles', 'a,b', '--json', 'balance', 'add', 'お財布', '100'])
+            forced = cli_main.invoke_cli(['--profiles', 'a,b', '--json', 'balance', 'add', 'お財布', '100', '--force'])
+        finally:
+            cli_main.run_profiles = original
+
+        if refused != 1 or len(started) != 1 or '--force' not in started[0]:
+            print(f"❌ 確認なしの取引作成が拒否されていません: 終了コード {refused}, 実行 {started}")
+            return False
+        if forced != 0:
+            print(f"❌ --force 付きの実行が失敗しました: 終了コード {forced}")
+            return False
+
+        print("✅ --force / --dry-run なしの取引作成を拒否")
+        return True
+
+    except Exception as e:
+        print(f"❌ --profiles の取引作成テストエラー: {e}")
+        return False
+
+
+def test_profile_name_is_restored():
+    """行頭の --profile-name が後続のコマンドに引き継がれないかテスト"""
+    print("\n=== プロファイル切り替えの復元テスト ===")
+    try:
+        default_dir = cli_main.CONFIG_DIR
+        cli_main.invoke_cli(['--profile-name', 'alice', '--json', 'profile', 'list'])
+
+        if cli_main.PROFILE_NAME is not None or cli_main.CONFIG_DIR != default_dir:
+            print(f"❌ プロファイルが戻っていません: {cli_main.PROFILE_NAME} ({cli_main.CONFIG_DIR})")
+            return False
+        if cli_main.ANCHOR_FILE != Path(default_dir) / 'anchors.json':
+            print(f"❌ アンカーファイルが戻っていません: {cli_main.ANCHOR_FILE}")
+            return False
+
+        print("✅ コマンドの終了後に元のプロファイルへ戻りました")
+        return True
+
+    except Exception as e:
+        print(f"❌ プロファイル切り替えの復元テストエラー: {e}")
+        return False
+
+
+def main():
+    """名前付きプロファイルテストの実行"""
+    print("Zaim API Client - 名前付きプロファイルテスト")
+    print("=" * 50)
+
+    tests = [
+        test_write_commands_need_confirmation,
+        test_profiles_refuse_unconfirmed_writes,
+        test_profile_name_is_restored
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての名前付きプロファイルテストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+集計レポートテストスクリプト
+LedgerReport の集計結果を合成データから直接集計した値と比べる（API接続不要）
+"""
+
+import sys
+from collections import defaultdict
+from datetime import date
+
+from tests.ledger_generator import LedgerGenerator
+from zaim_client import BalanceManager, CurrencyTable, LedgerReport
+
+
+def test_rows_match_direct_totals():
+    """月・カテゴリ別の集計が取引から直接集計した値と一致するかテスト"""
+    print("=== 集計結果の一致テスト ===")
+    try:
+        generator = LedgerGenerator(records=5000, seed=11, days=180, end_date=date(2024, 6, 30), foreign_ratio=0)
+        records = list(generator.iter_money())
+
+        expected = defaultdict(lambda: {'income': 0, 'payment': 0, 'transfer': 0, 'count': 0})
+        for record in records:
+            totals = expected[(record['date'][:7], record['category_id'] or 0)]
+            totals[record['mode']] += record['amount']
+            totals['count'] += 1
+
+        report = LedgerReport(['month', 'category'], categories=generator.categories)
+        for start in range(0, len(records), 100):
+            report.add(records[start:start + 100])
+        rows = report.rows()
+
+        actual = {(row['month'], row['category_id']): {key: row[key] for key in ('income', 'payment', 'transfer', 'count')}
+                  for row in rows}
+        if actual != dict(expected):
+            print("❌ 集計結果が直接集計した値と一致しません")
+            return False
+        if [(row['month'], row['category_id']) for row in rows] != sorted(actual):
+            print("❌ 集計キーの昇順に並んでいません")
+            return False
+        if any(row['net'] != row['income'] - row['payment'] for row in rows) or report.records != len(records):
+            print("❌ 収支または件数が正しくありません")
+            return False
+
+        names = {category['id']: category['name'] for category in generator.categories}
+        if any(row['category_id'] and row['category_name'] != names[row['category_id']] for row in rows):
+            print("❌ カテゴリ名が正しくありません")
+            return False
+
+        print(f"✅ {len(rows)}グループの集計が一致")
+        return True
+
+    except Exception as e:
+        print(f"❌ 集計結果の一致テストエラー: {e}")
+        return False
+
+
+def test_columns_match_rows():
+    """列形式で加えた集計が行形式の集計と一致するかテスト"""
+    print("\n=== 列形式の集計テスト ===")
+    try:
+        generator = LedgerGenerator(records=5000, seed=12, days=120, end_date=date(2024, 4, 30))
+        records = list(generator.iter_money())
+        # 通貨コードのない取引（円）も含める
+        for record in records[::7]:
+            record.pop('currency_code', None)
+        names = ('date', 'mode', 'amount', 'category_id', 'genre_id', 'from_account_id', 'to_account_id',
+                 'currency_code')
+
+        for group_by in (['month', 'category'], ['week', 'account', 'mode'], ['genre']):
+            by_rows = LedgerReport(group_by, categories=generator.categories, genres=generator.genres,
+                                   currency_table=CurrencyTable('JPY', {'USD': 150}))
+            by_columns = LedgerReport(group_by, categories=generator.categories, genres=generator.genres,
+                                      currency_table=CurrencyTable('JPY', {'USD': 150}))
+            for start in range(0, len(records), 1000):
+                chunk = records[start:start + 1000]
+                by_rows.add(chunk)
+                by_columns.add_columns({name: [record.get(name) for record in chunk] for name in names})
+
+            if by_columns.rows() != by_rows.rows() or by_columns.records != len(records):
+                print(f"❌ {group_by}: 列形式の集計が行形式と一致しません")
+                return False
+
+        print("✅ 列形式と行形式の集計が一致")
+        return True
+
+    except Exception as e:
+        print(f"❌ 列形式の集計テストエラー: {e}")
+        return False
+
+
+def test_foreign_currency():
+    """換算レートのない外貨を unconverted に分けて残すかテスト"""
+    print("\n=== 外貨の集計テスト ===")
+    try:
+        records = [
+            {'mode': 'payment', 'date': '2024-03-01', 'amount': 1000, 'category_id': 101},
+            {'mode': 'payment', 'date': '2024-03-02', 'amount': 20, 'category_id': 101, 'currency_code': 'USD'},
+            {'mode': 'payment', 'date': '2024-03-03', 'amount': 5, 'category_id': 101, 'currency_code': 'EUR'},
+        ]
+        report = LedgerReport(['mode'], currency_table=CurrencyTable('JPY', {'USD': 150}))
+        report.add(records)
+        row, = report.rows()
+
+        if row['payment'] != 4000 or row.get('unconverted') != {'payment': {'EUR': 5}} or row['count'] != 3:
+            print(f"❌ 外貨の集計が想定と異なります: {row}")
+            return False
+
+        # 通貨コードのない取引は基準通貨ではなく円
+        report = LedgerReport(['mode'], currency_table=CurrencyTable('USD', {'JPY': 0.01}))
+        report.add(records[:1])
+        row, = report.rows()
+        if row['payment'] != 10 or row.get('unconverted'):
+            print(f"❌ 通貨コードのない取引が基準通貨USDとして集計されました: {row}")
+            return False
+
+        print("✅ 換算できる外貨は合算し、それ以外は unconverted に残しました")
+        return True
+
+    except Exception as e:
+        print(f"❌ 外貨の集計テストエラー: {e}")
+        return False
+
+
+def test_build_report_with_filters():
+    """BalanceManager.build_report が絞り込み条件どおりに集計するかテスト"""
+    print("\n=== 絞り込み付き集計テスト ===")
+    try:
+        generator = LedgerGenerator(records=3000, seed=13, days=120, end_date=date(2024, 4, 30))
+        manager = BalanceManager(generator.client())
+        report = manager.build_report(['account'], start_date='2024-02-01', end_date='2024-03-31',
+                                      modes=['payment'])
+
+        expected = defaultdict(int)
+        for record in generator.iter_money():
+            if record['mode'] == 'payment' and '2024-02-01' <= record['date'] <= '2024-03-31':
+                expected[record['from_account_id']] += 1
+
+        rows = report.rows()
+        if {row['account_id']: row['count'] for row in rows} != dict(expected):
+            print("❌ アカウント別の件数が想定と異なります")
+            return False
+        if any(row['income'] or row['transfer'] for row in rows):
+            print("❌ 支出以外の取引が集計されました")
+            return False
+
+        print(f"✅ {len(rows)}アカウントの支出を集計")
+        return True
+
+    except Exception as e:
+        print(f"❌ 絞り込み付き集計テストエラー: {e}")
+        return False
+
+
+def main():
+    """集計レポートテストの実行"""
+    print("Zaim API Client - 集計レポートテスト")
+    print("=" * 50)
+
+    tests = [
+        test_rows_match_direct_totals,
+        test_columns_match_rows,
+        test_foreign_currency,
+        test_build_report_with_filters
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての集計レポートテストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
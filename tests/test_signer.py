@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+高速署名テストスクリプト
+HmacSha1Signer の Authorization ヘッダーが requests_oauthlib の OAuth1 と一致するかを確認する（API接続不要）
+"""
+
+import re
+import sys
+
+import requests
+from requests_oauthlib import OAuth1
+
+from zaim_client.signer import HmacSha1Signer
+
+
+CREDENTIALS = ('consumer-key', 'consumer secret/+&', 'access~token', 'アクセス秘密')
+
+# (メソッド, URL, クエリパラメータ, フォームデータ)
+CASES = [
+    ('GET', 'https://api.zaim.net/v2/home/user/verify', None, None),
+    ('GET', 'https://api.zaim.net/v2/home/money',
+     {'mapping': 1, 'order': 'date', 'page': 3, 'limit': 100, 'start_date': '2024-01-01'}, None),
+    ('GET', 'https://API.Zaim.net:443/v2/home/money', [('mode', 'payment'), ('mode', 'income'), ('q', '')], None),
+    ('GET', 'http://127.0.0.1:8765/v2/home/money?existing=1', {'name': "a b+c!*'()~;/?:@&=$,"}, None),
+    ('POST', 'https://api.zaim.net/v2/home/money/payment', None,
+     {'mapping': 1, 'category_id': 101, 'genre_id': 10101, 'amount': 1500, 'date': '2024-01-31',
+      'comment': 'CLI 残高調整 +50% & 税込', 'place': 'コンビニ（駅前）'}),
+    ('PUT', 'https://api.zaim.net/v2/home/money/payment/12345', None, {'mapping': 1, 'amount': 0}),
+    ('DELETE', 'https://api.zaim.net/v2/home/money/payment/12345', None, None),
+]
+
+
+def prepare(method, url, params, data):
+    """ZaimClient と同じ形でリクエストを組み立てる"""
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'} if data else None
+    return requests.Request(method, url, params=params, data=data, headers=headers).prepare()
+
+
+def oauth_param(header, name):
+    """Authorization ヘッダーから値を取り出す"""
+    return re.search(rf'{name}="([^"]*)"', header).group(1)
+
+
+def test_matches_oauthlib():
+    """oauthlib の署名と一致するかテスト"""
+    print("=== oauthlib との一致テスト ===")
+    try:
+        signer = HmacSha1Signer(*CREDENTIALS)
+        consumer_key, consumer_secret, access_token, access_token_secret = CREDENTIALS
+
+        for method, url, params, data in CASES:
+            fast = signer(prepare(method, url, params, data)).headers['Authorization']
+
+            reference = OAuth1(consumer_key, client_secret=consumer_secret,
+                               resource_owner_key=access_token, resource_owner_secret=access_token_secret,
+                               signature_method='HMAC-SHA1',
+                               nonce=oauth_param(fast, 'oauth_nonce'),
+                               timestamp=oauth_param(fast, 'oauth_timestamp'))
+            expected = reference(prepare(method, url, params, data)).headers['Authorization']
+            if isinstance(expected, bytes):
+                expected = expected.decode('utf-8')
+
+            if fast != expected:
+                print(f"❌ {method} {url}: 署名が一致しません")
+                print(f"   fast:     {fast}")
+                print(f"   oauthlib: {expected}")
+                return False
+
+        print(f"✅ {len(CASES)}件のリクエストでヘッダーが一致")
+        return True
+
+    except Exception as e:
+        print(f"❌ 署名テストエラー: {e}")
+        return False
+
+
+def test_nonce_is_unique():
+    """リクエストごとに nonce が変わるかテスト"""
+    print("\n=== nonce テスト ===")
+    try:
+        signer = HmacSha1Signer(*CREDENTIALS)
+        nonces = {oauth_param(signer(prepare('GET', CASES[0][1], None, None)).headers['Authorization'],
+                              'oauth_nonce')
+                  for _ in range(1000)}
+
+        if len(nonces) != 1000:
+            print(f"❌ nonce が重複しました: {1000 - len(nonces)}件")
+            return False
+
+        print("✅ 1000リクエストで nonce の重複なし")
+        return True
+
+    except Exception as e:
+        print(f"❌ nonce テストエラー: {e}")
+        return False
+
+
+def main():
+    """署名テストの実行"""
+    print("Zaim API Client - 高速署名テスト")
+    print("=" * 50)
+
+    tests = [
+        test_matches_oauthlib,
+        test_nonce_is_unique
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての署名テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
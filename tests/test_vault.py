@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+トークン保管庫テストスクリプト
+TokenVault の保存・読み出しと、保管したトークンでのAPI呼び出しを確認する（tests/fake_server.py を使用、API接続不要）
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from tests.fake_server import FakeZaimServer
+from zaim_client import TokenVault
+
+
+def make_vault(**options) -> TokenVault:
+    """一時ディレクトリの保管庫"""
+    path = Path(tempfile.mkdtemp(prefix='zaim-vault-')) / 'tokens.db'
+    return TokenVault(path, 'vault-consumer-key', 'vault-consumer-secret', **options)
+
+
+def test_round_trip():
+    """保存したトークンと利用者情報がそのまま読み出せるかテスト"""
+    print("=== 保存・読み出しテスト ===")
+    try:
+        vault = make_vault()
+        vault.put('alice', 'alice-token', 'alice-secret', {'id': 1, 'name': 'アリス'})
+        count = vault.put_many([
+            {'user_id': 'bob', 'access_token': 'bob-token', 'access_token_secret': 'bob-secret'},
+            {'user_id': 42, 'access_token': 'carol-token', 'access_token_secret': 'carol-secret',
+             'user_info': {'id': 3}},
+        ])
+
+        alice = vault.get('alice')
+        if (alice['access_token'], alice['access_token_secret'], alice['user_info']) != \
+                ('alice-token', 'alice-secret', {'id': 1, 'name': 'アリス'}):
+            print(f"❌ 読み出した内容が保存した内容と異なります: {alice}")
+            return False
+        if count != 2 or vault.get('bob')['user_info'] is not None or vault.get(42)['user_id'] != '42':
+            print("❌ 一括保存の内容が想定と異なります")
+            return False
+        if vault.user_ids() != ['42', 'alice', 'bob'] or len(vault) != 3 or 'bob' not in vault:
+            print(f"❌ 利用者の一覧が想定と異なります: {vault.user_ids()}")
+            return False
+
+        # 別の接続（別プロセス相当）からも同じ内容が読める
+        other = TokenVault(vault.path, 'vault-consumer-key', 'vault-consumer-secret')
+        if other.get('alice') != alice:
+            print("❌ 別の接続から保存内容が読めません")
+            return False
+
+        vault.put('alice', 'alice-token-2', 'alice-secret-2')
+        if vault.get('alice')['access_token'] != 'alice-token-2' or vault.get('alice')['user_info'] is not None:
+            print("❌ 既存の利用者のトークンが置き換わりません")
+            return False
+        if not vault.delete('bob') or vault.delete('bob') or vault.get('bob') is not None:
+            print("❌ 削除の結果が想定と異なります")
+            return False
+        if (vault.path.stat().st_mode & 0o777) != 0o600:
+            print("❌ データベースの権限が600ではありません")
+            return False
+
+        vault.close()
+        other.close()
+        print("✅ 保存したトークンをそのまま読み出し")
+        return True
+
+    except Exception as e:
+        print(f"❌ 保存・読み出しテストエラー: {e}")
+        return False
+
+
+def test_credentials_cache():
+    """認証情報の再利用、更新時の破棄と LRU の上限のテスト"""
+    print("\n=== 認証情報のキャッシュテスト ===")
+    try:
+        vault = make_vault(signer_cache_size=2)
+        vault.put_many([{'user_id': f'user{i}', 'access_token': f'token{i}', 'access_token_secret': f'secret{i}'}
+                        for i in range(3)])
+
+        first = vault.credentials_for('user0')
+        if vault.credentials_for('user0') is not first or first.consumer_key != 'vault-consumer-key':
+            print("❌ 保持した認証情報が再利用されません")
+            return False
+
+        vault.put('user0', 'token0-new', 'secret0-new')
+        if vault.credentials_for('user0').access_token != 'token0-new':
+            print("❌ トークンの更新後も古い認証情報が返りました")
+            return False
+
+        vault.credentials_for('user1')
+        vault.credentials_for('user2')
+        if list(vault._signers) != ['user1', 'user2']:
+            print(f"❌ LRU の上限を超えて保持しています: {list(vault._signers)}")
+            return False
+
+        try:
+            vault.credentials_for('unknown')
+            print("❌ 未登録の利用者でエラーになりません")
+            return False
+        except KeyError:
+            pass
+
+        vault.close()
+        print("✅ 認証情報を再利用し、更新時に破棄")
+        return True
+
+    except Exception as e:
+        print(f"❌ 認証情報のキャッシュテストエラー: {e}")
+        return False
+
+
+def test_client_for():
+    """保管したトークンで署名したリクエストが代替サーバーで検証を通るかテスト"""
+    print("\n=== 保管したトークンでのAPI呼び出しテスト ===")
+    saved_base_url = os.environ.get('ZAIM_API_BASE_URL')
+    try:
+        with FakeZaimServer() as server:
+            os.environ['ZAIM_API_BASE_URL'] = server.base_url
+            credentials = server.client_credentials()
+            path = Path(tempfile.mkdtemp(prefix='zaim-vault-')) / 'tokens.db'
+
+            for fast_signer in (False, True):
+                vault = TokenVault(path, credentials['consumer_key'], credentials['consumer_secret'],
+                                   fast_signer=fast_signer)
+                vault.put('valid', credentials['access_token'], credentials['access_token_secret'])
+                vault.put('revoked', 'revoked-token', 'revoked-secret')
+
+                if not vault.client_for('valid').verify_user().get('me'):
+                    print(f"❌ fast_signer={fast_signer}: 利用者情報を取得できません")
+                    return False
+                try:
+                    vault.client_for('revoked').verify_user()
+                    print(f"❌ fast_signer={fast_signer}: 無効なトークンでリクエストが通りました")
+                    return False
+                except Exception:
+                    pass
+                vault.close()
+
+        print("✅ 保管したトークンで署名")
+        return True
+
+    except Exception as e:
+        print(f"❌ 保管したトークンでのAPI呼び出しテストエラー: {e}")
+        return False
+    finally:
+        if saved_base_url is None:
+            os.environ.pop('ZAIM_API_BASE_URL', None)
+        else:
+            os.environ['ZAIM_API_BASE_URL'] = saved_base_url
+
+
+def main():
+    """トークン保管庫テストの実行"""
+    print("Zaim API Client - トークン保管庫テスト")
+    print("=" * 50)
+
+    tests = [
+        test_round_trip,
+        test_credentials_cache,
+        test_client_for
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべてのトークン保管庫テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+利用者確認の有効期限テストスクリプト
+保存された確認結果を有効期限内だけ使い、期限切れ・--refresh ではAPIで確認し直すかを確認する
+（tests/fake_server.py を使用、API接続不要）
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from tests.fake_server import FakeZaimServer
+from zaim_client import ZaimClient, ZaimAuthManager
+from zaim_client.credentials import CredentialChain, ExplicitProvider, TokenFileProvider
+
+
+STALE_USER = {'me': {'id': 0, 'name': '保存済みの利用者'}}
+
+
+def make_manager(server: FakeZaimServer) -> ZaimAuthManager:
+    """代替サーバーで確認する、一時ディレクトリの ZaimAuthManager"""
+    credentials = server.client_credentials()
+    manager = ZaimAuthManager(credentials['consumer_key'], credentials['consumer_secret'],
+                              config_dir=Path(tempfile.mkdtemp(prefix='zaim-verify-')))
+    manager.verify_url = f"{server.base_url}/home/user/verify"
+    return manager
+
+
+def test_verify_stored_ttl():
+    """有効期限内は保存された結果を使い、期限切れ・refresh・ttl=0 ではAPIで確認するかテスト"""
+    print("=== 保存された確認結果の有効期限テスト ===")
+    try:
+        with FakeZaimServer() as server:
+            credentials = server.client_credentials()
+            manager = make_manager(server)
+            verified_at = int(time.time()) - 30
+            manager.save_tokens(credentials['access_token'], credentials['access_token_secret'], STALE_USER,
+                                verified_at=verified_at, timestamp=1700000000)
+            server.reset_stats()
+
+            user_info, used_at = manager.verify_stored(ttl=60)
+            if (user_info, used_at) != (STALE_USER, verified_at) or server.stats['requests'] != 0:
+                print("❌ 有効期限内の確認結果が使われません")
+                return False
+
+            user_info, used_at = manager.verify_stored(ttl=10)
+            if used_at is not None or user_info == STALE_USER or server.stats['requests'] != 1:
+                print("❌ 期限切れの確認結果が使われました")
+                return False
+
+            tokens = manager.load_tokens()
+            if tokens['user_info'] != user_info or time.time() - tokens['verified_at'] > 5 or \
+                    tokens['timestamp'] != 1700000000:
+                print(f"❌ 確認結果が保存されません: {tokens}")
+                return False
+
+            if manager.verify_stored(ttl=10)[1] is None or server.stats['requests'] != 1:
+                print("❌ 確認し直した結果が再利用されません")
+                return False
+            manager.verify_stored(ttl=10, refresh=True)
+            manager.verify_stored(ttl=0)
+            if server.stats['requests'] != 3:
+                print(f"❌ refresh・ttl=0 でAPIを呼びません: {server.stats['requests']}件")
+                return False
+
+        print("✅ 有効期限内は保存された結果を使用")
+        return True
+
+    except Exception as e:
+        print(f"❌ 保存された確認結果の有効期限テストエラー: {e}")
+        return False
+
+
+def test_client_max_age():
+    """ZaimClient.verify_user の max_age と、トークンと一緒に保存された確認結果の引き継ぎのテスト"""
+    print("\n=== クライアントの確認結果の再利用テスト ===")
+    try:
+        with FakeZaimServer() as server:
+            credentials = server.client_credentials()
+            manager = make_manager(server)
+            manager.save_tokens(credentials['access_token'], credentials['access_token_secret'], STALE_USER,
+                                verified_at=int(time.time()) - 30)
+
+            chain = CredentialChain([
+                ExplicitProvider(consumer_key=credentials['consumer_key'],
+                                 consumer_secret=credentials['consumer_secret']),
+                TokenFileProvider(manager.token_file)
+            ])
+            client = ZaimClient(credentials=chain.resolve(), base_url=server.base_url)
+            server.reset_stats()
+
+            if client.verify_user(max_age=60) != STALE_USER or server.stats['requests'] != 0:
+                print("❌ トークンファイルの確認結果が引き継がれません")
+                return False
+
+            verified = client.verify_user(max_age=10)
+            if verified == STALE_USER or server.stats['requests'] != 1:
+                print("❌ 期限切れの確認結果が使われました")
+                return False
+
+            # 同じ認証情報のクライアント間で確認結果を共有する
+            other = ZaimClient(credentials=chain.resolve(), base_url=server.base_url)
+            if other.verify_user(max_age=10) != verified or server.stats['requests'] != 1:
+                print("❌ 確認結果がクライアント間で共有されません")
+                return False
+
+            client.credentials.verification = (time.time() - 20, verified)
+            client.verify_user(max_age=10)
+            client.verify_user()
+            if server.stats['requests'] != 3 or time.time() - client.verified_at > 5:
+                print(f"❌ 期限切れ・max_age=0 でAPIを呼びません: {server.stats['requests']}件")
+                return False
+
+        print("✅ max_age 以内の確認結果だけを再利用")
+        return True
+
+    except Exception as e:
+        print(f"❌ クライアントの確認結果の再利用テストエラー: {e}")
+        return False
+
+
+def main():
+    """利用者確認の有効期限テストの実行"""
+    print("Zaim API Client - 利用者確認の有効期限テスト")
+    print("=" * 50)
+
+    tests = [
+        test_verify_stored_ttl,
+        test_client_max_age
+    ]
+
+    results = []
+    for test in tests:
+        result = test()
+        results.append(result)
+
+    print("\n" + "=" * 50)
+    print("テスト結果サマリー:")
+
+    passed = sum(results)
+    total = len(results)
+
+    for i, (test, result) in enumerate(zip(tests, results)):
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{i+1}. {test.__name__}: {status}")
+
+    print(f"\n合計: {passed}/{total} テスト通過")
+
+    if passed == total:
+        print("🎉 すべての利用者確認の有効期限テストが成功しました！")
+        return 0
+    else:
+        print("⚠️ 一部のテストが失敗しました。")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Zaim CLI デーモン
+認証済みクライアントとキャッシュを保持したまま、Unixドメインソケット経由でCLIコマンドを実行する
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import socketserver
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+from zaim_cli.profiles import active_profile, profile_dir
+
+
+# コマンドライン引数と呼び出し元の端末情報を受け取り、
+# コマンドを実行して (終了コード, 標準出力, 標準エラー出力) を返す関数
+Runner = Callable[[List[str], Dict[str, Any]], Tuple[int, str, str]]
+
+# デーモンに転送しないコマンド（ブラウザ操作や対話が必要なもの、標準入力を読むもの、デーモン自身の管理）
+LOCAL_COMMANDS = {'daemon', 'auth', 'shell', 'batch'}
+
+# 終了せずに出力し続けるため、デーモンに転送しないサブコマンド
+LOCAL_SUBCOMMANDS = {('balance', 'watch')}
+
+# 標準出力に書き出す場合はデーモンに転送しないサブコマンドと、出力先ファイルのオプション
+# （デーモンは出力を終了までメモリにためて返すため、件数に比例してメモリを使う）
+STDOUT_LOCAL_SUBCOMMANDS = {('money', 'export')}
+OUTPUT_OPTIONS = {'-o', '--output'}
+
+# 途中経過を逐次出力するオプション（デーモンは終了まで出力をまとめて返すため転送しない）
+STREAMING_OPTIONS = {'--stream'}
+
+# プロファイルを切り替えるグローバルオプション
+PROFILE_OPTIONS = {'--profile-name', '--profiles'}
+
+# 確認プロンプトを出す可能性があるコマンド
+PROMPTING_COMMANDS = {'set', 'add', 'subtract', 'reconcile', 'import', 'reset'}
+
+
+def default_socket_path() -> Path:
+    """デーモンのソケットパス（ZAIM_CLI_SOCKET で上書き可能）"""
+    override = os.getenv('ZAIM_CLI_SOCKET')
+    if override:
+        return Path(override)
+    # プロファイルごとに別のデーモン（ZAIM_CLI_PROFILE で起動したデーモンはそのプロファイル専用）
+    return profile_dir(active_profile()) / 'daemon.sock'
+
+
+def _send(socket_path: Path, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """ソケットに1行のJSONを送り、1行のJSONを受け取る"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        with sock.makefile('rb') as reader:
+            line = reader.readline()
+
+    if not line:
+        raise ConnectionError("デーモンから応答がありません")
+    return json.loads(line.decode('utf-8'))
+
+
+def should_forward(argv: List[str]) -> bool:
+    """
+    コマンドをデーモンに転送するかどうかを判定
+
+    Args:
+        argv: プログラム名を除いたコマンドライン引数
+    """
+    if os.getenv('ZAIM_CLI_NO_DAEMON'):
+        return False
+
+    # プロファイルを引数で切り替える場合はローカルで実行（デーモンは起動時のプロファイル専用）
+    if any(arg.split('=', 1)[0] in PROFILE_OPTIONS for arg in argv):
+        return False
+
+    commands = [arg for arg in argv if not arg.startswith('-')]
+    if not commands or commands[0] in LOCAL_COMMANDS or tuple(commands[:2]) in LOCAL_SUBCOMMANDS:
+        return False
+    if STREAMING_OPTIONS & set(argv):
+        return False
+    if (tuple(commands[:2]) in STDOUT_LOCAL_SUBCOMMANDS
+            and not any(arg.split('=', 1)[0] in OUTPUT_OPTIONS or (arg.startswith('-o') and len(arg) > 2)
+                        for arg in argv)):
+        return False
+
+    # デーモンは標準入力を持たないので、確認プロンプトが出うる場合はローカルで実行
+    if ('--table' in argv and sys.stdin.isatty()
+            and PROMPTING_COMMANDS & set(commands)
+            and not {'-f', '--force'} & set(argv)):
+        return False
+
+    return True
+
+
+def forward(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """
+    コマンドをデーモンで実行し、出力をそのまま書き出す
+
+    Args:
+        argv: プログラム名を除いたコマンドライン引数
+        socket_path: ソケットパス（Noneの場合はデフォルト）
+
+    Returns:
+        終了コード（デーモンが起動していない場合はNone）
+    """
+    socket_path = socket_path or default_socket_path()
+    if not socket_path.exists():
+        return None
+
+    try:
+        terminal = {
+            'isatty': sys.stdout.isatty(),
+            'width': shutil.get_terminal_size().columns,
+            'cwd': os.getcwd()
+        }
+        response = _send(socket_path, {'command': 'run', 'argv': argv, 'terminal': terminal})
+    except (OSError, ValueError):
+        # 古いソケットファイルなど、接続できない場合はローカルで実行させる
+        return None
+
+    if response.get('stdout'):
+        sys.stdout.write(response['stdout'])
+        sys.stdout.flush()
+    if response.get('stderr'):
+        sys.stderr.write(response['stderr'])
+        sys.stderr.flush()
+    return response.get('exit_code', 1)
+
+
+def request(command: str, socket_path: Optional[Path] = None,
+            timeout: Optional[float] = 5) -> Dict[str, Any]:
+    """
+    デーモンに管理コマンド（ping / shutdown）を送信
+
+    Raises:
+        OSError: デーモンに接続できない場合
+    """
+    return _send(socket_path or default_socket_path(), {'command': command}, timeout)
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """1接続につき1リクエストを処理するハンドラー"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        server: 'DaemonServer' = self.server
+        try:
+            message = json.loads(line.decode('utf-8'))
+            response = server.dispatch(message)
+        except Exception as e:
+            response = {'exit_code': 1, 'stdout': '', 'stderr': f"ERROR: {e}\n"}
+
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    CLIコマンドを受け付けるUnixソケットサーバー
+
+    CLIのグローバル状態（コンテキスト・標準出力）を共有するため、コマンドは1件ずつ順に実行する
+    """
+
+    def __init__(self, socket_path: Path, runner: Runner):
+        self.socket_path = Path(socket_path)
+        self.runner = runner
+        self.started_at = time.time()
+        self.requests_served = 0
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        super().__init__(str(self.socket_path), DaemonHandler)
+        # ソケットは所有者のみアクセス可能
+        self.socket_path.chmod(0o600)
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """受信したメッセージを処理"""
+        command = message.get('command')
+
+        if command == 'run':
+            exit_code, stdout, stderr = self.runner(list(message.get('argv', [])),
+                                                    message.get('terminal', {}))
+            self.requests_served += 1
+            return {'exit_code': exit_code, 'stdout': stdout, 'stderr': stderr}
+        elif command == 'ping':
+            return {
+                'pid': os.getpid(),
+                'uptime': int(time.time() - self.started_at),
+                'requests_served': self.requests_served,
+                'socket': str(self.socket_path)
+            }
+        elif command == 'shutdown':
+            # このリクエストの応答後に serve() のループを終了する
+            self._shutdown_requested = True
+            return {'status': 'stopping'}
+        else:
+            raise ValueError(f"不明なコマンド: {command}")
+
+    def serve(self):
+        """shutdown を受け取るまでリクエストを処理"""
+        self._shutdown_requested = False
+        try:
+            while not self._shutdown_requested:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+zaim-cli エントリーポイント
+デーモンが起動していれば重いモジュールを読み込まずにコマンドを転送する
+シェル補完も可能な限り名前インデックスだけで応答する
+"""
+
+import os
+import sys
+import time
+
+
+def main():
+    """エントリーポイント（デーモンが起動していればコマンドを転送）"""
+    if '_ZAIM_CLI_COMPLETE' in os.environ:
+        from zaim_cli.names import fast_complete
+        if fast_complete(os.environ):
+            return
+
+    from zaim_cli.daemon import should_forward, forward
+    from zaim_cli.output import exit_on_broken_pipe
+
+    try:
+        args = sys.argv[1:]
+        if should_forward(args):
+            exit_code = forward(args)
+            if exit_code is not None:
+                sys.exit(exit_code)
+
+        from zaim_cli import profiler
+        wall, cpu = time.perf_counter(), time.process_time()
+        from zaim_cli.main import cli
+        profiler.record_import(time.perf_counter() - wall, time.process_time() - cpu)
+
+        cli(prog_name='zaim-cli')
+    except BrokenPipeError:
+        exit_on_broken_pipe()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,34 +5,67 @@ Zaim CLI - コマンドライン家計簿管理ツール
 
 import os
 import sys
+import copy
 import json
 import csv
+import gzip
+from contextlib import redirect_stdout, redirect_stderr, nullcontext
+from datetime import datetime
 from io import StringIO
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 import click
+from click.shell_completion import CompletionItem
 from rich.console import Console
 from rich.table import Table
+from rich.text import Text
+from rich.markup import escape
 from rich.panel import Panel
+from rich.live import Live
+from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, MofNCompleteColumn
 from rich.prompt import Confirm
 import yaml
 
-from zaim_client import ZaimClient, BalanceManager, ZaimAuthManager
+from zaim_client import ZaimClient, BalanceManager, ZaimAuthManager, AnchorStore
+from zaim_client.credentials import Credentials, CONSUMER_FIELDS, default_chain
+from zaim_client.auth import DEFAULT_VERIFY_TTL
+from zaim_cli.output import RowWriter, PlainTableWriter, exit_on_broken_pipe
+from zaim_cli.names import NameIndex
+from zaim_cli.profiler import Profiler
+from zaim_cli.profiles import (active_profile, profile_dir, list_profiles, parse_profile_list, command_args,
+                               run_profiles, merge_profile_rows, match_command, needs_confirmation,
+                               UNSUPPORTED_COMMANDS, WRITE_COMMANDS)
 
 console = Console()
+err_console = Console(stderr=True)
 
-# 設定ディレクトリのパス
-CONFIG_DIR = Path.home() / '.zaim-cli'
+# 機械処理向けの出力形式（それ以外は Rich のテーブル表示）
+MACHINE_FORMATS = ['csv', 'json', 'jsonl']
+
+# 使用中のプロファイル（None はデフォルトプロファイル）
+PROFILE_NAME = active_profile()
+
+# 設定ディレクトリのパス（プロファイルごと、use_profile() で切り替え）
+CONFIG_DIR = profile_dir(PROFILE_NAME)
 CONFIG_FILE = CONFIG_DIR / 'config.yaml'
 AUTH_FILE = CONFIG_DIR / 'auth.json'
+ANCHOR_FILE = CONFIG_DIR / 'anchors.json'
+NAMES_FILE = CONFIG_DIR / 'names.json'
+
+# --profile で個別に表示するリクエスト数
+PROFILE_REQUEST_ROWS = 10
 
 # デフォルト設定
 DEFAULT_CONFIG = {
     'display': {
         'currency_format': 'yen',
         'show_transaction_count': True,
-        'table_style': 'simple'
+        'table_style': 'simple',
+        # この行数を超えるテーブルは table_style のプレーンテキストで描画
+        'fast_table_threshold': 200,
+        # 端末に収まらないプレーンテキストのテーブルをページャーで表示
+        'pager': True
     },
     'behavior': {
         'confirm_transactions': True,
@@ -49,36 +82,59 @@ class CLIContext:
         self.balance_manager: Optional[BalanceManager] = None
         self.config: Dict[str, Any] = {}
         self.dry_run: bool = False
+        # 取得した取引データを再利用する秒数（デーモンで使用）
+        self.ledger_cache_ttl: float = 0
+        self._config_mtime: Optional[float] = None
+        # --profile 指定時の計測
+        self.profiler: Optional[Profiler] = None
         
     def initialize(self, dry_run: bool = False):
-        """クライアントとマネージャーを初期化"""
+        """クライアントとマネージャーを初期化（初期化済みの場合は再利用）"""
         try:
             self.dry_run = dry_run
-            self.config = self.load_config()
             
-            if not dry_run:
-                # 自動認証機能を試行
-                consumer_key = os.getenv('ZAIM_CONSUMER_KEY')
-                consumer_secret = os.getenv('ZAIM_CONSUMER_SECRET')
-                
-                if consumer_key and consumer_secret:
-                    auth_manager = ZaimAuthManager(consumer_key, consumer_secret)
-                    credentials = auth_manager.get_stored_credentials()
-                    
-                    if credentials:
-                        # 保存されたトークンを使用
-                        access_token, access_token_secret = credentials
-                        os.environ['ZAIM_ACCESS_TOKEN'] = access_token
-                        os.environ['ZAIM_ACCESS_TOKEN_SECRET'] = access_token_secret
+            # 設定ファイルは変更されたときだけ読み直す
+            with self.phase('config'):
+                config_mtime = CONFIG_FILE.stat().st_mtime if CONFIG_FILE.exists() else None
+                if not self.config or config_mtime != self._config_mtime:
+                    self.config = self.load_config()
+                    self._config_mtime = config_mtime
+            
+            if not dry_run and self.client is None:
+                # 明示的な引数 → 環境変数 → 保存されたトークン → 設定ファイル の順に認証情報を探す
+                with self.phase('tokens'):
+                    credentials = self.resolve_credentials()
                 
-                self.client = ZaimClient()
-                self.balance_manager = BalanceManager(self.client)
+                with self.phase('client'):
+                    self.client = ZaimClient(credentials=credentials)
+                    self.balance_manager = BalanceManager(self.client, anchor_store=AnchorStore(ANCHOR_FILE),
+                                                          ledger_cache_ttl=self.ledger_cache_ttl)
             
             return True
         except Exception as e:
             console.print(f"[red]❌ 初期化エラー: {e}[/red]")
             return False
     
+    def resolve_credentials(self) -> Credentials:
+        """
+        使用中のプロファイルの認証情報を解決（os.environ は書き換えない）
+        
+        名前付きプロファイルでは、環境変数のアクセストークン（別の利用者のもの）を使わない
+        """
+        chain = default_chain(token_file=CONFIG_DIR / 'tokens.json', config=self.config.get('auth'),
+                              env_fields=list(CONSUMER_FIELDS) if PROFILE_NAME else None)
+        try:
+            return chain.resolve()
+        except ValueError:
+            if PROFILE_NAME:
+                raise Exception(f"プロファイル '{PROFILE_NAME}' は未認証です"
+                                f"（zaim-cli --profile-name {PROFILE_NAME} auth login）")
+            raise
+    
+    def phase(self, name: str):
+        """--profile 指定時はフェーズとして計測するコンテキスト"""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+    
     def load_config(self) -> Dict[str, Any]:
         """設定ファイルを読み込み"""
         if CONFIG_FILE.exists():
@@ -87,7 +143,7 @@ class CLIContext:
                     user_config = yaml.safe_load(f) or {}
                 
                 # デフォルト設定とマージ
-                config = DEFAULT_CONFIG.copy()
+                config = copy.deepcopy(DEFAULT_CONFIG)
                 for section, values in user_config.items():
                     if section in config and isinstance(values, dict):
                         config[section].update(values)
@@ -98,12 +154,12 @@ class CLIContext:
             except Exception as e:
                 console.print(f"[yellow]⚠️ 設定ファイル読み込みエラー: {e}[/yellow]")
         
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
     
     def save_config(self):
         """設定ファイルを保存"""
         try:
-            CONFIG_DIR.mkdir(exist_ok=True)
+            CONFIG_DIR.mkdir(parents=True, exist_ok=True)
             with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
                 yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
             return True
@@ -116,6 +172,33 @@ class CLIContext:
 ctx = CLIContext()
 
 
+def use_profile(name: Optional[str]):
+    """
+    使用するプロファイルを切り替え（設定・トークン・アンカー・名前インデックスのパスを差し替える）
+    
+    Args:
+        name: プロファイル名（None または 'default' の場合はデフォルトプロファイル）
+    """
+    global PROFILE_NAME, CONFIG_DIR, CONFIG_FILE, AUTH_FILE, ANCHOR_FILE, NAMES_FILE
+    
+    name = None if name == 'default' else name
+    config_dir = profile_dir(name)
+    if config_dir == CONFIG_DIR:
+        return
+    
+    PROFILE_NAME = name
+    CONFIG_DIR = config_dir
+    CONFIG_FILE = CONFIG_DIR / 'config.yaml'
+    AUTH_FILE = CONFIG_DIR / 'auth.json'
+    ANCHOR_FILE = CONFIG_DIR / 'anchors.json'
+    NAMES_FILE = CONFIG_DIR / 'names.json'
+    # 別プロファイルのクライアント・設定を引き継がない
+    ctx.client = None
+    ctx.balance_manager = None
+    ctx.config = {}
+    ctx._config_mtime = None
+
+
 def format_amount(amount: int, config: Dict[str, Any]) -> str:
     """金額をフォーマット"""
     if config['display']['currency_format'] == 'yen':
@@ -125,60 +208,172 @@ def format_amount(amount: int, config: Dict[str, Any]) -> str:
 
 
 def output_data(data: Any, output_format: str, headers: Optional[list] = None):
-    """データを指定された形式で出力"""
-    if output_format == 'json':
-        print(json.dumps(data, ensure_ascii=False, indent=2))
-    elif output_format == 'csv':
-        if isinstance(data, list) and data:
-            # リストデータの場合
-            if isinstance(data[0], dict):
-                # 辞書のリストの場合
-                fieldnames = headers or list(data[0].keys())
-                output = StringIO()
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
-                print(output.getvalue().strip())
-            else:
-                # 単純なリストの場合
-                print(','.join(map(str, data)))
-        elif isinstance(data, dict):
-            # 単一の辞書の場合
-            if headers:
-                print(','.join(headers))
-                print(','.join(str(data.get(h, '')) for h in headers))
-            else:
-                print(','.join(data.keys()))
-                print(','.join(map(str, data.values())))
-        else:
-            # その他のデータ
-            print(str(data))
-    elif output_format == 'table':
+    """
+    データを指定された形式で出力
+    
+    辞書のリスト・イテレータは1行ずつ書き出すため、ジェネレータを渡せば全件をメモリに保持しない
+    """
+    if output_format == 'table':
         # Rich テーブル形式（従来の表示）
         return data  # 呼び出し側でテーブル表示を処理
-    else:
+    
+    if output_format not in MACHINE_FORMATS:
         print(str(data))
+        return
+    
+    if isinstance(data, dict):
+        # 単一の辞書の場合
+        if output_format == 'json':
+            print(json.dumps(data, ensure_ascii=False, indent=2))
+        else:
+            RowWriter(output_format, headers).write_all([data])
+        return
+    
+    if isinstance(data, (list, tuple)) and data and not isinstance(data[0], dict):
+        # 単純なリストの場合
+        if output_format == 'json':
+            print(json.dumps(list(data), ensure_ascii=False, indent=2))
+        else:
+            print(','.join(map(str, data)))
+        return
+    
+    if isinstance(data, (list, tuple)) or isinstance(data, Iterator):
+        # 辞書のリスト・イテレータの場合
+        RowWriter(output_format, headers).write_all(data)
+        return
+    
+    # その他のデータ
+    print(str(data))
+
+
+def print_table(table: Table, config: Dict[str, Any]):
+    """
+    テーブルを表示
+    
+    行数が display.fast_table_threshold を超える場合は Rich の描画を使わず、
+    display.table_style のプレーンテキストで1行ずつ書き出す（端末に収まらなければページャーで表示）
+    """
+    display = config.get('display', {})
+    threshold = display.get('fast_table_threshold', DEFAULT_CONFIG['display']['fast_table_threshold'])
+    if table.row_count <= threshold:
+        console.print(table)
+        return
+    
+    def plain(cell) -> str:
+        # Rich のマークアップ（色指定）を取り除く
+        if not isinstance(cell, str):
+            return str(cell)
+        return Text.from_markup(cell).plain if '[' in cell else cell
+    
+    columns = [(plain(column.header), 'right' if column.justify == 'right' else 'left')
+               for column in table.columns]
+    rows = [[plain(cell) for cell in row]
+            for row in zip(*[column.cells for column in table.columns])]
+    title = plain(table.title) if table.title else None
+    writer = PlainTableWriter(columns, display.get('table_style', 'simple'), title)
+    
+    lines = writer.iter_lines(rows)
+    if display.get('pager', True) and sys.stdout.isatty() and len(rows) + 4 > console.size.height:
+        click.echo_via_pager(line + '\n' for line in lines)
+        return
+    
+    try:
+        out = console.file
+        for line in lines:
+            out.write(line + '\n')
+        if table.caption:
+            out.write(plain(table.caption) + '\n')
+        out.flush()
+    except BrokenPipeError:
+        exit_on_broken_pipe()
+
+
+def format_currency_balances(account: Dict[str, Any]) -> str:
+    """通貨別の残高内訳をフォーマット（換算できなかった通貨には * を付ける）"""
+    unconverted = account.get('unconverted', {})
+    return ", ".join(f"{code} {amount:,}{'*' if code in unconverted else ''}"
+                     for code, amount in sorted(account.get('currency_balances', {}).items()))
+
+
+def load_exchange_rates(path: str) -> Dict[str, Any]:
+    """
+    換算レートファイル（YAML）を読み込み
+    
+    形式: {base: JPY, rates: {USD: 150.2, EUR: 162.5}} または {USD: 150.2, ...}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    
+    if 'rates' in data:
+        return {'base': data.get('base'), 'rates': data['rates'] or {}}
+    return {'base': None, 'rates': data}
+
+
+def use_exchange_rates(click_ctx, rates_file: Optional[str], base_currency: Optional[str]):
+    """
+    --rates / --base の換算レートをこのコマンドの間だけ使う
+    
+    BalanceManager はデーモン・shell・batch で後続のコマンドにも使われるため、
+    コマンドの終了時（エラー終了を含む）に元の通貨テーブルへ戻す
+    """
+    manager = ctx.balance_manager
+    saved_table = manager.currency_table
+    click_ctx.call_on_close(lambda: setattr(manager, 'currency_table', saved_table))
+    
+    exchange = load_exchange_rates(rates_file) if rates_file else {'base': None, 'rates': {}}
+    manager.set_exchange_rates(exchange['rates'], base_currency or exchange['base'])
+
+
+def build_balance_table(result: Dict[str, Any], config: Dict[str, Any]) -> Table:
+    """アカウント残高一覧のテーブルを作成"""
+    title = "アカウント残高一覧"
+    if result.get('done') is False:
+        title += f"（集計中: {result['page']}ページ / {result['records']}件）"
+    
+    table = Table(title=title)
+    table.add_column("アカウント名", style="cyan")
+    table.add_column("残高", justify="right", style="green")
+    if config['display']['show_transaction_count']:
+        table.add_column("取引件数", justify="right", style="yellow")
+    
+    show_currencies = any('currency_balances' in account for account in result['accounts'])
+    if show_currencies:
+        table.add_column("通貨別内訳", style="magenta")
+    
+    for account in result['accounts']:
+        row = [account['name'], format_amount(account['balance'], config)]
+        if config['display']['show_transaction_count']:
+            row.append(str(account['transaction_count']))
+        if show_currencies:
+            row.append(format_currency_balances(account))
+        table.add_row(*row)
+    
+    return table
+
+
+def stream_balance_result(snapshots, output_format: str, config: Dict[str, Any]):
+    """
+    途中経過の残高を逐次表示
+    
+    テーブル形式ではRich Liveで同じテーブルを更新し、それ以外は1スナップショット1行のJSONLを出力する
+    """
+    if output_format == 'table':
+        with Live(console=console, auto_refresh=False) as live:
+            for snapshot in snapshots:
+                total_balance = sum(account['balance'] for account in snapshot['accounts'])
+                table = build_balance_table(snapshot, config)
+                table.caption = f"[bold]合計残高: {format_amount(total_balance, config)}[/bold]"
+                live.update(table, refresh=True)
+    else:
+        RowWriter('jsonl', flush_each=True).write_all(snapshots)
 
 
 def show_balance_result(result: Dict[str, Any], config: Dict[str, Any]):
     """残高結果を表示"""
     if 'accounts' in result:
         # 複数アカウントの場合
-        table = Table(title="アカウント残高一覧")
-        table.add_column("アカウント名", style="cyan")
-        table.add_column("残高", justify="right", style="green")
-        if config['display']['show_transaction_count']:
-            table.add_column("取引件数", justify="right", style="yellow")
-        
-        total_balance = 0
-        for account in result['accounts']:
-            total_balance += account['balance']
-            row = [account['name'], format_amount(account['balance'], config)]
-            if config['display']['show_transaction_count']:
-                row.append(str(account['transaction_count']))
-            table.add_row(*row)
-        
-        console.print(table)
+        total_balance = sum(account['balance'] for account in result['accounts'])
+        print_table(build_balance_table(result, config), config)
         console.print(f"\n[bold]合計残高: {format_amount(total_balance, config)}[/bold]")
     else:
         # 単一アカウントの結果表示
@@ -233,20 +428,226 @@ def show_adjustment_result(result: Dict[str, Any], config: Dict[str, Any]):
     console.print(Panel(panel_content, title="残高調整結果", style=panel_style))
 
 
-@click.group()
+def completion_index(click_ctx) -> NameIndex:
+    """補完に使う名前インデックス（--profile-name 指定中はそのプロファイルのもの）"""
+    profile_name = click_ctx.find_root().params.get('profile_name')
+    return NameIndex(profile_dir(profile_name) / 'names.json' if profile_name else NAMES_FILE)
+
+
+def complete_account_name(click_ctx, param, incomplete):
+    """アカウント名の補完（名前インデックスから読み出し、APIは呼ばない）"""
+    return [CompletionItem(entry['name']) for entry in completion_index(click_ctx).entries('accounts')
+            if entry['name'].startswith(incomplete)]
+
+
+def complete_category_id(click_ctx, param, incomplete):
+    """カテゴリIDの補完（説明にカテゴリ名を表示）"""
+    return [CompletionItem(str(entry['id']), help=entry['name'])
+            for entry in completion_index(click_ctx).entries('categories')
+            if str(entry['id']).startswith(incomplete)]
+
+
+def complete_genre_id(click_ctx, param, incomplete):
+    """ジャンルIDの補完（説明にジャンル名を表示）"""
+    return [CompletionItem(str(entry['id']), help=entry['name'])
+            for entry in completion_index(click_ctx).entries('genres')
+            if str(entry['id']).startswith(incomplete)]
+
+
+class CLIGroup(click.Group):
+    """コマンドライン引数を保持するグループ（--profiles で各プロファイルのプロセスに渡す）"""
+    
+    def parse_args(self, click_ctx, args):
+        click_ctx.meta['zaim_cli.argv'] = list(args)
+        return super().parse_args(click_ctx, args)
+
+
+@click.group(cls=CLIGroup)
 @click.option('--dry-run', is_flag=True, help='実際の操作は行わず、プレビューのみ表示')
 @click.option('--json', 'output_format', flag_value='json', help='JSON形式で出力')
 @click.option('--table', 'output_format', flag_value='table', help='テーブル形式で出力')
+@click.option('--jsonl', 'output_format', flag_value='jsonl', help='JSON Lines形式（1行1レコード）で出力')
 @click.option('--csv', 'output_format', flag_value='csv', default=True, help='CSV形式で出力（デフォルト）')
+@click.option('--profile', is_flag=True, help='フェーズ別・HTTPリクエスト別の所要時間を標準エラー出力に表示')
+@click.option('--profile-output', type=click.Path(dir_okay=False, writable=True),
+              help='cProfile の結果（.pstats）を保存するファイル（--profile と併用）')
+@click.option('--profile-name', envvar='ZAIM_CLI_PROFILE',
+              help='使用するプロファイル名（トークン・設定を ~/.zaim-cli/profiles/<名前>/ に保存）')
+@click.option('--profiles', 'profile_names',
+              help='カンマ区切りのプロファイルで並行実行し、profile 列を付けて出力を結合')
 @click.pass_context
-def cli(click_ctx, dry_run, output_format):
+def cli(click_ctx, dry_run, output_format, profile, profile_output, profile_name, profile_names):
     """Zaim家計簿管理CLI"""
-    if not ctx.initialize(dry_run=dry_run):
+    try:
+        if profile_names:
+            sys.exit(run_for_profiles(click_ctx, parse_profile_list(profile_names), dry_run, output_format))
+        if profile_name:
+            use_profile(profile_name)
+    except ValueError as e:
+        if output_format in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ {e}[/red]")
+        sys.exit(1)
+    
+    ctx.profiler = Profiler(profile_output) if profile or profile_output else None
+    
+    # デーモン管理・プロファイル一覧は認証情報なしで実行できる（起動時のみ daemon start 内で初期化）
+    if click_ctx.invoked_subcommand not in ('daemon', 'profile') and not ctx.initialize(dry_run=dry_run):
         sys.exit(1)
     
     click_ctx.ensure_object(dict)
     click_ctx.obj['dry_run'] = dry_run
     click_ctx.obj['output_format'] = output_format
+    
+    if ctx.profiler:
+        start_command_profile(click_ctx, ctx.profiler)
+
+
+def run_for_profiles(click_ctx, names, dry_run: bool, output_format: str) -> int:
+    """
+    サブコマンドを各プロファイルの別プロセスで並行実行し、出力を profile 列付きで結合して表示
+    
+    Returns:
+        終了コード（いずれかのプロファイルが失敗した場合は 1）
+    """
+    args = command_args(click_ctx.meta['zaim_cli.argv'])
+    command = match_command(args, UNSUPPORTED_COMMANDS)
+    if command:
+        raise ValueError(f"{' '.join(command)} は --profiles で実行できません")
+    
+    # 各プロファイルのプロセスは確認できないため、取引を作成するコマンドはここで1回だけ確認する
+    if not dry_run and needs_confirmation(args):
+        command_name = ' '.join(match_command(args, WRITE_COMMANDS))
+        if output_format != 'table' or not sys.stdin.isatty():
+            raise ValueError(f"{command_name} を --profiles で実行するには --force（確認をスキップ）"
+                             f"または --dry-run を指定してください")
+        if not Confirm.ask(f"[yellow]{len(names)}件のプロファイル（{', '.join(names)}）で"
+                           f"「{command_name}」を実行し、取引を作成しますか？[/yellow]"):
+            console.print("操作をキャンセルしました。")
+            return 0
+    
+    argv = (['--dry-run'] if dry_run else []) + args
+    results = run_profiles(names, argv)
+    
+    failed = [result for result in results if result['exit_code'] != 0]
+    for result in failed:
+        message = (result['stderr'].strip() or result['stdout'].strip() or '失敗しました').replace('❌', '').strip()
+        err_console.print(f"[red]❌ {result['profile']}: {escape(message)}[/red]")
+    
+    rows = merge_profile_rows([result for result in results if result['exit_code'] == 0])
+    headers = []
+    for row in rows:
+        headers.extend(key for key in row if key not in headers)
+    
+    if output_format in MACHINE_FORMATS:
+        output_data(rows, output_format, headers)
+    elif rows:
+        table = Table(title=f"プロファイル別の結果（{', '.join(names)}）")
+        for header in headers:
+            table.add_column(header, style="cyan" if header == 'profile' else None)
+        for row in rows:
+            table.add_row(*[format_profile_cell(row.get(header)) for header in headers])
+        print_table(table, ctx.load_config())
+    
+    return 1 if failed else 0
+
+
+def format_profile_cell(value: Any) -> str:
+    """--profiles の結合結果をテーブルのセルに変換"""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return escape(json.dumps(value, ensure_ascii=False))
+    return escape(str(value))
+
+
+def start_command_profile(click_ctx, profiler: Profiler):
+    """サブコマンドの計測を開始し、終了時（エラー終了を含む）にレポートを表示"""
+    client = ctx.client
+    if client is not None:
+        client.add_request_observer(profiler.record_request)
+    command_phase = profiler.begin_phase('command')
+    
+    def finish():
+        profiler.end_phase(command_phase)
+        if client is not None:
+            client.remove_request_observer(profiler.record_request)
+        show_profile(profiler, profiler.stop())
+        ctx.profiler = None
+    
+    click_ctx.call_on_close(finish)
+
+
+def show_profile(profiler: Profiler, totals: Dict[str, float]):
+    """--profile の計測結果を標準エラー出力に表示"""
+    phases = list(profiler.phases)
+    total_wall = totals['wall'] + sum(p['wall'] for p in phases if p['name'] == 'imports')
+    total_cpu = totals['cpu'] + sum(p['cpu'] for p in phases if p['name'] == 'imports')
+    
+    # コマンド実行時間をHTTP待ちとそれ以外（集計・描画）に分ける
+    ledger_wall = sum(r['elapsed'] for r in profiler.requests if r['endpoint'] == '/home/money')
+    other_http_wall = sum(r['elapsed'] for r in profiler.requests) - ledger_wall
+    rows = []
+    for phase in phases:
+        rows.append((phase['name'], phase['wall'], phase['cpu']))
+        if phase['name'] == 'command':
+            rows.append(('  HTTP: 取引データ', ledger_wall, None))
+            rows.append(('  HTTP: マスターデータ・その他', other_http_wall, None))
+            rows.append(('  処理・描画', max(0.0, phase['wall'] - ledger_wall - other_http_wall), None))
+    
+    table = Table(title="プロファイル")
+    table.add_column("フェーズ", style="cyan")
+    table.add_column("経過(ms)", justify="right")
+    table.add_column("CPU(ms)", justify="right")
+    table.add_column("割合", justify="right", style="dim")
+    for name, wall, cpu in rows:
+        table.add_row(name, f"{wall * 1000:,.1f}", f"{cpu * 1000:,.1f}" if cpu is not None else '',
+                      f"{wall / total_wall:.0%}" if total_wall else '')
+    table.add_row("合計", f"{total_wall * 1000:,.1f}", f"{total_cpu * 1000:,.1f}", '', style="bold")
+    err_console.print(table)
+    
+    if profiler.requests:
+        summary = Table(title=f"HTTPリクエスト（{len(profiler.requests)}件）")
+        summary.add_column("エンドポイント", style="cyan")
+        summary.add_column("回数", justify="right")
+        summary.add_column("転送量", justify="right")
+        summary.add_column("合計(ms)", justify="right")
+        summary.add_column("最大(ms)", justify="right")
+        for entry in profiler.request_summary():
+            summary.add_row(entry['endpoint'], str(entry['requests']), f"{entry['bytes']:,}B",
+                            f"{entry['elapsed'] * 1000:,.1f}", f"{entry['slowest'] * 1000:,.1f}")
+        err_console.print(summary)
+        
+        slowest = sorted(profiler.requests, key=lambda r: r['elapsed'], reverse=True)[:PROFILE_REQUEST_ROWS]
+        detail = Table(title=f"遅いリクエスト（上位{len(slowest)}件）")
+        detail.add_column("エンドポイント", style="cyan")
+        detail.add_column("ページ", justify="right")
+        detail.add_column("ステータス", justify="right")
+        detail.add_column("転送量", justify="right")
+        detail.add_column("待ち時間(ms)", justify="right")
+        for request in slowest:
+            detail.add_row(f"{request['method']} {request['endpoint']}", str(request['page'] or ''),
+                           str(request['status'] or '-'), f"{request['bytes']:,}B",
+                           f"{request['elapsed'] * 1000:,.1f}")
+        err_console.print(detail)
+    
+    if profiler.pstats_path:
+        err_console.print(f"[dim]cProfile の結果を {profiler.pstats_path} に保存しました"
+                          f"（python -m pstats {profiler.pstats_path} で参照）[/dim]")
+
+
+@cli.result_callback()
+def refresh_name_index(result, **params):
+    """コマンドで取得したマスターデータで補完用の名前インデックスを更新"""
+    if ctx.balance_manager is None:
+        return
+    
+    try:
+        NameIndex(NAMES_FILE).update(**ctx.balance_manager.loaded_master_data())
+    except OSError:
+        # 補完用のキャッシュなので書き込めなくてもコマンドは成功扱い
+        pass
 
 
 @cli.group()
@@ -255,10 +656,28 @@ def balance():
     pass
 
 
+def show_fetch_stats(stats: Optional[Dict[str, Any]]):
+    """取引取得の転送量レポートを標準エラー出力に表示"""
+    if not stats:
+        return
+    
+    naive = f"{stats['naive_pages']}{'以上' if stats['estimated'] else ''}"
+    cached = f" + キャッシュ{stats['cached_pages']}ページ" if stats.get('cached_pages') else ''
+    err_console.print(f"[dim]取得: {stats['requests']}リクエスト / {stats['pages']}ページ{cached} / "
+                      f"{stats['records']}件（素朴なスキャン: {naive}ページ、"
+                      f"削減: {stats['pages_saved']}ページ）[/dim]")
+
+
 @balance.command('show')
-@click.argument('account_name', required=False)
+@click.argument('account_name', required=False, shell_complete=complete_account_name)
+@click.option('--fetch-stats', is_flag=True, help='取引取得の転送ページ数レポートを標準エラー出力に表示')
+@click.option('--rates', 'rates_file', type=click.Path(exists=True, dir_okay=False),
+              help='外貨を基準通貨に換算するレートファイル（YAML）')
+@click.option('--base', 'base_currency', help='基準通貨コード（デフォルト: JPY）')
+@click.option('--stream', is_flag=True,
+              help='取引データの取得に合わせて途中経過を表示（--table以外はJSONL出力）')
 @click.pass_context
-def balance_show(click_ctx, account_name):
+def balance_show(click_ctx, account_name, fetch_stats, rates_file, base_currency, stream):
     """残高を表示"""
     try:
         output_format = click_ctx.obj['output_format']
@@ -272,7 +691,7 @@ def balance_show(click_ctx, account_name):
                 ]
             }
             
-            if output_format in ['csv', 'json']:
+            if output_format in MACHINE_FORMATS:
                 if 'accounts' in sample_result:
                     output_data(sample_result['accounts'], output_format, 
                                ['id', 'name', 'balance', 'transaction_count'])
@@ -283,9 +702,21 @@ def balance_show(click_ctx, account_name):
                 show_balance_result(sample_result, ctx.config)
             return
         
+        if rates_file or base_currency:
+            use_exchange_rates(click_ctx, rates_file, base_currency)
+        
+        if stream:
+            stream_balance_result(ctx.balance_manager.stream_balance(account_name),
+                                  output_format, ctx.config)
+            if fetch_stats:
+                show_fetch_stats(ctx.balance_manager.last_fetch_stats)
+            return
+        
         result = ctx.balance_manager.show_balance(account_name)
+        if fetch_stats:
+            show_fetch_stats(ctx.balance_manager.last_fetch_stats)
         
-        if output_format in ['csv', 'json']:
+        if output_format in MACHINE_FORMATS:
             if 'accounts' in result:
                 output_data(result['accounts'], output_format, 
                            ['id', 'name', 'balance', 'transaction_count'])
@@ -295,15 +726,68 @@ def balance_show(click_ctx, account_name):
             show_balance_result(result, ctx.config)
         
     except Exception as e:
-        if click_ctx.obj['output_format'] in ['csv', 'json']:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
             print(f"ERROR: {e}")
         else:
             console.print(f"[red]❌ 残高表示エラー: {e}[/red]")
         sys.exit(1)
 
 
+def watch_caption(snapshot: Dict[str, Any], config: Dict[str, Any]) -> str:
+    """balance watch のテーブル下に表示する合計と更新状況"""
+    total_balance = sum(account['balance'] for account in snapshot['accounts'])
+    names = {account['id']: account['name'] for account in snapshot['accounts']}
+    caption = (f"[bold]合計残高: {format_amount(total_balance, config)}[/bold]\n"
+               f"[dim]{datetime.now().strftime('%H:%M:%S')} 更新（{snapshot['poll']}回目 / "
+               f"直近の取引{snapshot['fetched']}件を取得）[/dim]")
+    for account_id, delta in snapshot['changes'].items():
+        style = "green" if delta > 0 else "red"
+        caption += f"\n[{style}]{names[account_id]}: {'+' if delta > 0 else ''}{format_amount(delta, config)}[/{style}]"
+    return caption
+
+
+@balance.command('watch')
+@click.argument('account_name', required=False, shell_complete=complete_account_name)
+@click.option('--interval', type=click.FloatRange(min=1), default=60, show_default=True,
+              help='直近の取引を取り直す間隔（秒）')
+@click.option('--overlap-days', type=click.IntRange(min=0), default=3, show_default=True,
+              help='毎回取り直す直近の日数（この期間内の追加・編集・削除を反映）')
+@click.option('--count', 'polls', type=click.IntRange(min=0), help='取り直しの回数（省略時は Ctrl-C まで）')
+@click.pass_context
+def balance_watch(click_ctx, account_name, interval, overlap_days, polls):
+    """残高を監視（初回のみ全期間を計算し、以降は直近の取引だけを取り直す）"""
+    output_format = click_ctx.obj['output_format']
+    try:
+        if ctx.dry_run:
+            console.print("[yellow]ドライランモード: 残高の監視は行いません[/yellow]")
+            return
+        
+        snapshots = ctx.balance_manager.watch_balance(account_name, interval=interval,
+                                                      overlap_days=overlap_days, polls=polls)
+        if output_format == 'table':
+            with Live(console=console, auto_refresh=False) as live:
+                for snapshot in snapshots:
+                    table = build_balance_table(snapshot, ctx.config)
+                    table.caption = watch_caption(snapshot, ctx.config)
+                    live.update(table, refresh=True)
+        else:
+            writer = RowWriter('jsonl', flush_each=True)
+            for snapshot in snapshots:
+                writer.write(dict(snapshot, polled_at=datetime.now().isoformat(timespec='seconds')))
+            writer.close()
+        
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        if output_format in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ 残高監視エラー: {e}[/red]")
+        sys.exit(1)
+
+
 @balance.command('set')
-@click.argument('account_name')
+@click.argument('account_name', shell_complete=complete_account_name)
 @click.argument('amount', type=int)
 @click.option('--comment', '-c', help='コメント')
 @click.option('--force', '-f', is_flag=True, help='確認をスキップ')
@@ -333,7 +817,7 @@ def balance_set(click_ctx, account_name, amount, comment, force):
                 'status': 'preview'
             }
             
-            if output_format in ['csv', 'json']:
+            if output_format in MACHINE_FORMATS:
                 output_data(sample_result, output_format, 
                            ['account_name', 'current_balance', 'target_balance', 
                             'adjustment_needed', 'action', 'status'])
@@ -350,7 +834,7 @@ def balance_set(click_ctx, account_name, amount, comment, force):
             dry_run=dry_run
         )
         
-        if output_format in ['csv', 'json']:
+        if output_format in MACHINE_FORMATS:
             output_data(result, output_format, 
                        ['account_name', 'current_balance', 'target_balance', 
                         'adjustment_needed', 'action', 'transaction_id'])
@@ -358,7 +842,7 @@ def balance_set(click_ctx, account_name, amount, comment, force):
             show_adjustment_result(result, ctx.config)
         
     except Exception as e:
-        if click_ctx.obj['output_format'] in ['csv', 'json']:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
             print(f"ERROR: {e}")
         else:
             console.print(f"[red]❌ 残高設定エラー: {e}[/red]")
@@ -366,7 +850,7 @@ def balance_set(click_ctx, account_name, amount, comment, force):
 
 
 @balance.command('add')
-@click.argument('account_name')
+@click.argument('account_name', shell_complete=complete_account_name)
 @click.argument('amount', type=int)
 @click.option('--comment', '-c', help='コメント')
 @click.option('--force', '-f', is_flag=True, help='確認をスキップ')
@@ -398,7 +882,7 @@ def balance_add(click_ctx, account_name, amount, comment, force):
                 'status': 'preview'
             }
             
-            if output_format in ['csv', 'json']:
+            if output_format in MACHINE_FORMATS:
                 output_data(sample_result, output_format, 
                            ['account_name', 'current_balance', 'target_balance', 
                             'adjustment_needed', 'action', 'status'])
@@ -415,7 +899,7 @@ def balance_add(click_ctx, account_name, amount, comment, force):
             dry_run=dry_run
         )
         
-        if output_format in ['csv', 'json']:
+        if output_format in MACHINE_FORMATS:
             output_data(result, output_format, 
                        ['account_name', 'current_balance', 'target_balance', 
                         'adjustment_needed', 'action', 'transaction_id'])
@@ -423,7 +907,7 @@ def balance_add(click_ctx, account_name, amount, comment, force):
             show_adjustment_result(result, ctx.config)
         
     except Exception as e:
-        if click_ctx.obj['output_format'] in ['csv', 'json']:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
             print(f"ERROR: {e}")
         else:
             console.print(f"[red]❌ 残高追加エラー: {e}[/red]")
@@ -431,7 +915,7 @@ def balance_add(click_ctx, account_name, amount, comment, force):
 
 
 @balance.command('subtract')
-@click.argument('account_name')
+@click.argument('account_name', shell_complete=complete_account_name)
 @click.argument('amount', type=int)
 @click.option('--comment', '-c', help='コメント')
 @click.option('--force', '-f', is_flag=True, help='確認をスキップ')
@@ -463,7 +947,7 @@ def balance_subtract(click_ctx, account_name, amount, comment, force):
                 'status': 'preview'
             }
             
-            if output_format in ['csv', 'json']:
+            if output_format in MACHINE_FORMATS:
                 output_data(sample_result, output_format, 
                            ['account_name', 'current_balance', 'target_balance', 
                             'adjustment_needed', 'action', 'status'])
@@ -480,7 +964,7 @@ def balance_subtract(click_ctx, account_name, amount, comment, force):
             dry_run=dry_run
         )
         
-        if output_format in ['csv', 'json']:
+        if output_format in MACHINE_FORMATS:
             output_data(result, output_format, 
                        ['account_name', 'current_balance', 'target_balance', 
                         'adjustment_needed', 'action', 'transaction_id'])
@@ -488,13 +972,556 @@ def balance_subtract(click_ctx, account_name, amount, comment, force):
             show_adjustment_result(result, ctx.config)
         
     except Exception as e:
-        if click_ctx.obj['output_format'] in ['csv', 'json']:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
             print(f"ERROR: {e}")
         else:
             console.print(f"[red]❌ 残高減算エラー: {e}[/red]")
         sys.exit(1)
 
 
+def load_reconcile_targets(path: str) -> Dict[str, int]:
+    """
+    残高照合用のターゲットファイル（CSV: アカウント名,目標金額）を読み込み
+    
+    ヘッダー行・空行・#で始まるコメント行は読み飛ばす
+    """
+    targets: Dict[str, int] = {}
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for line_number, row in enumerate(csv.reader(f), start=1):
+            if not row or not row[0].strip() or row[0].strip().startswith('#'):
+                continue
+            if len(row) < 2:
+                raise click.BadParameter(f"{path}:{line_number}: アカウント名と金額が必要です")
+            
+            account_name = row[0].strip()
+            amount_text = row[1].strip().replace(',', '').replace('円', '')
+            try:
+                amount = int(amount_text)
+            except ValueError:
+                if line_number == 1:
+                    # ヘッダー行
+                    continue
+                raise click.BadParameter(f"{path}:{line_number}: 金額が不正です: {row[1]}")
+            
+            targets[account_name] = amount
+    
+    if not targets:
+        raise click.BadParameter(f"{path}: 照合対象がありません")
+    return targets
+
+
+def show_reconcile_plan(results: list, config: Dict[str, Any], title: str):
+    """一括残高照合のプラン・結果を表示"""
+    table = Table(title=title)
+    table.add_column("アカウント名", style="cyan")
+    table.add_column("現在残高", justify="right")
+    table.add_column("目標残高", justify="right")
+    table.add_column("調整額", justify="right")
+    table.add_column("状態", style="yellow")
+    
+    for result in results:
+        adjustment = result['adjustment_needed']
+        if adjustment > 0:
+            adjustment_text = f"[green]+{format_amount(adjustment, config)}[/green]"
+        elif adjustment < 0:
+            adjustment_text = f"[red]{format_amount(adjustment, config)}[/red]"
+        else:
+            adjustment_text = "-"
+        
+        status = result['action']
+        if status == 'error':
+            status = f"error: {result.get('error', '不明')}"
+        
+        table.add_row(result['account_name'],
+                      format_amount(result['current_balance'], config),
+                      format_amount(result['target_balance'], config),
+                      adjustment_text,
+                      status)
+    
+    print_table(table, config)
+
+
+RECONCILE_HEADERS = ['account_name', 'current_balance', 'target_balance',
+                     'adjustment_needed', 'action', 'transaction_id']
+
+
+@balance.command('reconcile')
+@click.argument('targets_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--comment', '-c', help='コメント（全調整取引に共通）')
+@click.option('--force', '-f', is_flag=True, help='確認をスキップ')
+@click.option('--workers', type=int, default=4, show_default=True, help='調整取引の同時作成数')
+@click.option('--anchor', 'create_anchors', is_flag=True, help='照合後の残高を期首残高アンカーとして保存')
+@click.pass_context
+def balance_reconcile(click_ctx, targets_file, comment, force, workers, create_anchors):
+    """ターゲットファイルに従って複数アカウントの残高を一括設定"""
+    try:
+        output_format = click_ctx.obj['output_format']
+        targets = load_reconcile_targets(targets_file)
+        
+        if ctx.dry_run:
+            # サンプルデータでプレビュー
+            plans = []
+            for index, (account_name, amount) in enumerate(targets.items(), start=1):
+                plans.append({
+                    'account_name': account_name,
+                    'account_id': index,
+                    'current_balance': 30000,
+                    'target_balance': amount,
+                    'adjustment_needed': amount - 30000,
+                    'transaction_count': 15,
+                    'action': 'dry_run' if amount != 30000 else 'no_change',
+                    'transaction_id': None
+                })
+            
+            if output_format in MACHINE_FORMATS:
+                output_data(plans, output_format, RECONCILE_HEADERS)
+            else:
+                console.print("[yellow]ドライランモード: 実際の取引は作成されません[/yellow]")
+                show_reconcile_plan(plans, ctx.config, "残高照合プラン")
+            return
+        
+        # 全アカウントの残高を1回のスキャンで計算してプランを作成
+        plans = ctx.balance_manager.plan_balances(targets, comment)
+        pending = [plan for plan in plans if plan['action'] == 'dry_run']
+        
+        if output_format == 'table':
+            show_reconcile_plan(plans, ctx.config, "残高照合プラン")
+        
+        if pending and not force and ctx.config['behavior']['confirm_transactions']:
+            if output_format == 'table':
+                if not Confirm.ask(f"[yellow]{len(pending)}件の調整取引を作成しますか？[/yellow]"):
+                    console.print("操作をキャンセルしました。")
+                    return
+        
+        results = ctx.balance_manager.execute_adjustments(plans, max_workers=workers)
+        
+        if create_anchors:
+            # 照合が確定したアカウントのみアンカーを作成
+            settled = [result for result in results if result['action'] in ('completed', 'no_change')]
+            ctx.balance_manager.anchor_current_balances(
+                {result['account_id']: result['target_balance'] for result in settled},
+                {result['account_id']: result['account_name'] for result in settled}
+            )
+        
+        if output_format in MACHINE_FORMATS:
+            output_data(results, output_format, RECONCILE_HEADERS)
+        else:
+            show_reconcile_plan(results, ctx.config, "残高照合結果")
+            if create_anchors:
+                console.print(f"[green]✅ {len(settled)}件のアンカーを保存しました[/green]")
+        
+        if any(result['action'] == 'error' for result in results):
+            sys.exit(1)
+        
+    except click.BadParameter:
+        raise
+    except Exception as e:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ 残高照合エラー: {e}[/red]")
+        sys.exit(1)
+
+
+@balance.group('anchor')
+def balance_anchor():
+    """期首残高アンカー管理コマンド"""
+    pass
+
+
+ANCHOR_HEADERS = ['account_id', 'account_name', 'date', 'amount', 'currency']
+
+
+@balance_anchor.command('set')
+@click.argument('account_name', shell_complete=complete_account_name)
+@click.argument('amount', type=int)
+@click.option('--date', 'anchor_date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='この日付の終了時点の残高として保存（デフォルト: 昨日）')
+@click.pass_context
+def balance_anchor_set(click_ctx, account_name, amount, anchor_date):
+    """指定日終了時点の残高をアンカーとして保存"""
+    try:
+        output_format = click_ctx.obj['output_format']
+        
+        if ctx.dry_run:
+            console.print("[yellow]ドライランモード: アンカーは保存されません[/yellow]")
+            return
+        
+        anchor = ctx.balance_manager.set_anchor(
+            account_name, amount, anchor_date.date() if anchor_date else None
+        )
+        
+        if output_format in MACHINE_FORMATS:
+            output_data(anchor, output_format, ANCHOR_HEADERS)
+        else:
+            console.print(f"[green]✅ アンカーを保存しました: {anchor['account_name']} "
+                          f"{anchor['date']} 終了時点 {format_amount(amount, ctx.config)}[/green]")
+        
+    except Exception as e:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ アンカー保存エラー: {e}[/red]")
+        sys.exit(1)
+
+
+@balance_anchor.command('list')
+@click.pass_context
+def balance_anchor_list(click_ctx):
+    """保存されたアンカーを一覧表示"""
+    output_format = click_ctx.obj['output_format']
+    anchors = [dict(anchor, account_id=account_id)
+               for account_id, anchor in AnchorStore(ANCHOR_FILE).all().items()]
+    
+    if output_format in MACHINE_FORMATS:
+        output_data(anchors, output_format, ANCHOR_HEADERS)
+    else:
+        table = Table(title="期首残高アンカー一覧")
+        table.add_column("ID", style="blue")
+        table.add_column("アカウント名", style="cyan")
+        table.add_column("日付")
+        table.add_column("残高", justify="right", style="green")
+        for anchor in anchors:
+            currency = anchor.get('currency', 'JPY')
+            amount = (format_amount(anchor['amount'], ctx.config) if currency == 'JPY'
+                      else f"{currency} {anchor['amount']:,}")
+            table.add_row(str(anchor['account_id']), anchor.get('account_name') or '',
+                          anchor['date'], amount)
+        print_table(table, ctx.config)
+
+
+@balance_anchor.command('remove')
+@click.argument('account_name', shell_complete=complete_account_name)
+@click.pass_context
+def balance_anchor_remove(click_ctx, account_name):
+    """アンカーを削除"""
+    try:
+        if ctx.dry_run:
+            console.print("[yellow]ドライランモード: アンカーは削除されません[/yellow]")
+            return
+        
+        account = ctx.balance_manager.find_account_by_name(account_name)
+        if not account:
+            raise Exception(f"アカウント '{account_name}' が見つかりません")
+        
+        if ctx.balance_manager.anchor_store.remove(account['id']):
+            console.print(f"[green]✅ アンカーを削除しました: {account['name']}[/green]")
+        else:
+            console.print(f"[yellow]⚠️ {account['name']} のアンカーはありません[/yellow]")
+        
+    except Exception as e:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ アンカー削除エラー: {e}[/red]")
+        sys.exit(1)
+
+
+@cli.group()
+def money():
+    """取引データコマンド"""
+    pass
+
+
+# エクスポートする取引データの列
+EXPORT_HEADERS = ['id', 'date', 'mode', 'amount', 'currency_code', 'category_id', 'genre_id',
+                  'from_account_id', 'to_account_id', 'name', 'place', 'comment',
+                  'receipt_id', 'active', 'created']
+
+
+def open_export_file(path: str):
+    """エクスポート先を開く（拡張子が .gz の場合は gzip 圧縮）"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+@money.command('export')
+@click.option('--from', 'start_date', required=True, type=click.DateTime(formats=['%Y-%m-%d']),
+              help='開始日（YYYY-MM-DD）')
+@click.option('--to', 'end_date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='終了日（YYYY-MM-DD、デフォルト: 今日）')
+@click.option('--format', 'export_format', type=click.Choice(MACHINE_FORMATS),
+              help='出力形式（デフォルト: グローバルの出力形式、--table の場合は csv）')
+@click.option('--output', '-o', 'output_path', type=click.Path(dir_okay=False, writable=True),
+              help='出力ファイル（.gz で gzip 圧縮、省略時は標準出力）')
+@click.option('--mode', 'modes', multiple=True, type=click.Choice(['payment', 'income', 'transfer']),
+              help='対象モード（複数指定可）')
+@click.option('--category-id', 'category_ids', multiple=True, type=int, shell_complete=complete_category_id,
+              help='対象カテゴリID（複数指定可）')
+@click.option('--genre-id', 'genre_ids', multiple=True, type=int, shell_complete=complete_genre_id,
+              help='対象ジャンルID（複数指定可）')
+@click.option('--workers', type=int, default=1, show_default=True,
+              help='期間を1か月ごとに分割して並行取得する数（1の場合は分割しない）')
+@click.option('--no-progress', is_flag=True, help='進捗表示を行わない')
+@click.pass_context
+def money_export(click_ctx, start_date, end_date, export_format, output_path, modes,
+                 category_ids, genre_ids, workers, no_progress):
+    """期間内の取引データをファイルに書き出す"""
+    output_format = click_ctx.obj['output_format']
+    try:
+        export_format = export_format or (output_format if output_format in MACHINE_FORMATS else 'csv')
+        start = start_date.strftime('%Y-%m-%d')
+        end = (end_date or datetime.now()).strftime('%Y-%m-%d')
+        if start > end:
+            raise ValueError("開始日が終了日より後になっています")
+        
+        if ctx.dry_run:
+            err_console.print(f"[yellow]ドライランモード: {start} 〜 {end} の取引データを "
+                              f"{output_path or '標準出力'} に {export_format} 形式で書き出します[/yellow]")
+            return
+        
+        # 書き出したページをデーモンのページキャッシュ（--ledger-ttl）に残さない
+        planner = ctx.balance_manager.planner
+        filters = {'modes': modes or None, 'category_ids': category_ids or None,
+                   'genre_ids': genre_ids or None}
+        stream = open_export_file(output_path) if output_path else None
+        # 標準出力に書き出す場合も進捗は標準エラー出力に出す
+        show_progress = not no_progress and err_console.is_terminal
+        
+        try:
+            writer = RowWriter(export_format, EXPORT_HEADERS, stream=stream)
+            with Progress(SpinnerColumn(), TextColumn("{task.description}"), BarColumn(),
+                          MofNCompleteColumn(), TextColumn("{task.fields[records]}件"),
+                          console=err_console, transient=True, disable=not show_progress) as progress:
+                plan = planner.plan(start_date=start, end_date=end, **filters)
+                # 複数のリクエストに分かれる絞り込みは、期間を分割して小期間ごとに日付順へ並べ替える
+                if workers > 1 or len(plan.requests) > 1:
+                    windows = planner.split_window(start, end)
+                    task = progress.add_task("取得中", total=len(windows), records=0)
+                    for window, records in planner.execute_windows(start, end, workers=max(1, workers),
+                                                                   cache=False, **filters):
+                        for record in records:
+                            writer.write(record)
+                        progress.update(task, advance=1, records=writer.rows_written,
+                                        description=f"{window[0]} から")
+                else:
+                    task = progress.add_task("取得中", total=None, records=0)
+                    for page in planner.execute(plan, cache=False):
+                        for record in page:
+                            writer.write(record)
+                        progress.update(task, advance=1, records=writer.rows_written)
+            writer.close()
+        finally:
+            if stream is not None:
+                stream.close()
+        
+        if output_path:
+            err_console.print(f"[green]✅ {writer.rows_written}件を {output_path} に書き出しました[/green]")
+        
+    except Exception as e:
+        if output_format in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ エクスポートエラー: {e}[/red]")
+        sys.exit(1)
+
+
+IMPORT_STATUS_LABELS = {'created': '登録', 'valid': '変換可能', 'skipped': 'スキップ', 'error': 'エラー'}
+
+
+@money.command('import')
+@click.argument('statement', type=click.Path(exists=True, dir_okay=False))
+@click.option('--mapping', 'mapping_file', required=True, type=click.Path(exists=True, dir_okay=False),
+              help='列の対応と分類ルールのファイル（YAML）')
+@click.option('--workers', type=click.IntRange(min=1), default=4, show_default=True,
+              help='同時に送信するリクエスト数')
+@click.option('--rate', type=float, default=5.0, show_default=True,
+              help='1秒あたりの最大リクエスト数（0で制限なし）')
+@click.option('--log', 'log_path', type=click.Path(dir_okay=False, writable=True),
+              help='行ごとの結果ログ（拡張子 .jsonl ならJSON Lines、それ以外はCSV）')
+@click.option('--validate', is_flag=True, help='変換と名前の解決だけを行い、登録しない')
+@click.option('--force', '-f', is_flag=True, help='確認をスキップ')
+@click.pass_context
+def money_import(click_ctx, statement, mapping_file, workers, rate, log_path, validate, force):
+    """銀行・カード明細CSVを取引データとして登録"""
+    from zaim_client.importer import StatementImporter, NameResolver, RESULT_HEADERS
+    
+    output_format = click_ctx.obj['output_format']
+    try:
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            mapping = yaml.safe_load(f) or {}
+        
+        if ctx.dry_run:
+            console.print(f"[yellow]ドライランモード: {statement} の取り込みは行いません"
+                          f"（--validate で変換結果を確認できます）[/yellow]")
+            return
+        
+        if not validate and not force and ctx.config['behavior']['confirm_transactions']:
+            if output_format == 'table':
+                if not Confirm.ask(f"[yellow]{statement} の明細を取引として登録しますか？[/yellow]"):
+                    console.print("操作をキャンセルしました。")
+                    return
+        
+        manager = ctx.balance_manager
+        resolver = NameResolver(manager.get_categories()['categories'],
+                                manager.get_genres()['genres'],
+                                manager.get_accounts()['accounts'])
+        importer = StatementImporter(ctx.client, mapping, resolver,
+                                     max_workers=workers, rate=rate)
+        
+        log_file = open(log_path, 'w', encoding='utf-8', newline='') if log_path else None
+        counts = {status: 0 for status in IMPORT_STATUS_LABELS}
+        errors = []
+        try:
+            log_writer = (RowWriter('jsonl' if log_path.endswith('.jsonl') else 'csv',
+                                    RESULT_HEADERS, stream=log_file, flush_each=True)
+                          if log_file else None)
+            stdout_writer = (RowWriter(output_format, RESULT_HEADERS, flush_each=True)
+                             if output_format in MACHINE_FORMATS else None)
+            
+            with Progress(SpinnerColumn(), TextColumn("{task.description}"),
+                          TextColumn("{task.completed}行"), console=err_console, transient=True,
+                          disable=output_format in MACHINE_FORMATS or not err_console.is_terminal) as progress:
+                task = progress.add_task("取り込み中", total=None)
+                for result in importer.run(statement, validate_only=validate):
+                    counts[result['status']] += 1
+                    if result['status'] == 'error':
+                        errors.append(result)
+                    if log_writer:
+                        log_writer.write(result)
+                    if stdout_writer:
+                        stdout_writer.write(result)
+                    progress.update(task, advance=1)
+            
+            if log_writer:
+                log_writer.close()
+            if stdout_writer:
+                stdout_writer.close()
+        finally:
+            if log_file:
+                log_file.close()
+            # 登録した取引を次の残高計算に反映させる
+            manager.planner.clear_cache()
+        
+        if output_format not in MACHINE_FORMATS:
+            table = Table(title=f"明細取り込み結果（{statement}）")
+            table.add_column("結果", style="cyan")
+            table.add_column("行数", justify="right")
+            for status, label in IMPORT_STATUS_LABELS.items():
+                if counts[status]:
+                    table.add_row(label, str(counts[status]))
+            console.print(table)
+            
+            for error in errors[:20]:
+                console.print(f"[red]{error['line']}行目: {error['error']}[/red]")
+            if len(errors) > 20:
+                console.print(f"[red]ほか{len(errors) - 20}件のエラー"
+                              f"{f'（{log_path} を参照）' if log_path else ''}[/red]")
+        
+        if errors:
+            sys.exit(1)
+        
+    except Exception as e:
+        if output_format in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ 明細取り込みエラー: {e}[/red]")
+        sys.exit(1)
+
+
+REPORT_GROUP_KEYS = ['month', 'week', 'category', 'genre', 'account', 'mode']
+
+# 表示用の列名
+REPORT_COLUMN_LABELS = {
+    'month': '月', 'week': '週', 'category_name': 'カテゴリ', 'genre_name': 'ジャンル',
+    'account_name': 'アカウント', 'mode': 'モード'
+}
+
+
+def show_report_result(rows: list, headers: list, config: Dict[str, Any], title: str):
+    """集計結果をテーブル表示"""
+    key_columns = [h for h in headers if h in REPORT_COLUMN_LABELS]
+    
+    table = Table(title=title)
+    for column in key_columns:
+        table.add_column(REPORT_COLUMN_LABELS[column], style="cyan")
+    table.add_column("収入", justify="right", style="green")
+    table.add_column("支出", justify="right", style="red")
+    table.add_column("振替", justify="right")
+    table.add_column("収支", justify="right", style="bold")
+    table.add_column("件数", justify="right", style="dim")
+    
+    for row in rows:
+        net_style = "green" if row['net'] >= 0 else "red"
+        table.add_row(*[str(row[column]) for column in key_columns],
+                      format_amount(row['income'], config),
+                      format_amount(row['payment'], config),
+                      format_amount(row['transfer'], config),
+                      f"[{net_style}]{format_amount(row['net'], config)}[/{net_style}]",
+                      str(row['count']))
+    
+    print_table(table, config)
+    
+    unconverted = [row for row in rows if row.get('unconverted')]
+    if unconverted:
+        console.print(f"[yellow]⚠️ 換算レートのない外貨を含むグループが{len(unconverted)}件あります"
+                      f"（--rates で換算レートを指定してください）[/yellow]")
+
+
+@cli.command('report')
+@click.option('--from', 'start_date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='開始日（YYYY-MM-DD、デフォルト: 今月1日）')
+@click.option('--to', 'end_date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='終了日（YYYY-MM-DD、デフォルト: 今日）')
+@click.option('--by', 'group_by', default='month,category', show_default=True,
+              help=f"集計キー（カンマ区切り: {', '.join(REPORT_GROUP_KEYS)}）")
+@click.option('--mode', 'modes', multiple=True, type=click.Choice(['payment', 'income', 'transfer']),
+              help='対象モード（複数指定可）')
+@click.option('--category-id', 'category_ids', multiple=True, type=int, shell_complete=complete_category_id,
+              help='対象カテゴリID（複数指定可）')
+@click.option('--genre-id', 'genre_ids', multiple=True, type=int, shell_complete=complete_genre_id,
+              help='対象ジャンルID（複数指定可）')
+@click.option('--rates', 'rates_file', type=click.Path(exists=True, dir_okay=False),
+              help='外貨を基準通貨に換算するレートファイル（YAML）')
+@click.option('--base', 'base_currency', help='基準通貨コード（デフォルト: JPY）')
+@click.option('--fetch-stats', is_flag=True, help='取引取得の転送ページ数レポートを標準エラー出力に表示')
+@click.pass_context
+def report(click_ctx, start_date, end_date, group_by, modes, category_ids, genre_ids,
+           rates_file, base_currency, fetch_stats):
+    """期間内の取引をカテゴリ・ジャンル・アカウント・期間ごとに集計"""
+    output_format = click_ctx.obj['output_format']
+    try:
+        keys = [key.strip() for key in group_by.split(',') if key.strip()]
+        unknown = [key for key in keys if key not in REPORT_GROUP_KEYS]
+        if not keys or unknown:
+            raise ValueError(f"集計キーは {', '.join(REPORT_GROUP_KEYS)} から指定してください"
+                             + (f": {', '.join(unknown)}" if unknown else ''))
+        
+        today = datetime.now()
+        start = (start_date or today.replace(day=1)).strftime('%Y-%m-%d')
+        end = (end_date or today).strftime('%Y-%m-%d')
+        
+        if ctx.dry_run:
+            console.print(f"[yellow]ドライランモード: {start} 〜 {end} の取引を "
+                          f"{', '.join(keys)} ごとに集計します[/yellow]")
+            return
+        
+        if rates_file or base_currency:
+            use_exchange_rates(click_ctx, rates_file, base_currency)
+        
+        ledger_report = ctx.balance_manager.build_report(keys, start_date=start, end_date=end,
+                                                         modes=modes or None,
+                                                         category_ids=category_ids or None,
+                                                         genre_ids=genre_ids or None)
+        if fetch_stats:
+            show_fetch_stats(ctx.balance_manager.last_fetch_stats)
+        
+        rows = ledger_report.rows()
+        if output_format in MACHINE_FORMATS:
+            output_data(rows, output_format, ledger_report.headers())
+        else:
+            show_report_result(rows, ledger_report.headers(), ctx.config,
+                               f"集計レポート（{start} 〜 {end}、{ledger_report.records}件）")
+        
+    except Exception as e:
+        if output_format in MACHINE_FORMATS:
+            print(f"ERROR: {e}")
+        else:
+            console.print(f"[red]❌ 集計エラー: {e}[/red]")
+        sys.exit(1)
+
+
 @cli.group()
 def account():
     """アカウント管理コマンド"""
@@ -515,7 +1542,7 @@ def account_list(click_ctx, active_only):
                 {"id": 2, "name": "サンプルカード", "active": 1, "status": "active"}
             ]
             
-            if output_format in ['csv', 'json']:
+            if output_format in MACHINE_FORMATS:
                 output_data(sample_accounts, output_format, ['id', 'name', 'active', 'status'])
             else:
                 console.print("[yellow]ドライランモード: サンプルアカウント情報です[/yellow]")
@@ -528,7 +1555,7 @@ def account_list(click_ctx, active_only):
                 console.print(table)
             return
         
-        accounts = ctx.client.get_accounts()
+        accounts = ctx.balance_manager.get_accounts()
         account_data = []
         
         for account in accounts['accounts']:
@@ -542,7 +1569,7 @@ def account_list(click_ctx, active_only):
                 'status': 'active' if account['active'] == 1 else 'inactive'
             })
         
-        if output_format in ['csv', 'json']:
+        if output_format in MACHINE_FORMATS:
             output_data(account_data, output_format, ['id', 'name', 'active', 'status'])
         else:
             table = Table(title="アカウント一覧")
@@ -554,10 +1581,10 @@ def account_list(click_ctx, active_only):
                 status_text = "✅ アクティブ" if account_info['active'] == 1 else "❌ 非アクティブ"
                 table.add_row(str(account_info['id']), account_info['name'], status_text)
             
-            console.print(table)
+            print_table(table, ctx.config)
         
     except Exception as e:
-        if click_ctx.obj['output_format'] in ['csv', 'json']:
+        if click_ctx.obj['output_format'] in MACHINE_FORMATS:
             print(f"ERROR: {e}")
         else:
             console.print(f"[red]❌ アカウント一覧取得エラー: {e}[/red]")
@@ -585,7 +1612,7 @@ def auth_login(click_ctx, port, print_url, timeout):
             console.print("[red]❌ ZAIM_CONSUMER_KEY と ZAIM_CONSUMER_SECRET 環境変数を設定してください[/red]")
             sys.exit(1)
         
-        auth_manager = ZaimAuthManager(consumer_key, consumer_secret)
+        auth_manager = ZaimAuthManager(consumer_key, consumer_secret, config_dir=CONFIG_DIR)
         success = auth_manager.login(port=port, print_url=print_url, timeout=timeout)
         
         if not success:
@@ -597,9 +1624,12 @@ def auth_login(click_ctx, port, print_url, timeout):
 
 
 @auth.command('whoami')
+@click.option('--refresh', is_flag=True, help='保存された確認結果を使わずにAPIで確認し直す')
+@click.option('--ttl', type=int, default=DEFAULT_VERIFY_TTL, show_default=True,
+              help='保存された確認結果を使う秒数（0の場合は常にAPIで確認）')
 @click.pass_context
-def auth_whoami(click_ctx):
-    """現在のユーザー情報を表示"""
+def auth_whoami(click_ctx, refresh, ttl):
+    """現在のユーザー情報を表示（確認結果は --ttl 秒間再利用）"""
     try:
         consumer_key = os.getenv('ZAIM_CONSUMER_KEY')
         consumer_secret = os.getenv('ZAIM_CONSUMER_SECRET')
@@ -608,14 +1638,14 @@ def auth_whoami(click_ctx):
             console.print("[red]❌ ZAIM_CONSUMER_KEY と ZAIM_CONSUMER_SECRET 環境変数を設定してください[/red]")
             sys.exit(1)
         
-        auth_manager = ZaimAuthManager(consumer_key, consumer_secret)
+        auth_manager = ZaimAuthManager(consumer_key, consumer_secret, config_dir=CONFIG_DIR)
         output_format = click_ctx.obj.get('output_format', 'json')
         
-        if output_format in ['csv', 'json']:
+        if output_format in MACHINE_FORMATS:
             # 静寂モード
-            success = auth_manager.whoami()
+            success = auth_manager.whoami(ttl=ttl, refresh=refresh)
         else:
-            success = auth_manager.whoami()
+            success = auth_manager.whoami(ttl=ttl, refresh=refresh)
         
         if not success:
             sys.exit(1)
@@ -636,7 +1666,7 @@ def auth_logout():
             console.print("[red]❌ ZAIM_CONSUMER_KEY と ZAIM_CONSUMER_SECRET 環境変数を設定してください[/red]")
             sys.exit(1)
         
-        auth_manager = ZaimAuthManager(consumer_key, consumer_secret)
+        auth_manager = ZaimAuthManager(consumer_key, consumer_secret, config_dir=CONFIG_DIR)
         success = auth_manager.logout()
         
         if not success:
@@ -704,13 +1734,40 @@ def config_reset(force):
             console.print("操作をキャンセルしました。")
             return
     
-    ctx.config = DEFAULT_CONFIG.copy()
+    ctx.config = copy.deepcopy(DEFAULT_CONFIG)
     if ctx.save_config():
         console.print("[green]✅ 設定をデフォルトにリセットしました[/green]")
     else:
         console.print("[red]❌ 設定のリセットに失敗しました[/red]")
 
 
+@cli.group()
+def profile():
+    """プロファイル管理コマンド"""
+    pass
+
+
+@profile.command('list')
+@click.pass_context
+def profile_list(click_ctx):
+    """保存されているプロファイルを一覧表示"""
+    output_format = click_ctx.obj['output_format']
+    profiles = [dict(entry, active=entry['name'] == (PROFILE_NAME or 'default')) for entry in list_profiles()]
+    
+    if output_format in MACHINE_FORMATS:
+        output_data(profiles, output_format, ['name', 'path', 'authenticated', 'active'])
+    else:
+        table = Table(title="プロファイル一覧")
+        table.add_column("名前", style="cyan")
+        table.add_column("保存先")
+        table.add_column("認証", justify="center")
+        for entry in profiles:
+            name = f"[bold]{entry['name']}[/bold] *" if entry['active'] else entry['name']
+            table.add_row(name, entry['path'], "✅" if entry['authenticated'] else "-")
+        print_table(table, DEFAULT_CONFIG)
+        console.print("[dim]* 使用中のプロファイル（--profile-name または ZAIM_CLI_PROFILE で切り替え）[/dim]")
+
+
 @cli.command('version')
 def version():
     """バージョン情報を表示"""
@@ -718,5 +1775,260 @@ def version():
     console.print("Zaim API Python Client with CLI interface")
 
 
+@cli.group()
+def daemon():
+    """常駐デーモン管理コマンド"""
+    pass
+
+
+@daemon.command('start')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='ソケットパス')
+@click.option('--ledger-ttl', type=float, default=60, show_default=True,
+              help='取得した取引データを再利用する秒数')
+@click.pass_context
+def daemon_start(click_ctx, socket_path, ledger_ttl):
+    """デーモンをフォアグラウンドで起動"""
+    from zaim_cli.daemon import DaemonServer, default_socket_path
+    
+    # 認証済みクライアントとマスターデータを起動時に用意しておく
+    ctx.ledger_cache_ttl = ledger_ttl
+    if not ctx.initialize(dry_run=click_ctx.obj['dry_run']):
+        sys.exit(1)
+    
+    server = DaemonServer(Path(socket_path) if socket_path else default_socket_path(), run_captured)
+    err_console.print(f"[green]✅ デーモンを起動しました (PID: {os.getpid()}, ソケット: {server.socket_path})[/green]")
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    err_console.print("デーモンを停止しました")
+
+
+@daemon.command('stop')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='ソケットパス')
+def daemon_stop(socket_path):
+    """デーモンを停止"""
+    from zaim_cli.daemon import request
+    
+    try:
+        request('shutdown', Path(socket_path) if socket_path else None)
+        console.print("[green]✅ デーモンを停止しました[/green]")
+    except OSError:
+        console.print("[yellow]⚠️ デーモンは起動していません[/yellow]")
+        sys.exit(1)
+
+
+@daemon.command('status')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='ソケットパス')
+@click.pass_context
+def daemon_status(click_ctx, socket_path):
+    """デーモンの状態を表示"""
+    from zaim_cli.daemon import request
+    
+    try:
+        status = request('ping', Path(socket_path) if socket_path else None)
+    except OSError:
+        console.print("[yellow]⚠️ デーモンは起動していません[/yellow]")
+        sys.exit(1)
+    
+    output_format = click_ctx.obj['output_format']
+    if output_format in MACHINE_FORMATS:
+        output_data(status, output_format, ['pid', 'uptime', 'requests_served', 'socket'])
+    else:
+        console.print(Panel(f"PID: {status['pid']}\n"
+                            f"稼働時間: {status['uptime']}秒\n"
+                            f"処理コマンド数: {status['requests_served']}\n"
+                            f"ソケット: {status['socket']}",
+                            title="デーモン状態", style="blue"))
+
+
+def inherited_global_args(click_ctx) -> list:
+    """shell / batch から実行するコマンドに引き継ぐグローバルオプション"""
+    global_args = []
+    if click_ctx.obj['dry_run']:
+        global_args.append('--dry-run')
+    global_args.append(f"--{click_ctx.obj['output_format']}")
+    return global_args
+
+
+@cli.command('shell')
+@click.pass_context
+def shell(click_ctx):
+    """対話シェルを起動（1つのセッションで複数コマンドを実行）"""
+    from zaim_cli.shell import ZaimShell
+    
+    global_args = inherited_global_args(click_ctx)
+    
+    def run(args):
+        # 行頭でグローバルオプションを指定した場合はそちらを優先
+        return invoke_cli(args if args[0].startswith('-') else global_args + args)
+    
+    def account_names():
+        if ctx.balance_manager is None:
+            return []
+        try:
+            return [account['name'] for account in ctx.balance_manager.get_accounts()['accounts']]
+        except Exception:
+            return []
+    
+    commands = {name: sorted(getattr(command, 'commands', {}))
+                for name, command in cli.commands.items() if name != 'shell'}
+    
+    ZaimShell(run, commands, account_names, history_file=CONFIG_DIR / 'shell_history').run()
+
+
+# batch から実行できないコマンド
+BATCH_EXCLUDED_COMMANDS = {'batch', 'shell', 'daemon'}
+
+
+@cli.command('batch')
+@click.argument('commands_file', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--stop-on-error', is_flag=True, help='失敗したコマンドがあればそこで中断')
+@click.pass_context
+def batch(click_ctx, commands_file, stop_on_error):
+    """
+    ファイル（省略時は標準入力）の各行をコマンドとして1プロセスで順に実行
+    
+    空行と # で始まる行は無視する。結果はコマンドごとの終了コードと出力を含むJSONで出力する
+    （--table の場合は一覧表）。
+    """
+    import shlex
+    import time
+    
+    global_args = inherited_global_args(click_ctx)
+    lines = commands_file.read().splitlines()
+    results = []
+    
+    for line_number, line in enumerate(lines, start=1):
+        command = line.strip()
+        if not command or command.startswith('#'):
+            continue
+        
+        started = time.perf_counter()
+        try:
+            args = shlex.split(command)
+        except ValueError as e:
+            args = None
+            exit_code, stdout, stderr = 2, '', f"ERROR: {e}\n"
+        
+        if args is not None:
+            command_names = [arg for arg in args if not arg.startswith('-')]
+            if command_names and command_names[0] in BATCH_EXCLUDED_COMMANDS:
+                exit_code, stdout, stderr = 2, '', f"ERROR: batch内では実行できないコマンドです: {command}\n"
+            else:
+                exit_code, stdout, stderr = run_captured(
+                    args if args[0].startswith('-') else global_args + args
+                )
+        
+        if click_ctx.obj['output_format'] == 'table':
+            # 一覧表形式では各コマンドの出力をそのまま表示していく
+            console.print(f"[dim]$ {escape(command)}[/dim]")
+            sys.stdout.write(stdout)
+            sys.stderr.write(stderr)
+        
+        results.append({
+            'line': line_number,
+            'command': command,
+            'exit_code': exit_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'stdout': stdout,
+            'stderr': stderr
+        })
+        
+        if exit_code != 0 and stop_on_error:
+            break
+    
+    failed = sum(1 for result in results if result['exit_code'] != 0)
+    summary = {
+        'total': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }
+    
+    if click_ctx.obj['output_format'] == 'table':
+        table = Table(title="バッチ実行結果")
+        table.add_column("行", justify="right", style="blue")
+        table.add_column("コマンド", style="cyan")
+        table.add_column("終了コード", justify="right")
+        table.add_column("時間(ms)", justify="right", style="yellow")
+        for result in results:
+            code_style = "green" if result['exit_code'] == 0 else "red"
+            table.add_row(str(result['line']), escape(result['command']),
+                          f"[{code_style}]{result['exit_code']}[/{code_style}]",
+                          f"{result['duration_ms']:.1f}")
+        console.print(table)
+        console.print(f"\n[bold]成功: {summary['succeeded']}件 / 失敗: {summary['failed']}件[/bold]")
+    else:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    
+    if failed:
+        sys.exit(1)
+
+
+def invoke_cli(args: list) -> int:
+    """
+    現在のプロセス内でCLIコマンドを実行して終了コードを返す
+    
+    sys.exit や click の例外をプロセス終了ではなく終了コードに変換する。
+    行頭の --profile-name による切り替えはそのコマンドだけに適用し、終了後に元のプロファイルへ戻す
+    """
+    saved_profile = PROFILE_NAME
+    try:
+        result = cli.main(args=args, prog_name='zaim-cli', standalone_mode=False)
+        return result if isinstance(result, int) else 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        print("Aborted!", file=sys.stderr)
+        return 1
+    finally:
+        use_profile(saved_profile)
+
+
+def run_captured(args: list, terminal: Optional[Dict[str, Any]] = None):
+    """
+    CLIコマンドを実行し、出力を文字列として返す（デーモン用）
+    
+    Args:
+        args: コマンドライン引数
+        terminal: 呼び出し元の端末情報 {'isatty': bool, 'width': int, 'cwd': str}
+        
+    Returns:
+        (終了コード, 標準出力, 標準エラー出力)
+    """
+    global console, err_console
+    terminal = terminal or {}
+    stdout, stderr = StringIO(), StringIO()
+    saved_consoles = console, err_console
+    saved_stdin = sys.stdin
+    saved_cwd = os.getcwd()
+    
+    # Rich の出力は呼び出し元の端末に合わせる
+    console = Console(file=stdout, force_terminal=terminal.get('isatty', False),
+                      width=terminal.get('width'))
+    err_console = Console(file=stderr, force_terminal=terminal.get('isatty', False),
+                          width=terminal.get('width'))
+    # デーモンには入力がないため、確認プロンプトは即座に失敗させる
+    sys.stdin = StringIO()
+    try:
+        # 相対パスの引数（明細・出力ファイルなど）は呼び出し元のディレクトリで解決する
+        if terminal.get('cwd'):
+            os.chdir(terminal['cwd'])
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            exit_code = invoke_cli(args)
+    finally:
+        console, err_console = saved_consoles
+        sys.stdin = saved_stdin
+        os.chdir(saved_cwd)
+    
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
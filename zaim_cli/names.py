@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+シェル補完用の名前インデックス
+アカウント・カテゴリ・ジャンルの名前をディスクに保存し、補完時はAPIを呼ばずに読み出す
+
+補完は新しいインタープリタで毎回実行されるため、このモジュールは標準ライブラリのみを使う
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Iterable, Tuple
+
+from zaim_cli.profiles import active_profile, profile_dir, VALUE_OPTIONS
+
+
+# インデックスに保存するマスターデータの種類
+NAME_KINDS = ('accounts', 'categories', 'genres')
+
+# アカウント名を位置引数に取るコマンド
+ACCOUNT_ARGUMENT_COMMANDS = {
+    ('balance', 'show'), ('balance', 'set'), ('balance', 'add'), ('balance', 'subtract'),
+    ('balance', 'watch'),
+    ('balance', 'anchor', 'set'), ('balance', 'anchor', 'remove')
+}
+
+# IDを値に取るオプションと補完に使うマスターデータ
+ID_OPTIONS = {'--category-id': 'categories', '--genre-id': 'genres'}
+
+
+def default_index_path(profile: Optional[str] = None) -> Path:
+    """
+    名前インデックスのパス
+
+    Args:
+        profile: プロファイル名（Noneの場合は ZAIM_CLI_PROFILE のプロファイル）
+    """
+    return profile_dir(profile or active_profile()) / 'names.json'
+
+
+class NameIndex:
+    """マスターデータの名前インデックス"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        初期化
+
+        Args:
+            path: インデックスファイル（Noneの場合は使用中のプロファイルの names.json）
+        """
+        self.path = Path(path) if path else default_index_path()
+
+    def load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """インデックスを読み込み（存在しない・壊れている場合は空）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def entries(self, kind: str) -> List[Dict[str, Any]]:
+        """指定した種類の {id, name} のリスト"""
+        return self.load().get(kind, [])
+
+    def update(self, **masters: Optional[Iterable[Dict[str, Any]]]) -> bool:
+        """
+        取得済みのマスターデータでインデックスを更新
+
+        内容が変わらない場合は書き込まない
+
+        Args:
+            **masters: accounts / categories / genres のマスターデータ（Noneの種類は既存のまま）
+
+        Returns:
+            書き込んだかどうか
+        """
+        data = self.load()
+        updated = dict(data)
+        for kind in NAME_KINDS:
+            items = masters.get(kind)
+            if items is not None:
+                updated[kind] = [{'id': item['id'], 'name': item['name']}
+                                 for item in items if item.get('name')]
+
+        if updated == data:
+            return False
+
+        # 補完中のプロセスが書きかけのファイルを読まないよう置き換えで保存
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(updated, f, ensure_ascii=False, separators=(',', ':'))
+        temp_path.chmod(0o600)
+        os.replace(temp_path, self.path)
+        return True
+
+    def complete(self, args: List[str], incomplete: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """
+        入力中のコマンドラインから補完候補を求める
+
+        単純な形（グローバルオプション + コマンド + 補完対象）だけを扱い、
+        判断できない場合は None を返して click の補完に任せる
+
+        Args:
+            args: プログラム名を除いた確定済みの引数
+            incomplete: 補完対象の入力途中の単語
+
+        Returns:
+            [(値, 説明)] または None
+        """
+        if args and args[-1] in ID_OPTIONS:
+            return [(str(item['id']), item['name']) for item in self.entries(ID_OPTIONS[args[-1]])
+                    if str(item['id']).startswith(incomplete)]
+
+        if incomplete.startswith('-'):
+            return None
+
+        # 先頭のグローバルオプション（値を取るものは値も）を読み飛ばす
+        words = list(args)
+        while words and words[0].startswith('-'):
+            option = words.pop(0)
+            if option in VALUE_OPTIONS and words:
+                words.pop(0)
+
+        if tuple(words) in ACCOUNT_ARGUMENT_COMMANDS:
+            return [(item['name'], None) for item in self.entries('accounts')
+                    if item['name'].startswith(incomplete)]
+        return None
+
+
+def fast_complete(environ: Dict[str, str], prog_name: str = 'zaim-cli') -> bool:
+    """
+    click のシェル補完要求にインデックスだけで応答する
+
+    click と CLI 本体を読み込まずに済むため、補完の待ち時間が短い
+
+    Args:
+        environ: 環境変数
+        prog_name: プログラム名（補完用の環境変数名に使用）
+
+    Returns:
+        応答した場合は True（False の場合は click の補完に任せる）
+    """
+    instruction = environ.get('_' + prog_name.replace('-', '_').upper() + '_COMPLETE', '')
+    shell, _, action = instruction.partition('_')
+    if action != 'complete' or shell not in ('bash', 'zsh', 'fish'):
+        return False
+
+    import shlex
+    try:
+        words = shlex.split(environ.get('COMP_WORDS', ''))
+    except ValueError:
+        return False
+
+    if shell == 'fish':
+        incomplete = environ.get('COMP_CWORD', '')
+        if incomplete:
+            try:
+                incomplete = shlex.split(incomplete)[0]
+            except (ValueError, IndexError):
+                return False
+        args = words[1:]
+        if incomplete and args and args[-1] == incomplete:
+            args.pop()
+    else:
+        try:
+            cword = int(environ.get('COMP_CWORD', ''))
+        except ValueError:
+            return False
+        args = words[1:cword]
+        incomplete = words[cword] if cword < len(words) else ''
+
+    # --profile-name 指定中はそのプロファイルのインデックスから補完
+    profile = None
+    if '--profile-name' in args[:-1]:
+        profile = args[args.index('--profile-name') + 1]
+    try:
+        index = NameIndex(default_index_path(profile))
+    except ValueError:
+        return False
+
+    candidates = index.complete(args, incomplete)
+    if candidates is None:
+        return False
+
+    # click の各シェル向け format_completion と同じ形式で出力
+    lines = []
+    for value, help_text in candidates:
+        if shell == 'zsh':
+            if help_text:
+                value = value.replace(':', r'\:')
+            lines.append(f"plain\n{value}\n{help_text or '_'}")
+        elif shell == 'fish' and help_text:
+            lines.append(f"plain,{value}\t{help_text}")
+        else:
+            lines.append(f"plain,{value}")
+
+    if lines:
+        print('\n'.join(lines))
+    return True
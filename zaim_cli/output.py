@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+CLI出力のストリーミングライター
+行を生成された順に書き出し、全件をメモリに保持しない
+"""
+
+import os
+import sys
+import csv
+import json
+import unicodedata
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+
+# 機械処理向けの出力形式
+STREAM_FORMATS = ('csv', 'json', 'jsonl')
+
+
+def exit_on_broken_pipe():
+    """
+    出力先のパイプが閉じられた場合（head などへのパイプ）に静かに終了
+
+    以降の標準出力への書き込み（終了時のフラッシュを含む）で再度エラーにならないよう
+    標準出力を /dev/null に付け替えてから終了する
+    """
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except (OSError, ValueError):
+        # StringIO など、ファイル記述子を持たない出力先
+        pass
+    sys.exit(1)
+
+
+class RowWriter:
+    """辞書の行を CSV / JSON配列 / JSONL で逐次出力するライター"""
+
+    def __init__(self, output_format: str, headers: Optional[List[str]] = None,
+                 stream: Optional[TextIO] = None, flush_each: bool = False):
+        """
+        初期化
+
+        Args:
+            output_format: 'csv', 'json'（JSON配列）, 'jsonl'（1行1JSON）
+            headers: 出力する列（Noneの場合は最初の行のキー）
+            stream: 出力先（Noneの場合は標準出力）
+            flush_each: 1行ごとにフラッシュするかどうか（進捗を即座に見せたい場合）
+        """
+        if output_format not in STREAM_FORMATS:
+            raise ValueError(f"output_format must be one of {', '.join(STREAM_FORMATS)}")
+
+        self.output_format = output_format
+        self.headers = headers
+        self.stream = stream
+        self.flush_each = flush_each
+        self.rows_written = 0
+        self._csv_writer = None
+
+    @property
+    def _out(self) -> TextIO:
+        # デーモンなどで sys.stdout が差し替えられても追従する
+        return self.stream or sys.stdout
+
+    def write(self, row: Dict[str, Any]):
+        """1行を書き出す"""
+        try:
+            if self.output_format == 'csv':
+                if self._csv_writer is None:
+                    fieldnames = self.headers or list(row.keys())
+                    self._csv_writer = csv.DictWriter(self._out, fieldnames=fieldnames,
+                                                      extrasaction='ignore', lineterminator='\n')
+                    self._csv_writer.writeheader()
+                self._csv_writer.writerow(row)
+            elif self.output_format == 'jsonl':
+                self._out.write(json.dumps(row, ensure_ascii=False) + '\n')
+            else:
+                # json.dumps(rows, indent=2) と同じ形になるよう要素ごとに字下げして書き出す
+                item = json.dumps(row, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                self._out.write(('[\n  ' if self.rows_written == 0 else ',\n  ') + item)
+
+            self.rows_written += 1
+            if self.flush_each:
+                self._out.flush()
+        except BrokenPipeError:
+            exit_on_broken_pipe()
+
+    def write_all(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        全行を書き出して閉じる
+
+        Returns:
+            書き出した行数
+        """
+        for row in rows:
+            self.write(row)
+        self.close()
+        return self.rows_written
+
+    def close(self):
+        """出力を終える（JSON配列の閉じ括弧とフラッシュ）"""
+        try:
+            if self.output_format == 'json':
+                self._out.write('\n]\n' if self.rows_written else '[]\n')
+            elif self.output_format == 'csv' and self._csv_writer is None and self.headers:
+                # 0件でもヘッダー行は出力する
+                self._out.write(','.join(self.headers) + '\n')
+            self._out.flush()
+        except BrokenPipeError:
+            exit_on_broken_pipe()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        return False
+
+
+# PlainTableWriter が自前で描画する罫線スタイル（tabulate の同名の形式と同じ見た目）
+# {名前: ((行の左端, 列の区切り, 行の右端), 上下の罫線, ヘッダー下の罫線)}
+# 罫線は (左端, 交点, 右端) で、None は罫線なし
+PLAIN_TABLE_STYLES = {
+    'plain': (('', '  ', ''), None, None),
+    'simple': (('', '  ', ''), None, ('', '  ', '')),
+    'github': (('| ', ' | ', ' |'), None, ('|-', '-|-', '-|')),
+    'psql': (('| ', ' | ', ' |'), ('+-', '-+-', '-+'), ('|-', '-+-', '-|')),
+}
+
+# 列幅を決めるために先読みする行数（イテレータで渡された場合）
+WIDTH_SAMPLE_ROWS = 1000
+
+
+def display_width(text: str) -> int:
+    """端末上の表示幅（全角文字は2）"""
+    return sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in text)
+
+
+def _pad(text: str, width: int, align: str) -> str:
+    padding = ' ' * max(0, width - display_width(text))
+    return padding + text if align == 'right' else text + padding
+
+
+class PlainTableWriter:
+    """
+    大量の行を線形時間で描画するプレーンテキストのテーブル
+
+    Rich の Table は全行を保持してから描画するため、数千行では遅くメモリも消費する。
+    こちらは列幅を1回の走査で決めたあと、1行ずつ文字列にして書き出す。
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, str]], style: str = 'simple',
+                 title: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            columns: [(見出し, 'left' または 'right')]
+            style: 罫線スタイル（PLAIN_TABLE_STYLES 以外は tabulate で描画）
+            title: テーブルの上に表示するタイトル
+        """
+        self.columns = list(columns)
+        self.style = style
+        self.title = title
+
+    def iter_lines(self, rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+        """
+        テーブルを1行ずつの文字列として返す
+
+        リストで渡された場合は全行から、イテレータの場合は先頭 WIDTH_SAMPLE_ROWS 行から列幅を決める
+
+        Args:
+            rows: 列の値のシーケンス
+        """
+        rows = iter(rows) if not isinstance(rows, list) else rows
+        sample = rows if isinstance(rows, list) else list(islice(rows, WIDTH_SAMPLE_ROWS))
+        sample = [[str(value) for value in row] for row in sample]
+
+        if self.title:
+            yield self.title
+
+        if self.style not in PLAIN_TABLE_STYLES:
+            # tabulate の形式名（fancy_grid など）はそのまま tabulate に任せる
+            from tabulate import tabulate
+            rest = [[str(value) for value in row] for row in rows] if not isinstance(rows, list) else []
+            yield from tabulate(sample + rest, headers=[header for header, _ in self.columns],
+                                tablefmt=self.style,
+                                colalign=[align for _, align in self.columns]).split('\n')
+            return
+
+        (left, separator, right), outer_rule, header_rule = PLAIN_TABLE_STYLES[self.style]
+        widths = [display_width(header) for header, _ in self.columns]
+        for row in sample:
+            for index, value in enumerate(row):
+                widths[index] = max(widths[index], display_width(value))
+
+        def format_row(values, aligns):
+            return (left + separator.join(_pad(value, width, align)
+                                          for value, width, align in zip(values, widths, aligns))
+                    + right).rstrip()
+
+        def format_rule(parts):
+            rule_left, joint, rule_right = parts
+            return rule_left + joint.join('-' * width for width in widths) + rule_right
+
+        aligns = [align for _, align in self.columns]
+        if outer_rule:
+            yield format_rule(outer_rule)
+        yield format_row([header for header, _ in self.columns], aligns)
+        if header_rule:
+            yield format_rule(header_rule)
+        for row in sample:
+            yield format_row(row, aligns)
+        if not isinstance(rows, list):
+            for row in rows:
+                yield format_row([str(value) for value in row], aligns)
+        if outer_rule:
+            yield format_rule(outer_rule)
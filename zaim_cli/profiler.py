@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+--profile 用の計測
+フェーズごとの経過時間・CPU時間と、HTTPリクエストごとの転送量・待ち時間を記録する
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any
+
+
+# launcher が計測した CLI 本体の import 時間（秒）: {'wall': ..., 'cpu': ...}
+import_timing: Dict[str, float] = {}
+
+
+def record_import(wall: float, cpu: float):
+    """CLI本体の import にかかった時間を記録（launcher から呼ぶ）"""
+    import_timing['wall'] = wall
+    import_timing['cpu'] = cpu
+
+
+class Profiler:
+    """1回のコマンド実行の計測"""
+
+    def __init__(self, pstats_path: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            pstats_path: cProfile の結果を保存するファイル（Noneの場合は cProfile を使わない）
+        """
+        self.pstats_path = pstats_path
+        self.phases: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, Any]] = []
+        self._started = (time.perf_counter(), time.process_time())
+        self._cprofile = None
+
+        # import 時間はプロセスで最初の計測にだけ含める（デーモン・シェルでは計上済み）
+        if import_timing:
+            self.phases.append({'name': 'imports', **import_timing})
+            import_timing.clear()
+
+        if pstats_path:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def phase(self, name: str):
+        """with ブロックの経過時間とCPU時間をフェーズとして記録"""
+        started = self.begin_phase(name)
+        try:
+            yield
+        finally:
+            self.end_phase(started)
+
+    def begin_phase(self, name: str) -> Dict[str, Any]:
+        """フェーズの計測を開始（with で囲めない区間用、end_phase に戻り値を渡す）"""
+        return {'name': name, 'wall': time.perf_counter(), 'cpu': time.process_time()}
+
+    def end_phase(self, started: Dict[str, Any]):
+        """begin_phase で開始したフェーズを記録"""
+        self.phases.append({
+            'name': started['name'],
+            'wall': time.perf_counter() - started['wall'],
+            'cpu': time.process_time() - started['cpu']
+        })
+
+    def record_request(self, info: Dict[str, Any]):
+        """HTTPリクエストの計測結果を記録（ZaimClient の request observer）"""
+        self.requests.append(info)
+
+    def stop(self) -> Dict[str, float]:
+        """
+        計測を終了し、cProfile の結果を保存
+
+        Returns:
+            開始からの合計 {'wall': 秒, 'cpu': 秒}
+        """
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.pstats_path)
+            self._cprofile = None
+
+        return {
+            'wall': time.perf_counter() - self._started[0],
+            'cpu': time.process_time() - self._started[1]
+        }
+
+    def request_summary(self) -> List[Dict[str, Any]]:
+        """
+        HTTPリクエストをエンドポイントごとに集計
+
+        Returns:
+            [{endpoint, requests, bytes, elapsed, slowest}]（合計時間の長い順）
+        """
+        summary: Dict[str, Dict[str, Any]] = {}
+        for request in self.requests:
+            key = f"{request['method']} {request['endpoint']}"
+            entry = summary.setdefault(key, {'endpoint': key, 'requests': 0, 'bytes': 0,
+                                             'elapsed': 0.0, 'slowest': 0.0})
+            entry['requests'] += 1
+            entry['bytes'] += request['bytes']
+            entry['elapsed'] += request['elapsed']
+            entry['slowest'] = max(entry['slowest'], request['elapsed'])
+
+        return sorted(summary.values(), key=lambda entry: entry['elapsed'], reverse=True)
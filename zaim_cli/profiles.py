@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+名前付きプロファイル
+家族の各メンバーなど、トークンと設定を分けた複数の家計簿を切り替える
+
+デフォルトのプロファイルは ~/.zaim-cli/ 直下、名前付きプロファイルは
+~/.zaim-cli/profiles/<名前>/ にトークン・設定・残高アンカー・名前インデックスを保存する
+
+補完やデーモンへの転送からも参照するため、このモジュールは標準ライブラリのみを使う
+"""
+
+import os
+import re
+import sys
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+
+# 使用するプロファイルを指定する環境変数
+PROFILE_ENV = 'ZAIM_CLI_PROFILE'
+
+# ~/.zaim-cli/ 直下を指すプロファイル名
+DEFAULT_PROFILE = 'default'
+
+# 複数プロファイルでの一括実行に対応しないコマンド（対話・常駐が必要なもの）
+UNSUPPORTED_COMMANDS = {('shell',), ('daemon',), ('profile',), ('auth', 'login'), ('balance', 'watch')}
+
+# 取引を作成するコマンド（各プロファイルのプロセスでは確認できないため、事前に確認する）
+WRITE_COMMANDS = {('balance', 'set'), ('balance', 'add'), ('balance', 'subtract'),
+                  ('balance', 'reconcile'), ('money', 'import')}
+
+# 確認を不要にするオプション（--validate は取引を作成しない）
+CONFIRMED_OPTIONS = {'--force', '-f', '--validate'}
+
+# 値を取るグローバルオプション
+VALUE_OPTIONS = {'--profile-output', '--profile-name', '--profiles'}
+
+_PROFILE_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+def base_config_dir() -> Path:
+    """設定ディレクトリのルート（デフォルトプロファイルの保存先）"""
+    return Path.home() / '.zaim-cli'
+
+
+def validate_profile_name(name: str) -> str:
+    """
+    プロファイル名を検証
+
+    Raises:
+        ValueError: ディレクトリ名として使えない名前の場合
+    """
+    if not _PROFILE_NAME.match(name or ''):
+        raise ValueError(f"プロファイル名には英数字と _ . - のみ使用できます: {name!r}")
+    return name
+
+
+def active_profile(environ: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """環境変数で指定されたプロファイル名（デフォルトの場合は None）"""
+    name = (environ if environ is not None else os.environ).get(PROFILE_ENV) or None
+    return None if name == DEFAULT_PROFILE else name
+
+
+def profile_dir(name: Optional[str] = None) -> Path:
+    """
+    プロファイルの保存ディレクトリ
+
+    Args:
+        name: プロファイル名（None または 'default' の場合は ~/.zaim-cli）
+    """
+    if not name or name == DEFAULT_PROFILE:
+        return base_config_dir()
+    return base_config_dir() / 'profiles' / validate_profile_name(name)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """
+    保存されているプロファイルの一覧
+
+    Returns:
+        [{name, path, authenticated}]（デフォルトプロファイルが先頭、以降は名前順）
+    """
+    names = [DEFAULT_PROFILE]
+    profiles_root = base_config_dir() / 'profiles'
+    if profiles_root.is_dir():
+        names.extend(sorted(path.name for path in profiles_root.iterdir()
+                            if path.is_dir() and _PROFILE_NAME.match(path.name)))
+
+    return [{'name': name, 'path': str(profile_dir(name)),
+             'authenticated': (profile_dir(name) / 'tokens.json').exists()}
+            for name in names]
+
+
+def parse_profile_list(value: str) -> List[str]:
+    """
+    カンマ区切りのプロファイル名を検証してリスト化（重複は除く）
+
+    Raises:
+        ValueError: 空、または不正な名前を含む場合
+    """
+    names = []
+    for name in value.split(','):
+        name = name.strip()
+        if name and name not in names:
+            names.append(validate_profile_name(name))
+    if not names:
+        raise ValueError("プロファイル名を1つ以上指定してください")
+    return names
+
+
+def command_args(argv: List[str]) -> List[str]:
+    """
+    コマンドライン引数から先頭のグローバルオプションを除き、サブコマンド以降を取り出す
+
+    Args:
+        argv: プログラム名を除いたコマンドライン引数
+    """
+    index = 0
+    while index < len(argv) and argv[index].startswith('-'):
+        index += 2 if argv[index] in VALUE_OPTIONS else 1
+    return argv[index:]
+
+
+def match_command(args: List[str], commands) -> Optional[tuple]:
+    """
+    サブコマンド以降の引数が commands のいずれかに該当するか判定
+
+    Args:
+        args: command_args() で取り出した引数
+        commands: コマンド名のタプルの集合
+
+    Returns:
+        該当したコマンド（該当しなければ None）
+    """
+    words = [arg for arg in args if not arg.startswith('-')]
+    for command in commands:
+        if tuple(words[:len(command)]) == command:
+            return command
+    return None
+
+
+def needs_confirmation(args: List[str]) -> bool:
+    """取引を作成するコマンドで、--force などの確認不要のオプションがないか判定"""
+    return (match_command(args, WRITE_COMMANDS) is not None
+            and not any(arg in CONFIRMED_OPTIONS for arg in args))
+
+
+def run_in_profile(name: str, argv: List[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    コマンドを指定プロファイルの別プロセスで実行
+
+    プロセスを分けるため、認証情報・クライアント・キャッシュはプロファイル間で共有されない。
+    出力は JSON 形式を強制して受け取る。
+
+    Args:
+        name: プロファイル名
+        argv: グローバルオプションを含むコマンドライン引数（出力形式のオプションは除く）
+        timeout: 1プロファイルあたりの制限時間（秒）
+
+    Returns:
+        {profile, exit_code, data（JSONとして読めた出力、読めなければNone）, stdout, stderr}
+    """
+    env = dict(os.environ)
+    env[PROFILE_ENV] = name
+    # デーモンは1つのプロファイルのクライアントしか持たないため転送しない
+    env['ZAIM_CLI_NO_DAEMON'] = '1'
+    # エラーメッセージを端末幅で折り返させない
+    env['COLUMNS'] = '1000'
+
+    try:
+        completed = subprocess.run([sys.executable, '-m', 'zaim_cli.launcher', '--json', *argv],
+                                   env=env, stdin=subprocess.DEVNULL, capture_output=True,
+                                   text=True, encoding='utf-8', timeout=timeout)
+        exit_code, stdout, stderr = completed.returncode, completed.stdout, completed.stderr
+    except subprocess.TimeoutExpired:
+        exit_code, stdout, stderr = 1, '', f"{timeout}秒以内に終了しませんでした"
+
+    try:
+        data = json.loads(stdout) if stdout.strip() else None
+    except ValueError:
+        data = None
+
+    return {'profile': name, 'exit_code': exit_code, 'data': data, 'stdout': stdout, 'stderr': stderr}
+
+
+def run_profiles(names: List[str], argv: List[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    コマンドを全プロファイルで並行実行
+
+    Returns:
+        run_in_profile() の結果（names と同じ順）
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(names))) as executor:
+        return list(executor.map(lambda name: run_in_profile(name, argv, timeout), names))
+
+
+def merge_profile_rows(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    各プロファイルのJSON出力を profile 列付きの行に結合
+
+    辞書のリストは各行に、単一の辞書はそのまま1行に profile 列を加える。
+    それ以外の出力（単純な値・JSONでない出力）は output 列に入れる。
+
+    Args:
+        results: run_profiles() の結果（失敗したプロファイルは除いておく）
+    """
+    rows = []
+    for result in results:
+        data = result['data']
+        if isinstance(data, dict):
+            data = [data]
+        if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+            rows.extend({'profile': result['profile'], **item} for item in data)
+        elif data is not None:
+            rows.append({'profile': result['profile'], 'output': data})
+        elif result['stdout'].strip():
+            rows.append({'profile': result['profile'], 'output': result['stdout'].strip()})
+    return rows
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Zaim CLI 対話シェル
+1つのプロセス・1つのCLIコンテキストで複数のコマンドを続けて実行する
+"""
+
+import shlex
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import readline
+except ImportError:  # Windows など readline がない環境
+    readline = None
+
+
+# アカウント名を引数に取るコマンド
+ACCOUNT_COMMANDS = {
+    ('balance', 'show'), ('balance', 'set'), ('balance', 'add'), ('balance', 'subtract'),
+    ('balance', 'watch')
+}
+
+EXIT_COMMANDS = {'exit', 'quit', ':q'}
+
+
+class ZaimShell:
+    """click コマンドを対話的に実行するシェル"""
+
+    def __init__(self, invoke: Callable[[List[str]], int],
+                 commands: Dict[str, List[str]],
+                 account_names: Callable[[], List[str]],
+                 history_file: Optional[Path] = None,
+                 prompt: str = 'zaim> '):
+        """
+        初期化
+
+        Args:
+            invoke: コマンドライン引数を受け取って実行し、終了コードを返す関数
+            commands: {コマンド名: [サブコマンド名]}（補完用）
+            account_names: 補完候補のアカウント名を返す関数（キャッシュ済みの一覧を想定）
+            history_file: 履歴ファイル
+            prompt: プロンプト文字列
+        """
+        self.invoke = invoke
+        self.commands = commands
+        self.account_names = account_names
+        self.history_file = history_file
+        self.prompt = prompt
+        self.last_exit_code = 0
+
+    def complete_words(self, words: List[str], text: str) -> List[str]:
+        """
+        入力済みの単語列から補完候補を返す
+
+        Args:
+            words: カーソル位置より前の確定済みの単語
+            text: 補完対象の入力途中の単語
+        """
+        words = [word for word in words if not word.startswith('-')]
+
+        if not words:
+            candidates = list(self.commands) + sorted(EXIT_COMMANDS - {':q'})
+        elif len(words) == 1:
+            candidates = self.commands.get(words[0], [])
+        elif len(words) == 2 and (words[0], words[1]) in ACCOUNT_COMMANDS:
+            return self._complete_account(text)
+        elif len(words) == 3 and words[:2] == ['balance', 'anchor'] and words[2] in ('set', 'remove'):
+            return self._complete_account(text)
+        elif len(words) == 2 and words == ['balance', 'anchor']:
+            candidates = ['set', 'list', 'remove']
+        else:
+            candidates = []
+
+        return sorted(c for c in candidates if c.startswith(text))
+
+    def _complete_account(self, text: str) -> List[str]:
+        """アカウント名の補完候補（空白を含む名前は引用符で囲む）"""
+        prefix = text.lstrip('\'"')
+        return sorted(name if name and not any(c.isspace() or c in '\'"\\' for c in name)
+                      else shlex.quote(name)
+                      for name in self.account_names() if name.startswith(prefix))
+
+    def _readline_completer(self, text: str, state: int) -> Optional[str]:
+        """readline 用の補完関数"""
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_begidx()]
+            try:
+                words = shlex.split(line)
+            except ValueError:
+                words = line.split()
+            self._matches = self.complete_words(words, text)
+
+        if state < len(self._matches):
+            return self._matches[state]
+        return None
+
+    def _setup_readline(self):
+        """履歴と補完を設定"""
+        if readline is None:
+            return
+
+        readline.set_completer(self._readline_completer)
+        readline.set_completer_delims(' \t\n')
+        if 'libedit' in (readline.__doc__ or ''):
+            readline.parse_and_bind('bind ^I rl_complete')
+        else:
+            readline.parse_and_bind('tab: complete')
+
+        if self.history_file and self.history_file.exists():
+            try:
+                readline.read_history_file(str(self.history_file))
+            except OSError:
+                pass
+
+    def _save_history(self):
+        """履歴を保存"""
+        if readline is None or not self.history_file:
+            return
+
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            readline.set_history_length(1000)
+            readline.write_history_file(str(self.history_file))
+        except OSError:
+            pass
+
+    def run_line(self, line: str) -> bool:
+        """
+        1行を実行
+
+        Returns:
+            シェルを続行するかどうか
+        """
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return True
+
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            print(f"❌ 入力エラー: {e}")
+            self.last_exit_code = 2
+            return True
+
+        if args[0] in EXIT_COMMANDS:
+            return False
+        if args[0] == 'help':
+            args = args[1:] + ['--help']
+        if args[0] == 'shell':
+            print("⚠️ シェル内ではシェルを起動できません")
+            return True
+
+        self.last_exit_code = self.invoke(args)
+        return True
+
+    def run(self):
+        """EOF または exit まで対話的に実行"""
+        self._setup_readline()
+        print("Zaim CLI シェル（'help' でコマンド一覧、'exit' または Ctrl-D で終了）")
+
+        try:
+            while True:
+                try:
+                    line = input(self.prompt)
+                except KeyboardInterrupt:
+                    print()
+                    continue
+                except EOFError:
+                    print()
+                    break
+
+                if not self.run_line(line):
+                    break
+        finally:
+            self._save_history()
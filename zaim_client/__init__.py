@@ -6,6 +6,12 @@ Zaim PFMサービス用のPython APIクライアントライブラリ
 from .client import ZaimClient
 from .auth import ZaimAuthManager
 from .balance import BalanceManager
+from .anchors import AnchorStore
+from .planner import FetchPlanner
+from .currency import CurrencyTable
+from .report import LedgerReport
+from .credentials import Credentials, CredentialChain
+from .vault import TokenVault
 
 __version__ = "1.0.0"
 __author__ = "Claude Code"
@@ -13,5 +19,12 @@ __author__ = "Claude Code"
 __all__ = [
     "ZaimClient",
     "ZaimAuthManager", 
-    "BalanceManager"
+    "BalanceManager",
+    "AnchorStore",
+    "FetchPlanner",
+    "CurrencyTable",
+    "LedgerReport",
+    "Credentials",
+    "CredentialChain",
+    "TokenVault"
 ]
\ No newline at end of file
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+期首残高アンカーの保存
+アカウントごとに「ある日付の終了時点の残高」を記録し、残高計算のスキャン範囲を限定する
+"""
+
+import os
+import json
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional, Dict, Any, Union
+
+from .currency import DEFAULT_CURRENCY
+
+
+class AnchorStore:
+    """アカウントごとの期首残高アンカーを保存するストア"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        初期化
+
+        Args:
+            path: 保存先ファイル（Noneの場合は ~/.zaim-cli/anchors.json）
+        """
+        self.path = Path(path) if path else Path.home() / '.zaim-cli' / 'anchors.json'
+        self._anchors: Optional[Dict[int, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[int, Dict[str, Any]]:
+        """ファイルからアンカーを読み込み（キャッシュ付き）"""
+        if self._anchors is None:
+            self._anchors = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    self._anchors = {int(account_id): anchor
+                                     for account_id, anchor in data.get('anchors', {}).items()}
+                except Exception:
+                    self._anchors = {}
+        return self._anchors
+
+    def _save(self):
+        """アンカーをファイルに保存"""
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        data = {'anchors': {str(account_id): anchor
+                            for account_id, anchor in sorted(self._load().items())}}
+
+        # 書き込み途中で中断しても既存のアンカーを壊さないよう、一時ファイルから置き換える
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        # ファイル権限を600に設定（所有者のみ読み書き可能）
+        temp_path.chmod(0o600)
+        os.replace(temp_path, self.path)
+
+    def get(self, account_id: int) -> Optional[Dict[str, Any]]:
+        """
+        アンカーを取得
+
+        Args:
+            account_id: アカウントID
+
+        Returns:
+            {'amount', 'currency', 'date', 'account_name', 'created_at'} またはNone
+            （currency のない古いアンカーは DEFAULT_CURRENCY 建て）
+        """
+        return self._load().get(account_id)
+
+    def all(self) -> Dict[int, Dict[str, Any]]:
+        """全アンカーを取得"""
+        return dict(self._load())
+
+    def set(self, account_id: int, amount: int, anchor_date: date,
+            account_name: Optional[str] = None,
+            currency: str = DEFAULT_CURRENCY) -> Dict[str, Any]:
+        """
+        アンカーを保存（既存のアンカーは上書き）
+
+        Args:
+            account_id: アカウントID
+            amount: anchor_date終了時点の残高
+            anchor_date: アンカー日付
+            account_name: アカウント名（表示用）
+            currency: amount の通貨コード
+
+        Returns:
+            保存したアンカー
+        """
+        anchor = {
+            'amount': amount,
+            'currency': currency,
+            'date': anchor_date.strftime('%Y-%m-%d'),
+            'account_name': account_name,
+            'created_at': int(time.time())
+        }
+        self._load()[account_id] = anchor
+        self._save()
+        return anchor
+
+    def remove(self, account_id: int) -> bool:
+        """
+        アンカーを削除
+
+        Args:
+            account_id: アカウントID
+
+        Returns:
+            削除したかどうか
+        """
+        anchors = self._load()
+        if account_id not in anchors:
+            return False
+
+        del anchors[account_id]
+        self._save()
+        return True
@@ -13,6 +13,8 @@ import urllib.parse
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from urllib.parse import urlparse, parse_qs
 import threading
 import socket
@@ -20,32 +22,15 @@ import socket
 from requests_oauthlib import OAuth1Session
 from requests import Session
 
+from .credentials import TokenFileProvider
 
-class CallbackHandler(BaseHTTPRequestHandler):
-    """OAuth コールバック用HTTPハンドラー"""
-    
-    def do_GET(self):
-        """GET リクエストの処理"""
-        parsed_path = urlparse(self.path)
-        
-        if parsed_path.path == '/callback':
-            # OAuth コールバックの処理
-            query_params = parse_qs(parsed_path.query)
-            
-            oauth_token = query_params.get('oauth_token', [None])[0]
-            oauth_verifier = query_params.get('oauth_verifier', [None])[0]
-            
-            # サーバーインスタンスにパラメータを保存
-            self.server.oauth_token = oauth_token
-            self.server.oauth_verifier = oauth_verifier
-            
-            # レスポンスを送信
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            
-            if oauth_token and oauth_verifier:
-                html = """
+
+# 保存した利用者情報を再確認せずに使う秒数
+DEFAULT_VERIFY_TTL = 3600
+
+
+# コールバックページのHTML
+_SUCCESS_HTML = """
                 <!DOCTYPE html>
                 <html>
                 <head>
@@ -61,8 +46,8 @@ class CallbackHandler(BaseHTTPRequestHandler):
                 </body>
                 </html>
                 """
-            else:
-                html = """
+
+_ERROR_HTML = """
                 <!DOCTYPE html>
                 <html>
                 <head>
@@ -71,10 +56,37 @@ class CallbackHandler(BaseHTTPRequestHandler):
                 </head>
                 <body>
                     <h1>❌ 認証に失敗しました</h1>
-                    <p>必要なパラメータが取得できませんでした。</p>
+                    <p>{message}</p>
                 </body>
                 </html>
                 """
+
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    """OAuth コールバック用HTTPハンドラー"""
+    
+    def do_GET(self):
+        """GET リクエストの処理"""
+        parsed_path = urlparse(self.path)
+        
+        if parsed_path.path == '/callback':
+            # OAuth コールバックの処理（oauth_token で待機中の認証フローに振り分ける）
+            query_params = parse_qs(parsed_path.query)
+            
+            oauth_token = query_params.get('oauth_token', [None])[0]
+            oauth_verifier = query_params.get('oauth_verifier', [None])[0]
+            
+            error = self.server.dispatch(oauth_token, oauth_verifier)
+            
+            # レスポンスを送信
+            self.send_response(200 if error is None else 400)
+            self.send_header('Content-type', 'text/html; charset=utf-8')
+            self.end_headers()
+            
+            if error is None:
+                html = _SUCCESS_HTML
+            else:
+                html = _ERROR_HTML.format(message=error)
             
             self.wfile.write(html.encode('utf-8'))
         else:
@@ -87,20 +99,183 @@ class CallbackHandler(BaseHTTPRequestHandler):
         pass
 
 
-class OAuthHTTPServer(HTTPServer):
-    """OAuth コールバック用HTTPサーバー"""
+class AuthorizationFlow:
+    """
+    1件の認証フロー（リクエストトークン取得から、コールバックでのアクセストークン取得まで）
+    
+    future はコールバックを受けてアクセストークンを取得すると
+    {access_token, access_token_secret, user_info} で完了する。
+    asyncio からは asyncio.wrap_future(flow.future) で待機できる。
+    """
+    
+    def __init__(self, manager: 'ZaimAuthManager', server: 'OAuthHTTPServer',
+                 request_token: str, request_token_secret: str, verify: bool = True):
+        """
+        初期化
+        
+        Args:
+            manager: アクセストークンの取得に使う認証マネージャー
+            server: コールバックを受けるサーバー
+            request_token: リクエストトークン
+            request_token_secret: リクエストトークンシークレット
+            verify: アクセストークン取得後に利用者情報を確認するかどうか
+        """
+        self.manager = manager
+        self.server = server
+        self.request_token = request_token
+        self.request_token_secret = request_token_secret
+        self.verify = verify
+        self.authorization_url = manager.get_authorization_url(request_token)
+        self.future: Future = Future()
+    
+    def complete(self, oauth_verifier: str):
+        """コールバックで受け取った verifier でアクセストークンを取得し、future を完了させる"""
+        if not self.future.set_running_or_notify_cancel():
+            return
+        
+        try:
+            access_token, access_token_secret = self.manager.get_access_token(
+                self.request_token, self.request_token_secret, oauth_verifier
+            )
+            user_info = self.manager.verify_token(access_token, access_token_secret) if self.verify else None
+        except Exception as e:
+            self.future.set_exception(e)
+            return
+        
+        self.future.set_result({
+            'access_token': access_token,
+            'access_token_secret': access_token_secret,
+            'user_info': user_info
+        })
+    
+    def fail(self, error: Exception):
+        """認証が完了しなかったことを future に通知"""
+        if self.future.set_running_or_notify_cancel():
+            self.future.set_exception(error)
+    
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        認証の完了を待機（コールバックを受けた時点で通知され、ポーリングしない）
+        
+        Args:
+            timeout: タイムアウト秒数（Noneの場合は無期限）
+            
+        Returns:
+            {access_token, access_token_secret, user_info}
+            
+        Raises:
+            TimeoutError: タイムアウトした場合（フローは取り消される）
+        """
+        try:
+            return self.future.result(timeout)
+        except FutureTimeoutError:
+            self.cancel()
+            raise TimeoutError("認証がタイムアウトしました")
+    
+    def cancel(self):
+        """フローを取り消し、以降のコールバックを受け付けない"""
+        self.server.unregister(self.request_token)
+        self.future.cancel()
+
+
+class OAuthHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    OAuth コールバック用HTTPサーバー
+    
+    複数の認証フローを1つのポートで同時に待機でき、コールバックは oauth_token で振り分ける。
+    サービスに組み込む場合は start() で起動し、ZaimAuthManager.start_flow() でフローを開始する。
+    """
+    
+    daemon_threads = True
+    # 多数のフローのコールバックが同時に届いても接続を取りこぼさない
+    request_queue_size = 64
     
-    def __init__(self, server_address, RequestHandlerClass):
+    def __init__(self, server_address, RequestHandlerClass=CallbackHandler):
         super().__init__(server_address, RequestHandlerClass)
-        self.oauth_token = None
-        self.oauth_verifier = None
-        self.timeout_occurred = False
+        # {oauth_token: 待機中の認証フロー}
+        self.flows: Dict[str, AuthorizationFlow] = {}
+        self._flows_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def callback_url(self) -> str:
+        """認証後にリダイレクトされるURL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/callback"
+    
+    def start(self) -> 'OAuthHTTPServer':
+        """バックグラウンドスレッドでコールバックの受付を開始"""
+        if self._thread is None:
+            # 停止要求に素早く応じるよう短い間隔で確認
+            self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+            self._thread.start()
+        return self
+    
+    def close(self):
+        """受付を停止し、待機中のフローを取り消す"""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread = None
+        self.server_close()
+        
+        with self._flows_lock:
+            flows, self.flows = list(self.flows.values()), {}
+        for flow in flows:
+            flow.future.cancel()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def register(self, flow: AuthorizationFlow):
+        """コールバックを待つ認証フローを登録"""
+        with self._flows_lock:
+            self.flows[flow.request_token] = flow
+    
+    def unregister(self, oauth_token: str):
+        """認証フローの登録を解除"""
+        with self._flows_lock:
+            self.flows.pop(oauth_token, None)
+    
+    def dispatch(self, oauth_token: Optional[str], oauth_verifier: Optional[str]) -> Optional[str]:
+        """
+        コールバックを該当する認証フローに渡す（CallbackHandler から呼ばれる）
+        
+        Returns:
+            エラーメッセージ（成功した場合はNone）
+        """
+        with self._flows_lock:
+            flow = self.flows.pop(oauth_token, None) if oauth_token else None
+        
+        if flow is None:
+            return "該当する認証リクエストがありません（期限切れ、または処理済みです）。"
+        if not oauth_verifier:
+            flow.fail(Exception("認証が許可されませんでした"))
+            return "必要なパラメータが取得できませんでした。"
+        
+        flow.complete(oauth_verifier)
+        # 取り出した後にタイムアウトなどで取り消された場合、future は結果を持たない
+        if flow.future.cancelled():
+            return "認証は取り消されました（タイムアウト、または取り消し済みです）。"
+        if flow.future.exception() is not None:
+            return "アクセストークンを取得できませんでした。"
+        return None
 
 
 class ZaimAuthManager:
     """Zaim OAuth 認証マネージャー"""
     
-    def __init__(self, consumer_key: str, consumer_secret: str):
+    def __init__(self, consumer_key: str, consumer_secret: str, config_dir: Optional[Path] = None):
+        """
+        初期化
+        
+        Args:
+            consumer_key: コンシューマーキー
+            consumer_secret: コンシューマーシークレット
+            config_dir: トークンの保存ディレクトリ（Noneの場合は ~/.zaim-cli）
+        """
         self.consumer_key = consumer_key
         self.consumer_secret = consumer_secret
         
@@ -111,8 +286,8 @@ class ZaimAuthManager:
         self.verify_url = "https://api.zaim.net/v2/home/user/verify"
         
         # トークン保存ディレクトリ
-        self.config_dir = Path.home() / '.zaim-cli'
-        self.config_dir.mkdir(exist_ok=True, mode=0o700)
+        # ディレクトリはトークンの保存時に作成する
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / '.zaim-cli'
         self.token_file = self.config_dir / 'tokens.json'
     
     def find_free_port(self, start_port: int = 8000) -> int:
@@ -171,15 +346,28 @@ class ZaimAuthManager:
         response.raise_for_status()
         return response.json()
     
-    def save_tokens(self, access_token: str, access_token_secret: str, user_info: Dict[str, Any]):
-        """トークンをファイルに保存"""
+    def save_tokens(self, access_token: str, access_token_secret: str, user_info: Dict[str, Any],
+                    verified_at: Optional[int] = None, timestamp: Optional[int] = None):
+        """
+        トークンをファイルに保存
+        
+        Args:
+            access_token: アクセストークン
+            access_token_secret: アクセストークンシークレット
+            user_info: トークンで確認した利用者情報
+            verified_at: user_info を確認した時刻（Noneの場合は現在時刻）
+            timestamp: トークンの取得時刻（Noneの場合は現在時刻）
+        """
+        now = int(time.time())
         token_data = {
             'access_token': access_token,
             'access_token_secret': access_token_secret,
             'user_info': user_info,
-            'timestamp': int(time.time())
+            'timestamp': timestamp or now,
+            'verified_at': verified_at or now
         }
         
+        self.config_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
         with open(self.token_file, 'w', encoding='utf-8') as f:
             json.dump(token_data, f, ensure_ascii=False, indent=2)
         
@@ -210,6 +398,26 @@ class ZaimAuthManager:
         except Exception:
             return False
     
+    def start_flow(self, server: OAuthHTTPServer, verify: bool = True) -> AuthorizationFlow:
+        """
+        認証フローを開始（ブロックしない）
+        
+        リクエストトークンを取得してフローをサーバーに登録する。利用者を flow.authorization_url に
+        誘導し、flow.future（または flow.wait()）でアクセストークンの取得を待つ。
+        1つのサーバーで複数のフローを同時に待機できる。
+        
+        Args:
+            server: 起動済みのコールバックサーバー
+            verify: アクセストークン取得後に利用者情報を確認するかどうか
+            
+        Returns:
+            開始した認証フロー
+        """
+        request_token, request_token_secret = self.get_request_token(server.callback_url)
+        flow = AuthorizationFlow(self, server, request_token, request_token_secret, verify=verify)
+        server.register(flow)
+        return flow
+    
     def login(self, port: Optional[int] = None, print_url: bool = False, timeout: int = 300) -> bool:
         """
         OAuth ログインを実行
@@ -227,72 +435,44 @@ class ZaimAuthManager:
             if port is None:
                 port = self.find_free_port()
             
-            callback_url = f"http://127.0.0.1:{port}/callback"
-            
-            print(f"OAuth 認証を開始します...")
-            print(f"コールバックURL: {callback_url}")
-            
-            # 1. リクエストトークン取得
-            print("1. リクエストトークンを取得中...")
-            request_token, request_token_secret = self.get_request_token(callback_url)
-            
-            # 2. 認証URL生成
-            auth_url = self.get_authorization_url(request_token)
-            
-            # 3. HTTPサーバー起動
-            print(f"2. ローカルサーバーを開始中... (ポート: {port})")
-            server = OAuthHTTPServer(('127.0.0.1', port), CallbackHandler)
-            server_thread = threading.Thread(target=server.serve_forever, daemon=True)
-            server_thread.start()
-            
-            # 4. ブラウザで認証URL を開く
-            if print_url:
-                print(f"以下のURLにアクセスして認証してください:")
-                print(auth_url)
-            else:
-                print("3. ブラウザで認証ページを開いています...")
-                if self.open_browser(auth_url):
-                    print("ブラウザが開きました。認証を完了してください。")
+            # 1. HTTPサーバー起動
+            with OAuthHTTPServer(('127.0.0.1', port)) as server:
+                print(f"OAuth 認証を開始します...")
+                print(f"コールバックURL: {server.callback_url}")
+                
+                # 2. リクエストトークン取得・認証URL生成
+                print("1. リクエストトークンを取得中...")
+                flow = self.start_flow(server)
+                print(f"2. ローカルサーバーを開始しました (ポート: {port})")
+                
+                # 3. ブラウザで認証URL を開く
+                if print_url:
+                    print(f"以下のURLにアクセスして認証してください:")
+                    print(flow.authorization_url)
                 else:
-                    print(f"ブラウザを自動で開けませんでした。以下のURLにアクセスしてください:")
-                    print(auth_url)
+                    print("3. ブラウザで認証ページを開いています...")
+                    if self.open_browser(flow.authorization_url):
+                        print("ブラウザが開きました。認証を完了してください。")
+                    else:
+                        print(f"ブラウザを自動で開けませんでした。以下のURLにアクセスしてください:")
+                        print(flow.authorization_url)
+                
+                # 4. コールバック待ち（コールバックでアクセストークン取得・トークン検証まで行われる）
+                print(f"4. 認証完了を待機中... (タイムアウト: {timeout}秒)")
+                try:
+                    result = flow.wait(timeout)
+                except TimeoutError:
+                    print("❌ タイムアウトしました。認証をやり直してください。")
+                    return False
             
-            # 5. コールバック待ち
-            print(f"4. 認証完了を待機中... (タイムアウト: {timeout}秒)")
-            start_time = time.time()
+            access_token = result['access_token']
+            access_token_secret = result['access_token_secret']
+            user_info = result['user_info']
             
-            while time.time() - start_time < timeout:
-                if server.oauth_token and server.oauth_verifier:
-                    break
-                time.sleep(0.5)
-            else:
-                print("❌ タイムアウトしました。認証をやり直してください。")
-                server.shutdown()
-                return False
-            
-            # 6. トークン検証
-            if server.oauth_token != request_token:
-                print("❌ OAuth トークンが一致しません。")
-                server.shutdown()
-                return False
-            
-            # 7. アクセストークン取得
-            print("5. アクセストークンを取得中...")
-            access_token, access_token_secret = self.get_access_token(
-                request_token, request_token_secret, server.oauth_verifier
-            )
-            
-            # 8. トークン検証とユーザー情報取得
-            print("6. トークンを検証中...")
-            user_info = self.verify_token(access_token, access_token_secret)
-            
-            # 9. トークン保存
-            print("7. トークンを保存中...")
+            # 5. トークン保存
+            print("5. トークンを保存中...")
             self.save_tokens(access_token, access_token_secret, user_info)
             
-            # サーバー停止
-            server.shutdown()
-            
             print("✅ ログイン完了! トークンを保存しました。")
             print(f"ユーザー: {user_info.get('me', {}).get('name', '不明')} (ID: {user_info.get('me', {}).get('id', '不明')})")
             
@@ -302,19 +482,54 @@ class ZaimAuthManager:
             print(f"❌ ログインエラー: {e}")
             return False
     
-    def whoami(self) -> bool:
-        """保存されたトークンでユーザー情報を表示"""
+    def verify_stored(self, ttl: float = DEFAULT_VERIFY_TTL, refresh: bool = False) -> Tuple[Dict[str, Any], Optional[int]]:
+        """
+        保存されたトークンの利用者情報を取得
+        
+        ttl 秒以内に確認済みの場合はAPIを呼ばずに保存された結果を返す。
+        APIで確認した場合は結果と確認時刻をトークンファイルに保存する。
+        
+        Args:
+            ttl: 保存された確認結果を使う秒数（0の場合は常に確認）
+            refresh: True の場合は ttl に関わらず確認し直す
+            
+        Returns:
+            (利用者情報, 保存された結果を使った場合はその確認時刻・APIで確認した場合はNone)
+            
+        Raises:
+            ValueError: トークンが保存されていない場合
+        """
         tokens = self.load_tokens()
         if not tokens:
+            raise ValueError("保存されたトークンがありません")
+        
+        verified_at = tokens.get('verified_at')
+        if (not refresh and ttl > 0 and verified_at and tokens.get('user_info')
+                and time.time() - verified_at < ttl):
+            return tokens['user_info'], verified_at
+        
+        user_info = self.verify_token(tokens['access_token'], tokens['access_token_secret'])
+        self.save_tokens(tokens['access_token'], tokens['access_token_secret'], user_info,
+                         timestamp=tokens.get('timestamp'))
+        return user_info, None
+    
+    def whoami(self, ttl: float = DEFAULT_VERIFY_TTL, refresh: bool = False) -> bool:
+        """
+        保存されたトークンでユーザー情報を表示
+        
+        Args:
+            ttl: 保存された確認結果を使う秒数（0の場合は常にAPIで確認）
+            refresh: True の場合は ttl に関わらずAPIで確認し直す
+        """
+        if not self.token_file.exists():
             print("❌ 保存されたトークンがありません。'login' コマンドを実行してください。")
             return False
         
         try:
-            access_token = tokens['access_token']
-            access_token_secret = tokens['access_token_secret']
-            
             print("ユーザー情報を取得中...")
-            user_info = self.verify_token(access_token, access_token_secret)
+            user_info, verified_at = self.verify_stored(ttl=ttl, refresh=refresh)
+            if verified_at:
+                print(f"（{int(time.time() - verified_at)}秒前の確認結果です。--refresh で再確認します）")
             
             # JSON出力
             print(json.dumps(user_info, ensure_ascii=False, indent=2))
@@ -337,8 +552,9 @@ class ZaimAuthManager:
     
     def get_stored_credentials(self) -> Optional[Tuple[str, str]]:
         """保存されたアクセストークンを取得"""
-        tokens = self.load_tokens()
-        if not tokens:
+        # 更新されていなければプロセス内のキャッシュを使う
+        tokens = TokenFileProvider(self.token_file).load()
+        if not all(tokens.values()):
             return None
         
         return tokens['access_token'], tokens['access_token_secret']
@@ -5,26 +5,40 @@ Zaim残高管理エンジン
 """
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple, Any
 from .client import ZaimClient
+from .anchors import AnchorStore
+from .planner import FetchPlanner
+from .currency import CurrencyTable, record_currency, DEFAULT_CURRENCY
+from .report import LedgerReport
 
 
 class BalanceManager:
     """残高管理と調整を行うクラス"""
     
-    def __init__(self, client: ZaimClient):
+    def __init__(self, client: ZaimClient, anchor_store: Optional[AnchorStore] = None,
+                 ledger_cache_ttl: float = 0):
         """
         初期化
         
         Args:
             client: ZaimAPIクライアント
+            anchor_store: 期首残高アンカーのストア（Noneの場合はアンカーを使用しない）
+            ledger_cache_ttl: 取得した取引データを再利用する秒数（0の場合はキャッシュしない）
         """
         self.client = client
+        self.anchor_store = anchor_store
+        self.planner = FetchPlanner(client, cache_ttl=ledger_cache_ttl)
+        self.last_fetch_stats: Optional[Dict] = None
         self.adjustment_category_name = "残高調整"
         self._accounts_cache = None
         self._categories_cache = None
         self._genres_cache = None
+        self._currencies_cache = None
+        self.currency_table = CurrencyTable()
     
     def get_accounts(self) -> Dict:
         """アカウント一覧を取得（キャッシュ付き）"""
@@ -44,6 +58,40 @@ class BalanceManager:
             self._genres_cache = self.client.get_genres()
         return self._genres_cache
     
+    def get_currencies(self) -> Dict:
+        """通貨一覧を取得（キャッシュ付き）"""
+        if self._currencies_cache is None:
+            self._currencies_cache = self.client.get_currencies()
+        return self._currencies_cache
+    
+    def loaded_master_data(self) -> Dict[str, List[Dict]]:
+        """
+        取得済みのマスターデータ（APIは呼ばない）
+        
+        Returns:
+            {'accounts' / 'categories' / 'genres': リスト}（未取得の種類は含まない）
+        """
+        loaded = {}
+        if self._accounts_cache is not None:
+            loaded['accounts'] = self._accounts_cache.get('accounts', [])
+        if self._categories_cache is not None:
+            loaded['categories'] = self._categories_cache.get('categories', [])
+        if self._genres_cache is not None:
+            loaded['genres'] = self._genres_cache.get('genres', [])
+        return loaded
+    
+    def set_exchange_rates(self, rates: Dict[str, float], base_currency: Optional[str] = None):
+        """
+        残高集計で使う換算レートを設定
+        
+        Args:
+            rates: {通貨コード: その通貨1単位の基準通貨建て金額}
+            base_currency: 基準通貨コード（Noneの場合は現在の基準通貨）
+        """
+        currencies = self.get_currencies().get('currencies', [])
+        self.currency_table = CurrencyTable(base_currency or self.currency_table.base_currency,
+                                            rates, currencies)
+    
     def find_account_by_name(self, account_name: str) -> Optional[Dict]:
         """
         名前でアカウントを検索
@@ -73,60 +121,163 @@ class BalanceManager:
         Returns:
             (残高変動, 取引件数)
         """
-        # 計算期間を設定
-        end_date = date.today()
-        start_date = end_date - timedelta(days=days_back)
+        return self.calculate_balances([account_id], days_back)[account_id]
+    
+    def calculate_balances(self, account_ids: Iterable[int], 
+                           days_back: int = 365) -> Dict[int, Tuple[int, int]]:
+        """
+        複数アカウントの現在残高を1回の取引スキャンでまとめて計算
         
-        # 取引データを取得
-        all_transactions = []
-        page = 1
+        外貨建ての取引は換算レートで基準通貨に換算し、レートのない通貨は残高に含めない
         
-        while True:
-            result = self.client.get_money(
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d'),
-                page=page,
-                limit=100
-            )
+        Args:
+            account_ids: アカウントIDのリスト
+            days_back: アンカーのないアカウントについて過去何日分を計算するか
             
-            if not result['money']:
-                break
-                
-            all_transactions.extend(result['money'])
-            page += 1
+        Returns:
+            {アカウントID: (基準通貨建ての残高, 取引件数)}
+        """
+        currency_balances = self.calculate_currency_balances(account_ids, days_back)
+        return {account_id: (self.currency_table.convert_totals(totals)[0], count)
+                for account_id, (totals, count) in currency_balances.items()}
+    
+    def calculate_currency_balances(self, account_ids: Iterable[int],
+                                    days_back: int = 365,
+                                    end_date: Optional[date] = None) -> Dict[int, Tuple[Dict[str, int], int]]:
+        """
+        複数アカウントの現在残高を通貨ごとに1回の取引スキャンでまとめて計算
+        
+        Args:
+            account_ids: アカウントIDのリスト
+            days_back: アンカーのないアカウントについて過去何日分を計算するか
+            end_date: この日までの取引で計算（Noneの場合は今日）
             
-            if len(result['money']) < 100:
-                break
+        Returns:
+            {アカウントID: ({通貨コード: 残高}, 取引件数)}
+        """
+        snapshot = None
+        for snapshot in self.iter_currency_balances(account_ids, days_back, end_date):
+            pass
+        return snapshot['balances']
+    
+    def _initial_balances(self, account_ids: Iterable[int],
+                          days_back: int) -> Tuple[Dict[int, Dict[str, int]], Dict[int, str]]:
+        """
+        アカウントごとの計算開始時点の残高と集計開始日
+        
+        Returns:
+            ({アカウントID: {通貨コード: 残高}}, {アカウントID: 集計開始日（YYYY-MM-DD）})
+        """
+        default_start = (date.today() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        
+        balances = {}
+        account_starts = {}
+        for account_id in account_ids:
+            anchor = self.anchor_store.get(account_id) if self.anchor_store else None
+            if anchor:
+                # アンカーは保存時の通貨建て（実行中の基準通貨とは限らない）
+                balances[account_id] = {anchor.get('currency', DEFAULT_CURRENCY): anchor['amount']}
+                account_starts[account_id] = (
+                    datetime.strptime(anchor['date'], '%Y-%m-%d').date() + timedelta(days=1)
+                ).strftime('%Y-%m-%d')
+            else:
+                balances[account_id] = {}
+                account_starts[account_id] = default_start
+        return balances, account_starts
+    
+    def iter_currency_balances(self, account_ids: Iterable[int],
+                               days_back: int = 365,
+                               end_date: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        """
+        取引データを1ページ取得するごとに途中経過の残高を返す
+        
+        アンカーが保存されているアカウントは、アンカー日の翌日以降の取引だけを
+        アンカー金額（保存時の通貨建て）に積み上げる（days_backは無視される）
+        
+        Args:
+            account_ids: アカウントIDのリスト
+            days_back: アンカーのないアカウントについて過去何日分を計算するか
+            end_date: この日までの取引で計算（Noneの場合は今日）
+            
+        Yields:
+            {'page': 取得済みページ数, 'records': 取得済み件数, 'done': 完了したかどうか,
+             'balances': {アカウントID: ({通貨コード: 残高}, 取引件数)}}
+            最後の要素は必ず done=True
+        """
+        # 計算期間を設定
+        end_date = end_date or date.today()
+        default_start = date.today() - timedelta(days=days_back)
         
-        # アカウントに関連する取引をフィルタリング
-        balance_change = 0
-        transaction_count = 0
-        
-        for transaction in all_transactions:
-            involved = False
-            
-            if transaction['mode'] == 'income':
-                if transaction.get('to_account_id') == account_id:
-                    balance_change += transaction['amount']
-                    involved = True
-                    
-            elif transaction['mode'] == 'payment':
-                if transaction.get('from_account_id') == account_id:
-                    balance_change -= transaction['amount']
-                    involved = True
-                    
-            elif transaction['mode'] == 'transfer':
-                if transaction.get('from_account_id') == account_id:
-                    balance_change -= transaction['amount']
-                    involved = True
-                elif transaction.get('to_account_id') == account_id:
-                    balance_change += transaction['amount']
-                    involved = True
-            
-            if involved:
-                transaction_count += 1
-        
-        return balance_change, transaction_count
+        balances, account_starts = self._initial_balances(account_ids, days_back)
+        counts = {account_id: 0 for account_id in balances}
+        
+        def snapshot(page: int, records: int, done: bool) -> Dict[str, Any]:
+            return {
+                'page': page,
+                'records': records,
+                'done': done,
+                'balances': {account_id: (dict(balances[account_id]), counts[account_id])
+                             for account_id in balances}
+            }
+        
+        # 全アカウントのうち最も古い開始日からスキャン
+        start_date = min(account_starts.values(), default=default_start.strftime('%Y-%m-%d'))
+        if start_date > end_date.strftime('%Y-%m-%d'):
+            yield snapshot(0, 0, True)
+            return
+        
+        # 取引データをページ単位で取得しながら、アカウント×通貨ごとに集計
+        # 比較対象はアカウントごとに全件スキャンする素朴な実装
+        plan = self.planner.plan(start_date=start_date,
+                                 end_date=end_date.strftime('%Y-%m-%d'),
+                                 naive_scans=len(balances))
+        page_count = 0
+        record_count = 0
+        for page in self.planner.execute(plan):
+            for transaction in page:
+                transaction_date = transaction.get('date', '')[:10]
+                currency = record_currency(transaction)
+                for account_id, delta in self._transaction_effects(transaction):
+                    if account_id in balances and transaction_date >= account_starts[account_id]:
+                        totals = balances[account_id]
+                        totals[currency] = totals.get(currency, 0) + delta
+                        counts[account_id] += 1
+            
+            page_count += 1
+            record_count += len(page)
+            yield snapshot(page_count, record_count, False)
+        
+        self.last_fetch_stats = plan.stats
+        yield snapshot(page_count, record_count, True)
+    
+    @staticmethod
+    def _transaction_effects(transaction: Dict) -> List[Tuple[int, int]]:
+        """
+        取引がどのアカウントの残高をいくら変動させるかを返す
+        
+        Args:
+            transaction: 取引データ
+            
+        Returns:
+            [(アカウントID, 変動額)]
+        """
+        mode = transaction['mode']
+        amount = transaction['amount']
+        from_account_id = transaction.get('from_account_id')
+        to_account_id = transaction.get('to_account_id')
+        
+        if mode == 'income':
+            return [(to_account_id, amount)] if to_account_id else []
+        elif mode == 'payment':
+            return [(from_account_id, -amount)] if from_account_id else []
+        elif mode == 'transfer':
+            effects = []
+            if from_account_id:
+                effects.append((from_account_id, -amount))
+            if to_account_id and to_account_id != from_account_id:
+                effects.append((to_account_id, amount))
+            return effects
+        return []
     
     def find_adjustment_category_and_genre(self) -> Tuple[Optional[int], Optional[int]]:
         """
@@ -180,6 +331,9 @@ class BalanceManager:
         """
         today = date.today().strftime('%Y-%m-%d')
         
+        # 取引を作成すると取得済みの取引データは古くなる
+        self.planner.clear_cache()
+        
         if amount > 0:
             # 収入として追加
             category_id, genre_id = self.find_adjustment_category_and_genre()
@@ -219,28 +373,21 @@ class BalanceManager:
                 comment=comment
             )
     
-    def set_balance(self, account_name: str, target_amount: int, 
-                   comment: Optional[str] = None, dry_run: bool = False) -> Dict:
+    def _build_adjustment(self, account: Dict, current_balance: int, transaction_count: int,
+                          target_amount: int, comment: Optional[str] = None) -> Dict:
         """
-        アカウント残高を指定額に設定
+        現在残高と目標金額から調整内容（プラン）を組み立てる
         
         Args:
-            account_name: アカウント名
+            account: アカウント情報
+            current_balance: 現在残高
+            transaction_count: 取引件数
             target_amount: 目標金額
             comment: コメント
-            dry_run: 実行せずにプレビューのみ
             
         Returns:
-            実行結果情報
+            調整プラン（set_balanceの実行結果と同じ形式）
         """
-        # アカウントを検索
-        account = self.find_account_by_name(account_name)
-        if not account:
-            raise Exception(f"アカウント '{account_name}' が見つかりません")
-        
-        # 現在残高を計算
-        current_balance, transaction_count = self.calculate_current_balance(account['id'])
-        
         # 調整が必要な金額を計算
         adjustment = target_amount - current_balance
         
@@ -267,19 +414,35 @@ class BalanceManager:
                 comment = f"CLI: 残高調整 ({adjustment:,}円)"
         
         result['comment'] = comment
+        result['action'] = 'dry_run'
+        if adjustment > 0:
+            result['planned_action'] = f"{adjustment:,}円の収入取引を作成予定"
+        else:
+            result['planned_action'] = f"{abs(adjustment):,}円の支出取引を作成予定"
         
-        if dry_run:
-            result['action'] = 'dry_run'
-            if adjustment > 0:
-                result['planned_action'] = f"{adjustment:,}円の収入取引を作成予定"
-            else:
-                result['planned_action'] = f"{abs(adjustment):,}円の支出取引を作成予定"
+        return result
+    
+    def _execute_adjustment(self, result: Dict) -> Dict:
+        """
+        調整プランに従って調整取引を作成
+        
+        Args:
+            result: _build_adjustmentで作成した調整プラン
+            
+        Returns:
+            実行結果情報
+        """
+        if result['action'] != 'dry_run':
             return result
         
+        result = dict(result)
+        adjustment = result['adjustment_needed']
+        result.pop('planned_action', None)
+        
         # 実際の調整取引を実行
         try:
             transaction_result = self.create_adjustment_transaction(
-                account['id'], adjustment, comment
+                result['account_id'], adjustment, result['comment']
             )
             
             result['action'] = 'completed'
@@ -292,6 +455,113 @@ class BalanceManager:
         
         return result
     
+    def set_balance(self, account_name: str, target_amount: int, 
+                   comment: Optional[str] = None, dry_run: bool = False) -> Dict:
+        """
+        アカウント残高を指定額に設定
+        
+        Args:
+            account_name: アカウント名
+            target_amount: 目標金額
+            comment: コメント
+            dry_run: 実行せずにプレビューのみ
+            
+        Returns:
+            実行結果情報
+        """
+        # アカウントを検索
+        account = self.find_account_by_name(account_name)
+        if not account:
+            raise Exception(f"アカウント '{account_name}' が見つかりません")
+        
+        # 現在残高を計算
+        current_balance, transaction_count = self.calculate_current_balance(account['id'])
+        
+        result = self._build_adjustment(account, current_balance, transaction_count,
+                                        target_amount, comment)
+        
+        if dry_run:
+            return result
+        
+        return self._execute_adjustment(result)
+    
+    def plan_balances(self, targets: Dict[str, int], comment: Optional[str] = None) -> List[Dict]:
+        """
+        複数アカウントの調整プランを1回の取引スキャンで作成
+        
+        Args:
+            targets: {アカウント名: 目標金額}
+            comment: 全調整取引に付けるコメント（Noneの場合は自動生成）
+            
+        Returns:
+            調整プランのリスト（targetsの順序を維持）
+            
+        Raises:
+            Exception: アカウントが見つからない場合、複数の名前が同じアカウントを指す場合
+        """
+        # 先に全アカウントを解決し、見つからない・重複するものがあれば何も実行しない
+        # （同じアカウントへの調整が2件あると、どちらも同じ現在残高から計算されて残高が合わなくなる）
+        resolved = []
+        names_by_id = {}
+        for account_name, target_amount in targets.items():
+            account = self.find_account_by_name(account_name)
+            if not account:
+                raise Exception(f"アカウント '{account_name}' が見つかりません")
+            if account['id'] in names_by_id:
+                raise Exception(f"'{names_by_id[account['id']]}' と '{account_name}' は同じアカウント "
+                                f"'{account['name']}' を指しています")
+            names_by_id[account['id']] = account_name
+            resolved.append((account, target_amount))
+        
+        balances = self.calculate_balances(account['id'] for account, _ in resolved)
+        
+        plans = []
+        for account, target_amount in resolved:
+            current_balance, transaction_count = balances[account['id']]
+            plans.append(self._build_adjustment(account, current_balance, transaction_count,
+                                                target_amount, comment))
+        return plans
+    
+    def execute_adjustments(self, plans: List[Dict], max_workers: int = 4) -> List[Dict]:
+        """
+        調整プランを並行して実行
+        
+        Args:
+            plans: plan_balancesで作成した調整プラン
+            max_workers: 同時に作成する調整取引の最大数
+            
+        Returns:
+            実行結果のリスト（plansの順序を維持）
+        """
+        if any(plan['action'] == 'dry_run' for plan in plans):
+            # マスターデータをスレッド起動前に取得しておき、各スレッドからはキャッシュを参照する
+            self.get_categories()
+            self.get_genres()
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return list(executor.map(self._execute_adjustment, plans))
+    
+    def set_balances(self, targets: Dict[str, int], comment: Optional[str] = None,
+                     dry_run: bool = False, max_workers: int = 4) -> List[Dict]:
+        """
+        複数アカウントの残高をまとめて指定額に設定
+        
+        Args:
+            targets: {アカウント名: 目標金額}
+            comment: コメント
+            dry_run: 実行せずにプレビューのみ
+            max_workers: 同時に作成する調整取引の最大数
+            
+        Returns:
+            アカウントごとの実行結果のリスト
+        """
+        plans = self.plan_balances(targets, comment)
+        
+        if dry_run:
+            return plans
+        
+        return self.execute_adjustments(plans, max_workers)
+    
     def add_balance(self, account_name: str, amount: int, 
                    comment: Optional[str] = None, dry_run: bool = False) -> Dict:
         """
@@ -342,6 +612,92 @@ class BalanceManager:
         
         return self.set_balance(account_name, target_balance, comment, dry_run)
     
+    def set_anchor(self, account_name: str, amount: int,
+                   anchor_date: Optional[date] = None) -> Dict:
+        """
+        期首残高アンカーを保存
+        
+        Args:
+            account_name: アカウント名
+            amount: anchor_date終了時点の残高（現在の基準通貨建て）
+            anchor_date: アンカー日付（Noneの場合は昨日）
+            
+        Returns:
+            保存したアンカー情報
+        """
+        if self.anchor_store is None:
+            raise Exception("アンカーストアが設定されていません")
+        
+        account = self.find_account_by_name(account_name)
+        if not account:
+            raise Exception(f"アカウント '{account_name}' が見つかりません")
+        
+        anchor_date = anchor_date or (date.today() - timedelta(days=1))
+        anchor = self.anchor_store.set(account['id'], amount, anchor_date, account['name'],
+                                       self.currency_table.base_currency)
+        return dict(anchor, account_id=account['id'])
+    
+    def anchor_current_balances(self, balances: Dict[int, int],
+                                account_names: Optional[Dict[int, str]] = None) -> List[Dict]:
+        """
+        現在残高が確定しているアカウントについて、昨日終了時点のアンカーを自動作成
+        
+        当日の取引（調整取引を含む）を差し引いた金額を昨日付けで保存するため、
+        アンカー作成後に当日の取引が追加されても残高計算に反映される
+        
+        Args:
+            balances: {アカウントID: 現在残高（現在の基準通貨建て）}
+            account_names: {アカウントID: アカウント名}（表示用）
+            
+        Returns:
+            保存したアンカー情報のリスト
+        """
+        if self.anchor_store is None:
+            raise Exception("アンカーストアが設定されていません")
+        if not balances:
+            return []
+        
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        today_deltas = {account_id: 0 for account_id in balances}
+        
+        # 当日分の取引だけを取得して差し引く
+        for page in self.client.iter_money_pages(
+            start_date=today.strftime('%Y-%m-%d'),
+            end_date=today.strftime('%Y-%m-%d'),
+            limit=100
+        ):
+            for transaction in page:
+                for account_id, delta in self._transaction_effects(transaction):
+                    if account_id in today_deltas:
+                        today_deltas[account_id] += delta
+        
+        anchors = []
+        for account_id, balance in balances.items():
+            name = (account_names or {}).get(account_id)
+            anchor = self.anchor_store.set(account_id, balance - today_deltas[account_id],
+                                           yesterday, name, self.currency_table.base_currency)
+            anchors.append(dict(anchor, account_id=account_id))
+        return anchors
+    
+    def _balance_entry(self, account: Dict, totals: Dict[str, int], transaction_count: int) -> Dict:
+        """show_balance用のアカウント残高情報を作成"""
+        balance, unconverted = self.currency_table.convert_totals(totals)
+        entry = {
+            'name': account['name'],
+            'id': account['id'],
+            'balance': balance,
+            'transaction_count': transaction_count
+        }
+        
+        # 外貨建ての取引がある場合のみ通貨別の内訳を付ける
+        if set(totals) - {self.currency_table.base_currency}:
+            entry['currency_balances'] = dict(totals)
+            if unconverted:
+                entry['unconverted'] = unconverted
+        
+        return entry
+    
     def show_balance(self, account_name: Optional[str] = None) -> Dict:
         """
         残高情報を表示
@@ -352,35 +708,177 @@ class BalanceManager:
         Returns:
             残高情報
         """
+        result = None
+        for result in self.stream_balance(account_name):
+            pass
+        
+        del result['page'], result['records'], result['done']
+        return result
+    
+    def stream_balance(self, account_name: Optional[str] = None) -> Iterator[Dict]:
+        """
+        残高情報を取引データの取得に合わせて段階的に返す
+        
+        Args:
+            account_name: アカウント名（Noneの場合は全アカウント）
+            
+        Yields:
+            show_balanceと同じ形式の残高情報に 'page', 'records', 'done' を加えたもの
+            （最後の要素は done=True で、show_balanceの結果と一致する）
+        """
         if account_name:
             # 特定アカウントの残高
             account = self.find_account_by_name(account_name)
             if not account:
                 raise Exception(f"アカウント '{account_name}' が見つかりません")
             
-            balance, transaction_count = self.calculate_current_balance(account['id'])
-            
-            return {
-                'accounts': [{
-                    'name': account['name'],
-                    'id': account['id'],
-                    'balance': balance,
-                    'transaction_count': transaction_count
-                }]
-            }
+            accounts = [account]
         else:
             # 全アカウントの残高
-            accounts = self.get_accounts()
-            result = {'accounts': []}
-            
-            for account in accounts['accounts']:
-                if account['active'] == 1:
-                    balance, transaction_count = self.calculate_current_balance(account['id'])
-                    result['accounts'].append({
-                        'name': account['name'],
-                        'id': account['id'],
-                        'balance': balance,
-                        'transaction_count': transaction_count
-                    })
-            
-            return result
\ No newline at end of file
+            accounts = [a for a in self.get_accounts()['accounts'] if a['active'] == 1]
+        
+        for snapshot in self.iter_currency_balances(account['id'] for account in accounts):
+            balances = snapshot['balances']
+            yield {
+                'page': snapshot['page'],
+                'records': snapshot['records'],
+                'done': snapshot['done'],
+                'base_currency': self.currency_table.base_currency,
+                'accounts': [self._balance_entry(account, *balances[account['id']])
+                             for account in accounts]
+            }
+    
+    def watch_balance(self, account_name: Optional[str] = None, interval: float = 60,
+                      overlap_days: int = 3, polls: Optional[int] = None,
+                      days_back: int = 365) -> Iterator[Dict]:
+        """
+        残高を一度計算した後、直近の取引だけを定期的に取り直して残高を更新し続ける
+        
+        直近 overlap_days 日より前の取引で確定した残高を保持し、直近の期間は毎回
+        取引ごとの寄与を取り直して差し替える（追加・編集・削除のいずれも反映される）。
+        日付が変わって期間外になった取引は、最後に取得した内容で確定残高に繰り入れる。
+        
+        Args:
+            account_name: アカウント名（Noneの場合は全アクティブアカウント）
+            interval: 取り直しの間隔（秒）
+            overlap_days: 毎回取り直す直近の日数（今日を含まない日数）
+            polls: 取り直しの回数（Noneの場合は無制限）
+            days_back: アンカーのないアカウントについて過去何日分を計算するか
+            
+        Yields:
+            stream_balanceと同じ形式の残高情報に以下を加えたもの
+            'poll': 取り直しの回数（初回計算は0）, 'fetched': 今回取得した件数,
+            'changes': {アカウントID: 前回からの変動額（基準通貨建て）}
+        """
+        if account_name:
+            account = self.find_account_by_name(account_name)
+            if not account:
+                raise Exception(f"アカウント '{account_name}' が見つかりません")
+            accounts = [account]
+        else:
+            accounts = [a for a in self.get_accounts()['accounts'] if a['active'] == 1]
+        account_ids = [account['id'] for account in accounts]
+        base_currency = self.currency_table.base_currency
+        _, account_starts = self._initial_balances(account_ids, days_back)
+        
+        # 直近期間より前の確定残高（初回のみ全期間をスキャン）
+        window_start = date.today() - timedelta(days=overlap_days)
+        settled = self.calculate_currency_balances(account_ids, days_back,
+                                                   end_date=window_start - timedelta(days=1))
+        settled = {account_id: [dict(totals), count] for account_id, (totals, count) in settled.items()}
+        # 直近期間の取引ごとの寄与 {(モード, 取引ID): (日付, [(アカウントID, 通貨コード, 変動額)])}
+        contributions: Dict[tuple, Tuple[str, List[Tuple[int, str, int]]]] = {}
+        previous: Optional[Dict[int, int]] = None
+        poll = 0
+        
+        while True:
+            today = date.today()
+            window_start = today - timedelta(days=overlap_days)
+            window_start_text = window_start.strftime('%Y-%m-%d')
+            
+            # 期間外になった取引を確定残高に繰り入れ
+            for key, (record_date, effects) in list(contributions.items()):
+                if record_date < window_start_text:
+                    for account_id, currency, delta in effects:
+                        totals, _ = settled[account_id]
+                        totals[currency] = totals.get(currency, 0) + delta
+                        settled[account_id][1] += 1
+                    del contributions[key]
+            
+            # 直近期間を取り直す（キャッシュを使わず常にAPIから取得）
+            fetched = 0
+            latest = {}
+            for page in self.client.iter_money_pages(start_date=window_start_text,
+                                                     end_date=today.strftime('%Y-%m-%d')):
+                fetched += len(page)
+                for transaction in page:
+                    record_date = transaction.get('date', '')[:10]
+                    currency = record_currency(transaction)
+                    effects = [(account_id, currency, delta)
+                               for account_id, delta in self._transaction_effects(transaction)
+                               if account_id in settled and record_date >= account_starts[account_id]]
+                    if effects:
+                        latest[(transaction.get('mode'), transaction.get('id'))] = (record_date, effects)
+            contributions = latest
+            
+            balances = {account_id: (dict(totals), count) for account_id, (totals, count) in settled.items()}
+            for _, effects in contributions.values():
+                for account_id, currency, delta in effects:
+                    totals, count = balances[account_id]
+                    totals[currency] = totals.get(currency, 0) + delta
+                    balances[account_id] = (totals, count + 1)
+            
+            entries = [self._balance_entry(account, *balances[account['id']]) for account in accounts]
+            current = {entry['id']: entry['balance'] for entry in entries}
+            changes = {account_id: current[account_id] - previous[account_id]
+                       for account_id in current
+                       if previous is not None and current[account_id] != previous[account_id]}
+            previous = current
+            
+            yield {
+                'poll': poll,
+                'fetched': fetched,
+                'changes': changes,
+                'base_currency': base_currency,
+                'accounts': entries
+            }
+            
+            poll += 1
+            if polls is not None and poll > polls:
+                return
+            time.sleep(interval)
+    
+    def build_report(self, group_by: List[str], start_date: Optional[str] = None,
+                     end_date: Optional[str] = None, modes: Optional[Iterable[str]] = None,
+                     category_ids: Optional[Iterable[int]] = None,
+                     genre_ids: Optional[Iterable[int]] = None) -> LedgerReport:
+        """
+        期間内の取引データをグループ別に集計
+        
+        Args:
+            group_by: 集計キー（month, week, category, genre, account, mode の組み合わせ）
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+            modes: 対象モード
+            category_ids: 対象カテゴリID
+            genre_ids: 対象ジャンルID
+            
+        Returns:
+            集計済みのレポート（rows()で結果を取得）
+        """
+        # 名前の解決が必要なマスターだけを取得
+        report = LedgerReport(
+            group_by,
+            accounts=self.get_accounts()['accounts'] if 'account' in group_by else None,
+            categories=self.get_categories()['categories'] if 'category' in group_by else None,
+            genres=self.get_genres()['genres'] if 'genre' in group_by else None,
+            currency_table=self.currency_table
+        )
+        
+        plan = self.planner.plan(start_date=start_date, end_date=end_date,
+                                 modes=modes, category_ids=category_ids, genre_ids=genre_ids)
+        for page in self.planner.execute(plan):
+            report.add(page)
+        
+        self.last_fetch_stats = plan.stats
+        return report
@@ -1,10 +1,13 @@
 import os
+import time
+import threading
 import requests
-from requests_oauthlib import OAuth1
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator, Callable
 from dotenv import load_dotenv
 
+from .credentials import Credentials, default_chain
+
 load_dotenv()
 
 
@@ -17,7 +20,11 @@ class ZaimClient:
                  consumer_key: Optional[str] = None,
                  consumer_secret: Optional[str] = None,
                  access_token: Optional[str] = None,
-                 access_token_secret: Optional[str] = None):
+                 access_token_secret: Optional[str] = None,
+                 credentials: Optional[Credentials] = None,
+                 session: Optional[requests.Session] = None,
+                 fast_signer: bool = False,
+                 base_url: Optional[str] = None):
         """
         Initialize Zaim API client
         
@@ -26,26 +33,84 @@ class ZaimClient:
             consumer_secret: OAuth consumer secret (or set ZAIM_CONSUMER_SECRET env var)
             access_token: OAuth access token (or set ZAIM_ACCESS_TOKEN env var)
             access_token_secret: OAuth access token secret (or set ZAIM_ACCESS_TOKEN_SECRET env var)
+            credentials: Pre-resolved credentials (e.g. from a CredentialChain).
+                When given, the other arguments and the environment are not consulted
+                and the OAuth1 signer is shared with other clients using the same credentials.
+            session: HTTP session to use (e.g. one connection pool shared by many users'
+                clients). Authentication is applied per request, so a session carries no
+                user state. requests.Session is not thread-safe, so when omitted each
+                thread using the client gets its own session; a given session must not
+                be shared across threads.
+            fast_signer: Sign requests with HmacSha1Signer (precomputed HMAC key,
+                same signatures as requests_oauthlib's OAuth1) instead of OAuth1.
+            base_url: API base URL (or set ZAIM_API_BASE_URL env var), e.g. a local
+                stand-in server such as tests/fake_server.py. Defaults to BASE_URL.
         """
-        self.consumer_key = consumer_key or os.getenv('ZAIM_CONSUMER_KEY')
-        self.consumer_secret = consumer_secret or os.getenv('ZAIM_CONSUMER_SECRET')
-        self.access_token = access_token or os.getenv('ZAIM_ACCESS_TOKEN')
-        self.access_token_secret = access_token_secret or os.getenv('ZAIM_ACCESS_TOKEN_SECRET')
+        if credentials is None:
+            credentials = default_chain(consumer_key, consumer_secret,
+                                        access_token, access_token_secret).resolve()
         
-        if not all([self.consumer_key, self.consumer_secret, self.access_token, self.access_token_secret]):
-            raise ValueError("OAuth credentials are required")
-            
-        self.auth = OAuth1(
-            self.consumer_key,
-            client_secret=self.consumer_secret,
-            resource_owner_key=self.access_token,
-            resource_owner_secret=self.access_token_secret,
-            signature_method='HMAC-SHA1'
-        )
+        self.credentials = credentials
+        self.consumer_key = credentials.consumer_key
+        self.consumer_secret = credentials.consumer_secret
+        self.access_token = credentials.access_token
+        self.access_token_secret = credentials.access_token_secret
+        self.auth = credentials.signer if fast_signer else credentials.auth
+        self.base_url = (base_url or os.getenv('ZAIM_API_BASE_URL') or self.BASE_URL).rstrip('/')
+        
+        # 接続を再利用するためのセッション（Keep-Alive / コネクションプール）
+        # 指定がない場合は、ワーカースレッドで共有しないようスレッドごとに作成する
+        self._session = session
+        self._local = threading.local()
+        
+        # 各HTTPリクエストの計測結果を受け取るコールバック
+        self.request_observers: List[Callable[[Dict[str, Any]], None]] = []
+    
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session for the calling thread (the given session, or one per thread)"""
+        if self._session is not None:
+            return self._session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+    
+    def add_request_observer(self, observer: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback invoked after every HTTP request
+        
+        The callback receives a dict with method, endpoint, page, status,
+        bytes and elapsed (seconds). It is also called for failed requests
+        (status is None when no response was received).
+        """
+        self.request_observers.append(observer)
+    
+    def remove_request_observer(self, observer: Callable[[Dict[str, Any]], None]):
+        """Unregister a callback added with add_request_observer"""
+        if observer in self.request_observers:
+            self.request_observers.remove(observer)
+    
+    def _notify_request(self, method: str, endpoint: str, params: Optional[Dict],
+                        response: Optional[requests.Response], started: float):
+        """Report request timing to the registered observers"""
+        if not self.request_observers:
+            return
+        
+        info = {
+            'method': method,
+            'endpoint': endpoint,
+            'page': (params or {}).get('page'),
+            'status': response.status_code if response is not None else None,
+            'bytes': len(response.content) if response is not None else 0,
+            'elapsed': time.perf_counter() - started
+        }
+        for observer in list(self.request_observers):
+            observer(info)
     
     def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict[str, Any]:
         """Make authenticated API request"""
-        url = f"{self.BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         
         try:
             # リクエストパラメータを準備
@@ -64,15 +129,40 @@ class ZaimClient:
                     request_params['data'] = data
                     request_params['headers'] = {'Content-Type': 'application/x-www-form-urlencoded'}
             
-            response = requests.request(**request_params)
+            started = time.perf_counter()
+            response = None
+            try:
+                response = self.session.request(**request_params)
+            finally:
+                self._notify_request(method, endpoint, params, response, started)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             raise Exception(f"API request failed: {e}")
     
-    def verify_user(self) -> Dict[str, Any]:
-        """Verify user authentication"""
-        return self._make_request('GET', '/home/user/verify')
+    def verify_user(self, max_age: float = 0) -> Dict[str, Any]:
+        """
+        Verify user authentication
+        
+        Args:
+            max_age: Reuse a result verified within this many seconds instead of
+                calling the API (0 always calls the API). Results are shared by
+                clients built from the same credentials, and a result saved with
+                the token by ZaimAuthManager counts as well.
+        """
+        cached = self.credentials.verification
+        if max_age > 0 and cached and time.time() - cached[0] < max_age:
+            return cached[1]
+        
+        result = self._make_request('GET', '/home/user/verify')
+        self.credentials.verification = (time.time(), result)
+        return result
+    
+    @property
+    def verified_at(self) -> Optional[float]:
+        """UNIX time of the last known successful verification (None if never verified)"""
+        cached = self.credentials.verification
+        return cached[0] if cached else None
     
     def get_money(self, 
                   category_id: Optional[int] = None,
@@ -104,6 +194,24 @@ class ZaimClient:
             
         return self._make_request('GET', '/home/money', params=params)
     
+    def iter_money_pages(self, limit: int = 100, **filters) -> Iterator[List[Dict[str, Any]]]:
+        """Iterate money records page by page until the result set is exhausted"""
+        limit = min(limit, 100)
+        page = 1
+        
+        while True:
+            result = self.get_money(page=page, limit=limit, **filters)
+            records = result.get('money', [])
+            
+            if not records:
+                break
+            
+            yield records
+            
+            if len(records) < limit:
+                break
+            page += 1
+    
     def create_payment(self, 
                       category_id: int,
                       genre_id: int,
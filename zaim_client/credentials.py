@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+認証情報の解決
+明示的な引数 → 環境変数 → トークンファイル → 設定 の順に認証情報を探し、
+os.environ を書き換えずに ZaimClient へ直接渡す
+
+トークンファイルはプロセス内でキャッシュし、更新時刻とサイズが変わったときだけ読み直すため、
+ワーカースレッドごとなどクライアントを何度作ってもファイルの読み込みは増えない
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Tuple
+
+from requests_oauthlib import OAuth1
+
+from .signer import HmacSha1Signer
+
+
+# コンシューマー（アプリ）とアクセストークン（利用者）の項目
+CONSUMER_FIELDS = ('consumer_key', 'consumer_secret')
+ACCESS_FIELDS = ('access_token', 'access_token_secret')
+
+# 各項目を読み込む環境変数
+ENV_VARS = {
+    'consumer_key': 'ZAIM_CONSUMER_KEY',
+    'consumer_secret': 'ZAIM_CONSUMER_SECRET',
+    'access_token': 'ZAIM_ACCESS_TOKEN',
+    'access_token_secret': 'ZAIM_ACCESS_TOKEN_SECRET',
+}
+
+# {トークンファイルのパス: ((更新時刻, サイズ), 内容)}
+_token_file_cache: Dict[str, Tuple[Tuple[int, int], Optional[Dict[str, Any]]]] = {}
+_token_file_lock = threading.Lock()
+
+
+class Credentials:
+    """解決済みの認証情報"""
+
+    def __init__(self, consumer_key: str, consumer_secret: str,
+                 access_token: str, access_token_secret: str,
+                 sources: Optional[Dict[str, str]] = None):
+        """
+        初期化
+
+        Args:
+            consumer_key: コンシューマーキー
+            consumer_secret: コンシューマーシークレット
+            access_token: アクセストークン
+            access_token_secret: アクセストークンシークレット
+            sources: 各項目の取得元（{'consumer': 'env', 'access': 'token_file'} など）
+        """
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.access_token = access_token
+        self.access_token_secret = access_token_secret
+        self.sources = sources or {}
+        # 最後に確認した利用者情報 (確認時刻のUNIX時間, verify の結果)（同じ認証情報のクライアント間で共有）
+        self.verification: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._auth: Optional[OAuth1] = None
+        self._signer: Optional[HmacSha1Signer] = None
+        self._auth_lock = threading.Lock()
+
+    @property
+    def auth(self) -> OAuth1:
+        """
+        リクエストの署名に使う OAuth1（初回のみ作成し、同じ認証情報のクライアント間で共有）
+        """
+        if self._auth is None:
+            with self._auth_lock:
+                if self._auth is None:
+                    self._auth = OAuth1(
+                        self.consumer_key,
+                        client_secret=self.consumer_secret,
+                        resource_owner_key=self.access_token,
+                        resource_owner_secret=self.access_token_secret,
+                        signature_method='HMAC-SHA1'
+                    )
+        return self._auth
+
+    @property
+    def signer(self) -> HmacSha1Signer:
+        """
+        事前計算した鍵で署名する高速な署名器（OAuth1 と同じ署名を生成、初回のみ作成）
+        """
+        if self._signer is None:
+            with self._auth_lock:
+                if self._signer is None:
+                    self._signer = HmacSha1Signer(self.consumer_key, self.consumer_secret,
+                                                  self.access_token, self.access_token_secret)
+        return self._signer
+
+    def __repr__(self) -> str:
+        # シークレットをログに出さない
+        return f"Credentials(consumer_key={self.consumer_key!r}, sources={self.sources!r})"
+
+
+class ExplicitProvider:
+    """引数で明示的に渡された認証情報"""
+
+    name = 'explicit'
+
+    def __init__(self, **values: Optional[str]):
+        """
+        初期化
+
+        Args:
+            **values: consumer_key / consumer_secret / access_token / access_token_secret
+        """
+        self.values = values
+
+    def load(self) -> Dict[str, Optional[str]]:
+        """取得できた項目"""
+        return self.values
+
+
+class EnvironmentProvider:
+    """環境変数（ZAIM_CONSUMER_KEY など）の認証情報"""
+
+    name = 'env'
+
+    def __init__(self, fields: Optional[List[str]] = None, environ: Optional[Dict[str, str]] = None):
+        """
+        初期化
+
+        Args:
+            fields: 読み込む項目（Noneの場合はすべて）
+            environ: 環境変数（Noneの場合は os.environ）
+        """
+        self.fields = list(fields) if fields is not None else list(ENV_VARS)
+        self.environ = environ
+
+    def load(self) -> Dict[str, Optional[str]]:
+        """取得できた項目"""
+        environ = self.environ if self.environ is not None else os.environ
+        return {field: environ.get(ENV_VARS[field]) for field in self.fields}
+
+
+class TokenFileProvider:
+    """ZaimAuthManager が保存したトークンファイル（tokens.json）のアクセストークン"""
+
+    name = 'token_file'
+
+    def __init__(self, path: Path):
+        """
+        初期化
+
+        Args:
+            path: トークンファイルのパス
+        """
+        self.path = Path(path)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        トークンファイルの内容（前回から更新されていなければキャッシュを返す）
+
+        Returns:
+            ファイルの内容（存在しない・壊れている場合はNone）
+        """
+        key = str(self.path)
+        try:
+            stat = self.path.stat()
+        except OSError:
+            with _token_file_lock:
+                _token_file_cache.pop(key, None)
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _token_file_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict):
+            data = None
+
+        with _token_file_lock:
+            _token_file_cache[key] = (stamp, data)
+        return data
+
+    def load(self) -> Dict[str, Optional[str]]:
+        """取得できた項目"""
+        data = self.read() or {}
+        return {field: data.get(field) for field in ACCESS_FIELDS}
+
+    def verification(self) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """トークンと一緒に保存された確認結果 (確認時刻, 利用者情報)（ない場合はNone）"""
+        data = self.read() or {}
+        if data.get('verified_at') and data.get('user_info'):
+            return data['verified_at'], data['user_info']
+        return None
+
+
+class ConfigProvider:
+    """設定（config.yaml の auth セクションなど）の認証情報"""
+
+    name = 'config'
+
+    def __init__(self, config: Optional[Dict[str, Any]]):
+        """
+        初期化
+
+        Args:
+            config: consumer_key などを持つ辞書（Noneの場合は何も提供しない）
+        """
+        self.config = config or {}
+
+    def load(self) -> Dict[str, Optional[str]]:
+        """取得できた項目"""
+        return {field: self.config.get(field) for field in ENV_VARS}
+
+
+class CredentialChain:
+    """認証情報を複数の取得元から順に探す"""
+
+    def __init__(self, providers: List[Any]):
+        """
+        初期化
+
+        コンシューマーキーとシークレット、アクセストークンとシークレットはそれぞれ組で扱い、
+        両方をそろえて持つ最初の取得元から採用する（別々の取得元の値を混ぜない）
+
+        Args:
+            providers: load() で項目の辞書を返す取得元（優先順）
+        """
+        self.providers = providers
+        # 前回と同じ認証情報が解決された場合は同じオブジェクト（と署名器）を返す
+        self._last: Optional[Tuple[tuple, Credentials]] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> Credentials:
+        """
+        認証情報を解決
+
+        Returns:
+            解決した認証情報
+
+        Raises:
+            ValueError: いずれかの組がどの取得元にもそろっていない場合
+        """
+        found: Dict[str, Tuple[Tuple[str, ...], str]] = {}
+        access_provider = None
+        for provider in self.providers:
+            values = provider.load()
+            for group, fields in (('consumer', CONSUMER_FIELDS), ('access', ACCESS_FIELDS)):
+                if group not in found and all(values.get(field) for field in fields):
+                    found[group] = (tuple(values[field] for field in fields), provider.name)
+                    if group == 'access':
+                        access_provider = provider
+            if len(found) == 2:
+                break
+
+        if len(found) < 2:
+            raise ValueError("OAuth credentials are required")
+
+        key = (found['consumer'], found['access'])
+        with self._lock:
+            if self._last is not None and self._last[0] == key:
+                return self._last[1]
+
+            (consumer_key, consumer_secret), consumer_source = found['consumer']
+            (access_token, access_token_secret), access_source = found['access']
+            credentials = Credentials(consumer_key, consumer_secret, access_token, access_token_secret,
+                                      sources={'consumer': consumer_source, 'access': access_source})
+            # トークンと一緒に保存された確認結果を引き継ぐ
+            if hasattr(access_provider, 'verification'):
+                credentials.verification = access_provider.verification()
+            self._last = (key, credentials)
+            return credentials
+
+
+def default_chain(consumer_key: Optional[str] = None, consumer_secret: Optional[str] = None,
+                  access_token: Optional[str] = None, access_token_secret: Optional[str] = None,
+                  token_file: Optional[Path] = None, config: Optional[Dict[str, Any]] = None,
+                  env_fields: Optional[List[str]] = None) -> CredentialChain:
+    """
+    明示的な引数 → 環境変数 → トークンファイル → 設定 の順に探すチェーンを作成
+
+    Args:
+        consumer_key: コンシューマーキー
+        consumer_secret: コンシューマーシークレット
+        access_token: アクセストークン
+        access_token_secret: アクセストークンシークレット
+        token_file: トークンファイル（Noneの場合は使わない）
+        config: 設定の辞書（Noneの場合は使わない）
+        env_fields: 環境変数から読み込む項目（Noneの場合はすべて）
+    """
+    providers: List[Any] = [
+        ExplicitProvider(consumer_key=consumer_key, consumer_secret=consumer_secret,
+                         access_token=access_token, access_token_secret=access_token_secret),
+        EnvironmentProvider(env_fields)
+    ]
+    if token_file is not None:
+        providers.append(TokenFileProvider(token_file))
+    if config is not None:
+        providers.append(ConfigProvider(config))
+    return CredentialChain(providers)
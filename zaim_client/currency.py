@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+通貨ごとの集計と換算
+取引の amount は記録された通貨の金額なので、通貨コードごとに分けて集計する
+"""
+
+from typing import Optional, Dict, List, Tuple, Any
+
+
+DEFAULT_CURRENCY = 'JPY'
+
+
+def record_currency(record: Dict[str, Any], default: str = DEFAULT_CURRENCY) -> str:
+    """取引データの通貨コードを取得（未設定の場合はデフォルト通貨）"""
+    return record.get('currency_code') or default
+
+
+class CurrencyTable:
+    """通貨マスターと換算レートの保持"""
+
+    def __init__(self, base_currency: str = DEFAULT_CURRENCY,
+                 rates: Optional[Dict[str, float]] = None,
+                 currencies: Optional[List[Dict[str, Any]]] = None):
+        """
+        初期化
+
+        Args:
+            base_currency: 基準通貨コード
+            rates: {通貨コード: その通貨1単位の基準通貨建て金額}
+            currencies: get_currencies()の結果の通貨リスト（コードの検証に使用）
+        """
+        self.base_currency = base_currency
+        self.currencies = {c['currency_code']: c for c in (currencies or [])}
+        self.rates: Dict[str, float] = {}
+        if rates:
+            self.set_rates(rates)
+
+    def set_rates(self, rates: Dict[str, float]):
+        """
+        換算レートを設定
+
+        Args:
+            rates: {通貨コード: その通貨1単位の基準通貨建て金額}
+        """
+        if self.currencies:
+            unknown = [code for code in rates if code not in self.currencies]
+            if unknown:
+                raise ValueError(f"不明な通貨コードです: {', '.join(unknown)}")
+
+        self.rates = {code: float(rate) for code, rate in rates.items()}
+        self.rates[self.base_currency] = 1.0
+
+    def convert_totals(self, totals: Dict[str, int]) -> Tuple[int, Dict[str, int]]:
+        """
+        通貨ごとの合計を基準通貨に換算
+
+        レートは取引ごとではなく通貨ごとの合計に1回だけ適用する
+
+        Args:
+            totals: {通貨コード: 合計金額}
+
+        Returns:
+            (基準通貨建ての合計, {換算できなかった通貨コード: 合計金額})
+        """
+        converted = 0.0
+        unconverted = {}
+
+        for code, amount in totals.items():
+            if code == self.base_currency:
+                converted += amount
+            elif code in self.rates:
+                converted += amount * self.rates[code]
+            elif amount:
+                unconverted[code] = amount
+
+        return int(round(converted)), unconverted
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+銀行・カード明細CSVの取り込み
+明細を1行ずつ読み込んで取引データに変換し、同時実行数と送信間隔を制限しながら登録する
+"""
+
+import re
+import csv
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Iterator, Tuple
+
+from .client import ZaimClient
+
+
+# マッピングで列名を指定できる項目
+MAPPING_COLUMNS = ('date', 'amount', 'withdrawal', 'deposit', 'mode', 'category', 'genre',
+                   'account', 'name', 'place', 'comment')
+
+# 日付形式の指定がない場合に試す形式
+DEFAULT_DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y%m%d', '%Y.%m.%d')
+
+# 再試行するHTTPステータス（サーバー側で登録されていないことが明らかなもの）
+RETRYABLE_STATUS = re.compile(r'\b(429|502|503|504)\b')
+
+# 取り込み結果ログの列
+RESULT_HEADERS = ['line', 'status', 'mode', 'date', 'amount', 'account', 'counter_account',
+                  'category', 'genre', 'transaction_id', 'error']
+
+
+def parse_amount(text: Optional[str]) -> Optional[int]:
+    """
+    明細の金額表記を整数に変換
+
+    「1,234」「¥1,234」「1,234円」「-1,234」「△1,234」「(1,234)」に対応する
+
+    Returns:
+        金額（空欄の場合はNone）
+    """
+    if text is None:
+        return None
+    value = text.strip().replace(',', '').replace('¥', '').replace('￥', '').replace('円', '').strip()
+    if not value:
+        return None
+
+    negative = False
+    if value[0] in '-△▲':
+        negative, value = True, value[1:]
+    elif value.startswith('(') and value.endswith(')'):
+        negative, value = True, value[1:-1]
+
+    try:
+        amount = int(round(float(value)))
+    except ValueError:
+        raise ValueError(f"金額を解釈できません: {text}")
+    return -amount if negative else amount
+
+
+class RateLimiter:
+    """スレッド間で共有する送信間隔の制限"""
+
+    def __init__(self, rate: float):
+        """
+        初期化
+
+        Args:
+            rate: 1秒あたりの最大リクエスト数（0以下の場合は制限なし）
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """次のリクエストを送ってよい時刻まで待つ"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next)
+            self._next = scheduled + self.interval
+        if scheduled > now:
+            time.sleep(scheduled - now)
+
+
+class NameResolver:
+    """カテゴリ・ジャンル・アカウント名からIDへのインデックス"""
+
+    def __init__(self, categories: List[Dict[str, Any]], genres: List[Dict[str, Any]],
+                 accounts: List[Dict[str, Any]]):
+        """
+        初期化
+
+        Args:
+            categories: カテゴリマスター
+            genres: ジャンルマスター
+            accounts: アカウントマスター
+        """
+        self.categories = {(c.get('mode'), c['name']): c['id'] for c in categories}
+        self.genres = {(g.get('category_id'), g['name']): g['id'] for g in genres}
+        self.accounts = {a['name']: a['id'] for a in accounts}
+
+    def category_id(self, mode: str, name: str) -> int:
+        """モードとカテゴリ名からカテゴリIDを取得"""
+        category_id = self.categories.get((mode, name))
+        if category_id is None:
+            raise ValueError(f"カテゴリ '{name}'（{mode}）が見つかりません")
+        return category_id
+
+    def genre_id(self, category_id: int, name: str) -> int:
+        """カテゴリIDとジャンル名からジャンルIDを取得"""
+        genre_id = self.genres.get((category_id, name))
+        if genre_id is None:
+            raise ValueError(f"ジャンル '{name}' が見つかりません")
+        return genre_id
+
+    def account_id(self, name: str) -> int:
+        """アカウント名からアカウントIDを取得"""
+        account_id = self.accounts.get(name)
+        if account_id is None:
+            raise ValueError(f"アカウント '{name}' が見つかりません")
+        return account_id
+
+
+class StatementImporter:
+    """明細CSVを取引データとして登録する"""
+
+    def __init__(self, client: ZaimClient, mapping: Dict[str, Any], resolver: NameResolver,
+                 max_workers: int = 4, rate: float = 5.0, retries: int = 2):
+        """
+        初期化
+
+        Args:
+            client: ZaimAPIクライアント
+            mapping: 列の対応と分類ルール（docs/CLI_USAGE.md の mapping.yaml 参照）
+            resolver: 名前からIDへのインデックス
+            max_workers: 同時に送信するリクエスト数
+            rate: 1秒あたりの最大リクエスト数（0以下の場合は制限なし）
+            retries: 登録に失敗した行の再試行回数
+        """
+        self.client = client
+        self.mapping = mapping
+        self.resolver = resolver
+        self.max_workers = max(1, max_workers)
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+
+        self.columns = mapping.get('columns') or {}
+        unknown = set(self.columns) - set(MAPPING_COLUMNS)
+        if unknown:
+            raise ValueError(f"不明な列の指定です: {', '.join(sorted(unknown))}")
+        if 'date' not in self.columns:
+            raise ValueError("columns.date を指定してください")
+        if 'amount' not in self.columns and not ({'withdrawal', 'deposit'} & set(self.columns)):
+            raise ValueError("columns.amount または columns.withdrawal / columns.deposit を指定してください")
+
+        date_format = mapping.get('date_format')
+        self.date_formats = (date_format,) if date_format else DEFAULT_DATE_FORMATS
+        self.rules = [dict(rule, pattern=re.compile(rule['match'])) for rule in mapping.get('rules') or []]
+
+    def iter_rows(self, path: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        明細CSVを1行ずつ読み込む
+
+        Yields:
+            (ファイル上の行番号, {列名: 値})
+        """
+        with open(path, 'r', encoding=self.mapping.get('encoding', 'utf-8-sig'), newline='') as f:
+            for _ in range(int(self.mapping.get('skip_rows', 0))):
+                f.readline()
+            reader = csv.DictReader(f, delimiter=self.mapping.get('delimiter', ','))
+            for row in reader:
+                if not any((value or '').strip() for value in row.values()):
+                    continue
+                yield reader.line_num + int(self.mapping.get('skip_rows', 0)), row
+
+    def _value(self, row: Dict[str, str], key: str) -> str:
+        column = self.columns.get(key)
+        return (row.get(column) or '').strip() if column else ''
+
+    def _parse_date(self, text: str) -> str:
+        for date_format in self.date_formats:
+            try:
+                return datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        raise ValueError(f"日付を解釈できません: {text}")
+
+    def map_row(self, row: Dict[str, str]) -> Dict[str, Any]:
+        """
+        明細の1行を取引データに変換
+
+        モードは ルール > mode列 > 出金・入金列 > マッピングの mode > 金額の符号（負は支出） の順で決める
+
+        Returns:
+            {'mode', 'date', 'amount', 'account', 'counter_account', 'category', 'genre',
+             'name', 'place', 'comment', 'params'（create_* に渡す引数）}
+
+        Raises:
+            ValueError: 変換できない行
+        """
+        name = self._value(row, 'name')
+        place = self._value(row, 'place')
+        comment = self._value(row, 'comment')
+        description = ' '.join(value for value in (name, place, comment) if value)
+        rule = next((rule for rule in self.rules if rule['pattern'].search(description)), {})
+        if rule.get('skip'):
+            return {'skip': True}
+
+        date = self._parse_date(self._value(row, 'date'))
+
+        mode = rule.get('mode') or self._value(row, 'mode')
+        withdrawal = parse_amount(self._value(row, 'withdrawal'))
+        deposit = parse_amount(self._value(row, 'deposit'))
+        amount = parse_amount(self._value(row, 'amount'))
+        if withdrawal:
+            amount, direction = withdrawal, 'payment'
+        elif deposit:
+            amount, direction = deposit, 'income'
+        elif amount:
+            direction = self.mapping.get('mode') or ('payment' if amount < 0 else 'income')
+        elif (withdrawal, deposit, amount) != (None, None, None):
+            raise ValueError("金額が0です")
+        else:
+            raise ValueError("金額が空欄です")
+        amount = abs(amount)
+        mode = mode or direction
+        if mode not in ('payment', 'income', 'transfer'):
+            raise ValueError(f"不明なモードです: {mode}")
+
+        account = self._value(row, 'account') or self.mapping.get('account')
+        if not account:
+            raise ValueError("アカウントが指定されていません（account）")
+        account_id = self.resolver.account_id(account)
+
+        record = {'mode': mode, 'date': date, 'amount': amount, 'account': account,
+                  'counter_account': '', 'category': '', 'genre': '',
+                  'name': name, 'place': place, 'comment': comment}
+        text_comment = comment or (description if mode == 'transfer' else '')
+
+        if mode == 'transfer':
+            counter_account = rule.get('transfer_account')
+            if not counter_account:
+                raise ValueError("振替先のアカウントが指定されていません（rules[].transfer_account）")
+            counter_id = self.resolver.account_id(counter_account)
+            # 出金なら明細のアカウントから、入金なら明細のアカウントへの振替
+            from_id, to_id = (account_id, counter_id) if direction == 'payment' else (counter_id, account_id)
+            record['counter_account'] = counter_account
+            record['params'] = {'amount': amount, 'date': date, 'from_account_id': from_id,
+                                'to_account_id': to_id, 'comment': text_comment or None}
+            return record
+
+        defaults = (self.mapping.get('defaults') or {}).get(mode) or {}
+        category = rule.get('category') or self._value(row, 'category') or defaults.get('category')
+        if not category:
+            raise ValueError("カテゴリが指定されていません")
+        category_id = self.resolver.category_id(mode, category)
+        record['category'] = category
+
+        if mode == 'payment':
+            genre = rule.get('genre') or self._value(row, 'genre') or defaults.get('genre')
+            if not genre:
+                raise ValueError("ジャンルが指定されていません")
+            record['genre'] = genre
+            record['params'] = {'category_id': category_id,
+                                'genre_id': self.resolver.genre_id(category_id, genre),
+                                'amount': amount, 'date': date, 'from_account_id': account_id,
+                                'comment': comment or None, 'name': name or None, 'place': place or None}
+        else:
+            record['params'] = {'category_id': category_id, 'amount': amount, 'date': date,
+                                'to_account_id': account_id, 'comment': comment or name or None,
+                                'place': place or None}
+        return record
+
+    def _submit(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """1件を登録（レート制限・一時的なサーバーエラーの場合は間隔をあけて再試行）"""
+        create = {
+            'payment': self.client.create_payment,
+            'income': self.client.create_income,
+            'transfer': self.client.create_transfer,
+        }[record['mode']]
+
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                return create(**record['params'])
+            except Exception as e:
+                # 登録済みかもしれない失敗は二重登録を避けるため再試行しない
+                if attempt == self.retries or not RETRYABLE_STATUS.search(str(e)):
+                    raise
+                time.sleep(2 ** attempt)
+
+    @staticmethod
+    def _result(line: int, record: Dict[str, Any], status: str,
+                transaction_id: Any = '', error: str = '') -> Dict[str, Any]:
+        result = {header: '' for header in RESULT_HEADERS}
+        result.update({key: record.get(key, '') for key in RESULT_HEADERS if key in record})
+        result.update({'line': line, 'status': status, 'transaction_id': transaction_id, 'error': error})
+        return result
+
+    def _finish(self, line: int, record: Dict[str, Any], future: Future) -> Dict[str, Any]:
+        try:
+            response = future.result()
+        except Exception as e:
+            return self._result(line, record, 'error', error=str(e))
+        return self._result(line, record, 'created', (response.get('money') or {}).get('id', ''))
+
+    def run(self, path: str, validate_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        明細を取り込む
+
+        送信待ちの行は max_workers の2倍までに制限し、結果は明細の行順に返す
+
+        Args:
+            path: 明細CSVファイル
+            validate_only: 変換と名前の解決だけを行い、登録しない
+
+        Yields:
+            行ごとの結果（RESULT_HEADERS の列、status は created / error / skipped / valid）
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+
+            for line, row in self.iter_rows(path):
+                try:
+                    record = self.map_row(row)
+                except ValueError as e:
+                    pending.append((line, {}, 'error', str(e)))
+                else:
+                    if record.get('skip'):
+                        pending.append((line, {}, 'skipped', ''))
+                    elif validate_only:
+                        pending.append((line, record, 'valid', ''))
+                    else:
+                        pending.append((line, record, executor.submit(self._submit, record), ''))
+
+                # 完了済みの先頭から行順に返す
+                while pending and (len(pending) > self.max_workers * 2 or self._ready(pending[0])):
+                    yield self._pop(pending)
+
+            while pending:
+                yield self._pop(pending)
+
+    @staticmethod
+    def _ready(entry: tuple) -> bool:
+        return not isinstance(entry[2], Future) or entry[2].done()
+
+    def _pop(self, pending: deque) -> Dict[str, Any]:
+        line, record, status, error = pending.popleft()
+        if isinstance(status, Future):
+            return self._finish(line, record, status)
+        return self._result(line, record, status, error=error)
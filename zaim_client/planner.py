@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+家計簿データ取得のリクエスト計画
+サーバー側の絞り込み（mode / category_id / genre_id）を使って転送ページ数を最小化する
+"""
+
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Tuple
+
+from .client import ZaimClient
+
+
+ALL_MODES = ('payment', 'income', 'transfer')
+
+
+def record_order(record: Dict[str, Any]) -> Tuple[str, int]:
+    """get_money が返す順（日付・IDの新しい順）に並べるためのキー（reverse=True で使う）"""
+    return record.get('date', '')[:10], record.get('id') or 0
+
+
+class FetchPlan:
+    """get_money呼び出しの実行計画"""
+
+    def __init__(self, start_date: Optional[str], end_date: Optional[str],
+                 requests: List[Dict[str, Any]], modes: Optional[Iterable[str]] = None,
+                 category_ids: Optional[Iterable[int]] = None,
+                 naive_scans: int = 1):
+        """
+        初期化
+
+        Args:
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+            requests: get_moneyに渡す絞り込み条件のリスト
+            modes: 対象モード（Noneの場合は全モード）
+            category_ids: 対象カテゴリID（Noneの場合は全カテゴリ）
+            naive_scans: 比較対象とする素朴な実装での全件スキャン回数
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.requests = requests
+        self.modes = set(modes) if modes else None
+        self.category_ids = set(category_ids) if category_ids else None
+        self.naive_scans = naive_scans
+        self.stats: Dict[str, Any] = {}
+
+    @property
+    def filtered(self) -> bool:
+        """サーバー側の絞り込みを使う計画かどうか"""
+        return any(set(request) - {'start_date', 'end_date'} for request in self.requests)
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """サーバー側で絞り切れない条件をクライアント側で確認"""
+        if self.modes is not None and record.get('mode') not in self.modes:
+            return False
+        if self.category_ids is not None and record.get('category_id') not in self.category_ids:
+            return False
+        return True
+
+
+class FetchPlanner:
+    """get_moneyのリクエスト計画を立てて実行する"""
+
+    def __init__(self, client: ZaimClient, page_size: int = 100, cache_ttl: float = 0):
+        """
+        初期化
+
+        Args:
+            client: ZaimAPIクライアント
+            page_size: 1ページあたりの取得件数（最大100）
+            cache_ttl: 取得したページを再利用する秒数（0の場合はキャッシュしない）
+        """
+        self.client = client
+        self.page_size = min(page_size, 100)
+        self.cache_ttl = cache_ttl
+        # {リクエスト条件: (取得時刻, ページのリスト)}
+        self._page_cache: Dict[tuple, tuple] = {}
+        # 絞り込みなしでスキャンした期間の件数（素朴な実装のページ数見積もりに使用）
+        self._window_counts: Dict[tuple, int] = {}
+
+    def plan(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+             modes: Optional[Iterable[str]] = None,
+             category_ids: Optional[Iterable[int]] = None,
+             genre_ids: Optional[Iterable[int]] = None,
+             naive_scans: int = 1) -> FetchPlan:
+        """
+        絞り込み条件からリクエスト計画を作成
+
+        条件はAND（モード かつ カテゴリ かつ ジャンル）として扱う。
+        ジャンルはカテゴリに、カテゴリはモードに従属するため、最も細かい条件だけを
+        サーバー側の絞り込みに使い、残りはクライアント側で確認する。
+
+        Args:
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+            modes: 対象モード（Noneまたは全モードの場合は絞り込みなし）
+            category_ids: 対象カテゴリID
+            genre_ids: 対象ジャンルID
+            naive_scans: 比較対象とする素朴な実装での全件スキャン回数
+
+        Returns:
+            実行計画
+        """
+        window = {}
+        if start_date:
+            window['start_date'] = start_date
+        if end_date:
+            window['end_date'] = end_date
+
+        modes = set(modes) if modes else None
+        if modes is not None:
+            unknown = modes - set(ALL_MODES)
+            if unknown:
+                raise ValueError(f"mode must be one of {', '.join(ALL_MODES)}: {', '.join(sorted(unknown))}")
+            if modes == set(ALL_MODES):
+                modes = None
+
+        if genre_ids:
+            requests = [dict(window, genre_id=genre_id) for genre_id in sorted(set(genre_ids))]
+        elif category_ids:
+            requests = [dict(window, category_id=category_id) for category_id in sorted(set(category_ids))]
+        elif modes:
+            requests = [dict(window, mode=mode) for mode in ALL_MODES if mode in modes]
+        else:
+            requests = [window]
+
+        return FetchPlan(start_date, end_date, requests, modes=modes,
+                         category_ids=category_ids if genre_ids else None,
+                         naive_scans=naive_scans)
+
+    def execute(self, plan: FetchPlan, cache: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """
+        計画に従ってページ単位で取引データを取得
+
+        全ページを取得し終えると plan.stats に転送量のレポートが設定される。
+        計画のリクエストは互いに重ならない（ジャンル・カテゴリ・モードごと）ため、取得済みの取引を
+        覚えておく必要はなく、保持するのは取得中のページだけになる
+
+        Args:
+            plan: plan()で作成した実行計画
+            cache: ページキャッシュを使うかどうか（False の場合は cache_ttl に関わらず
+                キャッシュを読まず、取得したページも保持しない）
+
+        Yields:
+            取引データのページ（クライアント側の条件確認済み）
+        """
+        pages = 0
+        cached_pages = 0
+        records = 0
+
+        for request in plan.requests:
+            for page, cached in self._iter_request_pages(request, cache):
+                if cached:
+                    cached_pages += 1
+                else:
+                    pages += 1
+                records += len(page)
+
+                matched = [record for record in page if plan.matches(record)]
+                if matched:
+                    yield matched
+
+        plan.stats = self._build_stats(plan, pages, records)
+        plan.stats['cached_pages'] = cached_pages
+
+    @staticmethod
+    def split_window(start_date: str, end_date: str, window_days: int = 31) -> List[Tuple[str, str]]:
+        """
+        期間を window_days 日ごとの重ならない小期間に分割
+
+        Returns:
+            [(開始日, 終了日)]（古い順）
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+
+        windows = []
+        while start <= end:
+            window_end = min(start + timedelta(days=window_days - 1), end)
+            windows.append((start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+            start = window_end + timedelta(days=1)
+        return windows
+
+    def execute_windows(self, start_date: str, end_date: str, workers: int = 4,
+                        window_days: int = 31, cache: bool = True,
+                        **filters) -> Iterator[Tuple[Tuple[str, str], List[Dict[str, Any]]]]:
+        """
+        期間を分割して並行取得し、小期間の新しい順に取引データを返す
+
+        分割せずに取得した場合と同じ順（日付・IDの新しい順）になるよう、小期間は新しい順に返し、
+        複数のリクエストに分かれる絞り込みでは小期間内の取引を並べ替える。
+        先読みする小期間は workers の2倍までに制限するため、保持するデータ量は期間全体に比例しない
+
+        Args:
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+            workers: 並行して取得する小期間の数
+            window_days: 小期間の日数
+            cache: ページキャッシュを使うかどうか（execute() と同じ）
+            **filters: plan() に渡す絞り込み条件（modes, category_ids, genre_ids）
+
+        Yields:
+            ((開始日, 終了日), その小期間の取引データ)
+        """
+        windows = self.split_window(start_date, end_date, window_days)[::-1]
+
+        def fetch(window: Tuple[str, str]) -> List[Dict[str, Any]]:
+            plan = self.plan(start_date=window[0], end_date=window[1], **filters)
+            records = [record for page in self.execute(plan, cache) for record in page]
+            if len(plan.requests) > 1:
+                records.sort(key=record_order, reverse=True)
+            return records
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            pending = deque()
+            remaining = iter(windows)
+
+            for window in remaining:
+                pending.append((window, executor.submit(fetch, window)))
+                if len(pending) >= max(1, workers) * 2:
+                    break
+
+            while pending:
+                window, future = pending.popleft()
+                records = future.result()
+
+                next_window = next(remaining, None)
+                if next_window is not None:
+                    pending.append((next_window, executor.submit(fetch, next_window)))
+
+                yield window, records
+
+    def _iter_request_pages(self, request: Dict[str, Any], cache: bool = True) -> Iterator[tuple]:
+        """
+        1つの絞り込み条件についてページを取得（キャッシュが有効なら再利用）
+
+        Args:
+            request: get_moneyに渡す絞り込み条件
+            cache: ページキャッシュを使うかどうか
+
+        Yields:
+            (ページ, キャッシュから取得したかどうか)
+        """
+        if not cache or self.cache_ttl <= 0:
+            for page in self.client.iter_money_pages(limit=self.page_size, **request):
+                yield page, False
+            return
+
+        key = tuple(sorted(request.items()))
+        entry = self._page_cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.cache_ttl:
+            for page in entry[1]:
+                yield page, True
+            return
+
+        fetched_at = time.monotonic()
+        fetched = []
+        for page in self.client.iter_money_pages(limit=self.page_size, **request):
+            fetched.append(page)
+            yield page, False
+
+        # 最後まで取得できた場合のみキャッシュ
+        self._page_cache[key] = (fetched_at, fetched)
+
+    def clear_cache(self):
+        """取得済みページのキャッシュを破棄（取引を作成・更新した後に呼ぶ）"""
+        self._page_cache.clear()
+
+    def _build_stats(self, plan: FetchPlan, pages: int, records: int) -> Dict[str, Any]:
+        """素朴な実装（絞り込みなしの全件スキャン × naive_scans回）と比較したレポートを作成"""
+        window = (plan.start_date, plan.end_date)
+
+        if not plan.filtered and pages:
+            self._window_counts[window] = records
+            naive_window_pages = pages
+            estimated = False
+        elif window in self._window_counts:
+            naive_window_pages = self._pages_for(self._window_counts[window])
+            estimated = False
+        else:
+            # 絞り込みなしの件数は不明なので、取得できた件数からの下限値
+            naive_window_pages = self._pages_for(records)
+            estimated = True
+
+        naive_pages = naive_window_pages * plan.naive_scans
+        return {
+            'requests': len(plan.requests),
+            'pages': pages,
+            'records': records,
+            'naive_pages': naive_pages,
+            'pages_saved': naive_pages - pages,
+            'estimated': estimated
+        }
+
+    def _pages_for(self, records: int) -> int:
+        """件数を全件取得するのに必要なページ数（空でも1リクエストは必要）"""
+        return max(1, math.ceil(records / self.page_size))
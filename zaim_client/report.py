@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+家計簿データの集計レポート
+取引データを1回だけ走査し、集計キーごとのハッシュ表に金額と件数を加算する
+"""
+
+from datetime import date
+from typing import Optional, Dict, List, Tuple, Any, Iterable, Sequence
+
+from .currency import CurrencyTable, DEFAULT_CURRENCY
+
+
+# 集計キーとして指定できる項目
+GROUP_KEYS = ('month', 'week', 'category', 'genre', 'account', 'mode')
+
+# 集計キーの計算に必要な列
+_KEY_COLUMNS = {
+    'month': ('date',),
+    'week': ('date',),
+    'category': ('category_id',),
+    'genre': ('genre_id',),
+    'account': ('mode', 'from_account_id', 'to_account_id'),
+    'mode': ('mode',),
+}
+
+
+def _iso_week(date_text: str) -> str:
+    """YYYY-MM-DD を ISO週（YYYY-Www）に変換"""
+    year, week, _ = date.fromisoformat(date_text[:10]).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _record_account(mode: Optional[str], from_account_id: Any, to_account_id: Any) -> Any:
+    """集計対象のアカウント（収入は入金先、支出・振替は出金元）"""
+    return to_account_id if mode == 'income' else from_account_id
+
+
+class LedgerReport:
+    """取引データのグループ別集計"""
+
+    def __init__(self, group_by: Sequence[str],
+                 accounts: Optional[List[Dict[str, Any]]] = None,
+                 categories: Optional[List[Dict[str, Any]]] = None,
+                 genres: Optional[List[Dict[str, Any]]] = None,
+                 currency_table: Optional[CurrencyTable] = None):
+        """
+        初期化
+
+        Args:
+            group_by: 集計キー（GROUP_KEYS の組み合わせ、指定順に出力列になる）
+            accounts: アカウントマスター（ID→名前の解決に使用）
+            categories: カテゴリマスター
+            genres: ジャンルマスター
+            currency_table: 外貨の換算に使う通貨テーブル（Noneの場合は基準通貨JPY・レートなし）
+        """
+        unknown = [key for key in group_by if key not in GROUP_KEYS]
+        if unknown:
+            raise ValueError(f"group_by must be chosen from {', '.join(GROUP_KEYS)}: {', '.join(unknown)}")
+
+        self.group_by = list(group_by)
+        self.currency_table = currency_table or CurrencyTable()
+        self.names = {
+            'account': {a['id']: a['name'] for a in (accounts or [])},
+            'category': {c['id']: c['name'] for c in (categories or [])},
+            'genre': {g['id']: g['name'] for g in (genres or [])},
+        }
+        self.records = 0
+        # {(集計キー..., モード, 通貨コード): [金額合計, 件数]}
+        self._totals: Dict[tuple, List[int]] = {}
+        # 同じ日付の週番号を何度も計算しない
+        self._weeks: Dict[str, str] = {}
+
+    def _key_functions(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        """集計キーごとに (必要な列, 列の値から集計キーを求める関数)"""
+        weeks = self._weeks
+
+        def week(date_text):
+            key = weeks.get(date_text)
+            if key is None:
+                key = weeks[date_text] = _iso_week(date_text) if date_text else ''
+            return key
+
+        functions = {
+            'month': lambda date_text: (date_text or '')[:7],
+            'week': week,
+            'category': lambda category_id: category_id or 0,
+            'genre': lambda genre_id: genre_id or 0,
+            'account': lambda mode, from_id, to_id: _record_account(mode, from_id, to_id) or 0,
+            'mode': lambda mode: mode or '',
+        }
+        return [(_KEY_COLUMNS[key], functions[key]) for key in self.group_by]
+
+    def add(self, records: Iterable[Dict[str, Any]]):
+        """
+        取引データ（get_moneyの形式）を集計に加える
+
+        Args:
+            records: 取引データ（ページ単位で何度呼び出してもよい）
+        """
+        key_functions = self._key_functions()
+        totals = self._totals
+        count = 0
+
+        for record in records:
+            key = tuple(function(*[record.get(column) for column in columns])
+                        for columns, function in key_functions)
+            key += (record.get('mode'), record.get('currency_code') or DEFAULT_CURRENCY)
+
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = [record.get('amount', 0), 1]
+            else:
+                entry[0] += record.get('amount', 0)
+                entry[1] += 1
+            count += 1
+
+        self.records += count
+
+    def add_columns(self, columns: Dict[str, Sequence[Any]]):
+        """
+        列形式の取引データを集計に加える
+
+        集計キーに必要な列だけを列ごとにまとめて変換してから加算するため、
+        行形式よりも辞書の参照回数が少ない（同じ値のキー変換も1回だけ）
+
+        Args:
+            columns: {列名: 値のシーケンス}（amount と mode は必須、各列の長さは同じ）
+        """
+        amounts = columns['amount']
+        size = len(amounts)
+        missing = [None] * size
+
+        def column(name):
+            return columns.get(name, missing)
+
+        # 集計キーを列単位で計算
+        key_columns = []
+        for needed, function in self._key_functions():
+            if len(needed) == 1:
+                cache = {}
+                values = []
+                for value in column(needed[0]):
+                    if value not in cache:
+                        cache[value] = function(value)
+                    values.append(cache[value])
+                key_columns.append(values)
+            else:
+                key_columns.append([function(*values) for values in zip(*[column(name) for name in needed])])
+
+        key_columns.append(columns['mode'])
+        key_columns.append([code or DEFAULT_CURRENCY for code in column('currency_code')])
+
+        totals = self._totals
+        for key, amount in zip(zip(*key_columns), amounts):
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = [amount, 1]
+            else:
+                entry[0] += amount
+                entry[1] += 1
+
+        self.records += size
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        集計結果を行のリストで取得
+
+        各行は集計キーの列（ID列は名前も付加）と、収入・支出・振替の合計（基準通貨建て）、
+        収支（収入 - 支出）、件数を持つ。換算レートのない外貨は unconverted に通貨別で残す。
+
+        Returns:
+            集計キーの昇順に並んだ行
+        """
+        # {集計キー: {(モード, 通貨コード): 金額}, 件数}
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for key, (amount, count) in self._totals.items():
+            group_key, mode, currency = key[:-2], key[-2], key[-1]
+            group = groups.setdefault(group_key, {'amounts': {}, 'count': 0})
+            amounts = group['amounts'].setdefault(mode, {})
+            amounts[currency] = amounts.get(currency, 0) + amount
+            group['count'] += count
+
+        rows = []
+        for group_key in sorted(groups, key=lambda k: tuple((0, v, '') if isinstance(v, int) else (1, 0, str(v))
+                                                       for v in k)):
+            group = groups[group_key]
+            row: Dict[str, Any] = {}
+            for name, value in zip(self.group_by, group_key):
+                if name in self.names:
+                    row[f'{name}_id'] = value
+                    row[f'{name}_name'] = self.names[name].get(value, '' if not value else str(value))
+                else:
+                    row[name] = value
+
+            unconverted: Dict[str, Dict[str, int]] = {}
+            for mode in ('income', 'payment', 'transfer'):
+                converted, rest = self.currency_table.convert_totals(group['amounts'].get(mode, {}))
+                row[mode] = converted
+                if rest:
+                    unconverted[mode] = rest
+
+            row['net'] = row['income'] - row['payment']
+            row['count'] = group['count']
+            if unconverted:
+                row['unconverted'] = unconverted
+            rows.append(row)
+
+        return rows
+
+    def headers(self) -> List[str]:
+        """rows() の列名（CSV出力用）"""
+        headers = []
+        for name in self.group_by:
+            headers.extend([f'{name}_id', f'{name}_name'] if name in self.names else [name])
+        return headers + ['income', 'payment', 'transfer', 'net', 'count']
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+OAuth 1.0a HMAC-SHA1 署名の高速実装
+requests_oauthlib の OAuth1 と同じ署名・Authorizationヘッダーを生成する
+
+認証情報ごとに変わらない部分（HMACの鍵、エンコード済みのコンシューマーキー・トークン）を
+事前に計算し、リクエストごとの処理をパラメーターの正規化とHMACの計算だけにする
+"""
+
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+from urllib.parse import quote, urlsplit, parse_qsl
+from typing import Optional, Dict, List, Tuple
+
+from requests.auth import AuthBase
+
+
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+# 既定ポート（署名ベース文字列のURIから省く）
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def escape(value: str) -> str:
+    """RFC 5849 のパーセントエンコード（英数字と - . _ ~ 以外をエンコード）"""
+    return quote(value, safe='~')
+
+
+def base_string_uri(url: str) -> str:
+    """署名ベース文字列に使うURI（スキーム・ホストは小文字、既定ポート・クエリ・フラグメントは除く）"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    netloc = host if port is None or str(port) == _DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+    return f"{scheme}://{netloc}{parts.path or '/'}"
+
+
+class HmacSha1Signer(AuthBase):
+    """
+    事前計算した鍵で署名する requests 用の OAuth1 認証
+
+    requests_oauthlib.OAuth1(signature_method='HMAC-SHA1', 署名はヘッダー) と
+    同じ規則で署名するため、置き換えてもサーバー側の検証結果は変わらない
+    """
+
+    def __init__(self, consumer_key: str, consumer_secret: str,
+                 access_token: str, access_token_secret: str, uri_cache_size: int = 256):
+        """
+        初期化
+
+        Args:
+            consumer_key: コンシューマーキー
+            consumer_secret: コンシューマーシークレット
+            access_token: アクセストークン
+            access_token_secret: アクセストークンシークレット
+            uri_cache_size: エンコード済みのベースURIを保持する数
+        """
+        key = f"{escape(consumer_secret)}&{escape(access_token_secret)}".encode('utf-8')
+        # 鍵の前処理（ipad/opad）は1回だけ行い、署名ごとに copy() する
+        self._hmac = hmac.new(key, digestmod=hashlib.sha1)
+
+        self._consumer_key = escape(consumer_key)
+        self._token = escape(access_token)
+        # nonce・timestamp 以外の oauth パラメーター（エンコード済み）
+        self._static_params = [
+            ('oauth_version', '1.0'),
+            ('oauth_signature_method', 'HMAC-SHA1'),
+            ('oauth_consumer_key', self._consumer_key),
+            ('oauth_token', self._token),
+        ]
+        self._uri_cache: Dict[str, str] = {}
+        self._uri_cache_size = uri_cache_size
+
+    def _encoded_uri(self, url: str) -> str:
+        """エンコード済みのベースURI（エンドポイントごとにキャッシュ）"""
+        path = url.split('?', 1)[0].split('#', 1)[0]
+        encoded = self._uri_cache.get(path)
+        if encoded is None:
+            encoded = escape(base_string_uri(path))
+            if len(self._uri_cache) >= self._uri_cache_size:
+                self._uri_cache.clear()
+            self._uri_cache[path] = encoded
+        return encoded
+
+    def signature(self, method: str, url: str, params: List[Tuple[str, str]],
+                  nonce: str, timestamp: str) -> str:
+        """
+        署名を計算
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL（クエリを含んでよい）
+            params: 署名対象のパラメーター（クエリ・フォームのデコード済みの値、oauth_* は含めない）
+            nonce: oauth_nonce
+            timestamp: oauth_timestamp
+
+        Returns:
+            Base64 の署名（エンコード前）
+        """
+        encoded = [(escape(key), escape(value)) for key, value in params]
+        encoded.extend(self._static_params)
+        encoded.append(('oauth_nonce', escape(nonce)))
+        encoded.append(('oauth_timestamp', timestamp))
+        encoded.sort()
+
+        normalized = '&'.join(f"{key}={value}" for key, value in encoded)
+        base_string = f"{method.upper()}&{self._encoded_uri(url)}&{escape(normalized)}"
+
+        digest = self._hmac.copy()
+        digest.update(base_string.encode('utf-8'))
+        return base64.b64encode(digest.digest()).decode('ascii')
+
+    def authorization_header(self, method: str, url: str, params: List[Tuple[str, str]],
+                             nonce: Optional[str] = None, timestamp: Optional[str] = None) -> str:
+        """
+        Authorization ヘッダーの値（oauthlib と同じ項目順）
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            params: 署名対象のパラメーター
+            nonce: oauth_nonce（Noneの場合は生成）
+            timestamp: oauth_timestamp（Noneの場合は現在時刻）
+        """
+        nonce = nonce or str(secrets.randbits(64)) + str(int(time.time()))
+        timestamp = timestamp or str(int(time.time()))
+        signature = self.signature(method, url, params, nonce, timestamp)
+
+        return (f'OAuth oauth_nonce="{escape(nonce)}", oauth_timestamp="{timestamp}", '
+                f'oauth_version="1.0", oauth_signature_method="HMAC-SHA1", '
+                f'oauth_consumer_key="{self._consumer_key}", oauth_token="{self._token}", '
+                f'oauth_signature="{escape(signature)}"')
+
+    def __call__(self, r):
+        """requests の PreparedRequest に署名する"""
+        url = r.url
+        params: List[Tuple[str, str]] = []
+
+        query = urlsplit(url).query
+        if query:
+            params.extend(parse_qsl(query, keep_blank_values=True))
+
+        body = r.body
+        if body and FORM_CONTENT_TYPE in r.headers.get('Content-Type', ''):
+            if isinstance(body, bytes):
+                body = body.decode('utf-8')
+            params.extend(parse_qsl(body, keep_blank_values=True))
+
+        r.headers['Authorization'] = self.authorization_header(r.method, url, params)
+        return r
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+複数利用者のトークン保管庫
+サーバー側で多数の利用者に代わってAPIを呼ぶためのSQLiteベースのトークンストア
+
+利用者IDを主キーとしたインデックスで1件ずつ引き、WALモードで複数スレッド・プロセスからの
+同時読み込みを妨げない。作成済みの認証情報（署名器）はLRUで保持し、よく使う利用者の
+クライアント作成ではデータベースにもアクセスしない
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Tuple
+
+import requests
+
+from .client import ZaimClient
+from .credentials import Credentials
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    user_id TEXT PRIMARY KEY,
+    access_token TEXT NOT NULL,
+    access_token_secret TEXT NOT NULL,
+    user_info TEXT,
+    updated_at INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+
+class TokenVault:
+    """利用者IDごとのアクセストークンを保存するSQLiteストア"""
+
+    def __init__(self, path: Path, consumer_key: str, consumer_secret: str,
+                 signer_cache_size: int = 1024, signer_max_age: float = 300,
+                 fast_signer: bool = False):
+        """
+        初期化
+
+        Args:
+            path: データベースファイルのパス
+            consumer_key: コンシューマーキー（全利用者で共通）
+            consumer_secret: コンシューマーシークレット
+            signer_cache_size: 保持する認証情報（署名器）の数
+            signer_max_age: 保持した認証情報を再利用する秒数
+                （他のプロセスによるトークンの更新はこの時間内に反映される）
+            fast_signer: client_for() のクライアントで HmacSha1Signer を使うかどうか
+        """
+        self.path = Path(path)
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.signer_cache_size = signer_cache_size
+        self.signer_max_age = signer_max_age
+        self.fast_signer = fast_signer
+
+        # スレッドごとの接続とHTTPセッション（sqlite3 の接続はスレッド間で共有しない）
+        self._local = threading.local()
+        # {利用者ID: (作成時刻, 認証情報)}（古い順）
+        self._signers: 'OrderedDict[str, Tuple[float, Credentials]]' = OrderedDict()
+        self._signers_lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        with self._connection() as conn:
+            conn.execute(_SCHEMA)
+        self.path.chmod(0o600)
+
+    def _connection(self) -> sqlite3.Connection:
+        """このスレッドの接続（初回のみ作成）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            # 書き込み中も読み込みをブロックしない
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def put(self, user_id: str, access_token: str, access_token_secret: str,
+            user_info: Optional[Dict[str, Any]] = None):
+        """
+        利用者のトークンを保存（既存の場合は置き換え）
+
+        Args:
+            user_id: 利用者ID
+            access_token: アクセストークン
+            access_token_secret: アクセストークンシークレット
+            user_info: 利用者情報（verify_user の結果など）
+        """
+        self._connection().execute(
+            'INSERT OR REPLACE INTO tokens (user_id, access_token, access_token_secret, user_info, updated_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (str(user_id), access_token, access_token_secret,
+             json.dumps(user_info, ensure_ascii=False) if user_info is not None else None, int(time.time()))
+        )
+        self.invalidate(user_id)
+
+    def put_many(self, tokens: List[Dict[str, Any]]) -> int:
+        """
+        複数の利用者のトークンを1トランザクションで保存
+
+        Args:
+            tokens: [{user_id, access_token, access_token_secret, user_info(任意)}]
+
+        Returns:
+            保存した件数
+        """
+        now = int(time.time())
+        rows = [(str(token['user_id']), token['access_token'], token['access_token_secret'],
+                 json.dumps(token['user_info'], ensure_ascii=False) if token.get('user_info') is not None else None,
+                 now)
+                for token in tokens]
+
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO tokens (user_id, access_token, access_token_secret, user_info, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)', rows)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        for row in rows:
+            self.invalidate(row[0])
+        return len(rows)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        利用者のトークンを取得
+
+        Returns:
+            {user_id, access_token, access_token_secret, user_info, updated_at}（存在しない場合はNone）
+        """
+        row = self._connection().execute(
+            'SELECT user_id, access_token, access_token_secret, user_info, updated_at '
+            'FROM tokens WHERE user_id = ?', (str(user_id),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'user_id': row[0],
+            'access_token': row[1],
+            'access_token_secret': row[2],
+            'user_info': json.loads(row[3]) if row[3] else None,
+            'updated_at': row[4]
+        }
+
+    def delete(self, user_id: str) -> bool:
+        """
+        利用者のトークンを削除
+
+        Returns:
+            削除したかどうか
+        """
+        cursor = self._connection().execute('DELETE FROM tokens WHERE user_id = ?', (str(user_id),))
+        self.invalidate(user_id)
+        return cursor.rowcount > 0
+
+    def user_ids(self) -> List[str]:
+        """保存されている利用者IDの一覧"""
+        return [row[0] for row in self._connection().execute('SELECT user_id FROM tokens ORDER BY user_id')]
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM tokens').fetchone()[0]
+
+    def __contains__(self, user_id: str) -> bool:
+        return self._connection().execute(
+            'SELECT 1 FROM tokens WHERE user_id = ?', (str(user_id),)).fetchone() is not None
+
+    def credentials_for(self, user_id: str) -> Credentials:
+        """
+        利用者の認証情報（署名器はLRUにあれば再利用）
+
+        Raises:
+            KeyError: 利用者のトークンが保存されていない場合
+        """
+        key = str(user_id)
+        now = time.monotonic()
+        with self._signers_lock:
+            entry = self._signers.get(key)
+            if entry is not None and now - entry[0] < self.signer_max_age:
+                self._signers.move_to_end(key)
+                return entry[1]
+
+        token = self.get(key)
+        if token is None:
+            raise KeyError(f"トークンが保存されていません: {key}")
+
+        credentials = Credentials(self.consumer_key, self.consumer_secret,
+                                  token['access_token'], token['access_token_secret'],
+                                  sources={'consumer': 'vault', 'access': 'vault'})
+        with self._signers_lock:
+            self._signers[key] = (now, credentials)
+            self._signers.move_to_end(key)
+            while len(self._signers) > self.signer_cache_size:
+                self._signers.popitem(last=False)
+        return credentials
+
+    def client_for(self, user_id: str) -> ZaimClient:
+        """
+        利用者のAPIクライアントを作成
+
+        HTTPセッション（コネクションプール）はスレッドごとに1つを利用者間で共有する
+
+        Raises:
+            KeyError: 利用者のトークンが保存されていない場合
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return ZaimClient(credentials=self.credentials_for(user_id), session=session,
+                          fast_signer=self.fast_signer)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """
+        保持している認証情報を破棄
+
+        Args:
+            user_id: 破棄する利用者ID（Noneの場合はすべて）
+        """
+        with self._signers_lock:
+            if user_id is None:
+                self._signers.clear()
+            else:
+                self._signers.pop(str(user_id), None)
+
+    def close(self):
+        """このスレッドの接続とセッションを閉じる"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            session.close()
+            self._local.session = None